@@ -0,0 +1,279 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+
+from changes import subscribe
+from database import db
+from pagination import decode_cursor, encode_cursor, quote_value
+
+# Server-Sent Events feed of newly submitted applications for the admin
+# dashboard. One tail loop per process follows both application tables
+# with a keyset query on (created_at, id) and fans new rows out to every
+# connected stream. It is woken at once by local inserts
+# (changes.publish_change) and otherwise checks every APPLICATION_FEED_POLL
+# seconds, which catches inserts made by other instances. Application ids
+# are UUIDs in one schema and bigints in another, so positions are always
+# (created_at, id), never the id alone, and numeric ids compare as numbers.
+# The SSE event id holds one such cursor per table, so a reconnect with
+# Last-Event-ID replays exactly what was missed, page by page.
+
+APPLICATION_FEED_POLL = float(os.environ.get("APPLICATION_FEED_POLL", "5"))
+# Re-read this far behind the newest row: a slow transaction can commit a
+# row whose created_at is earlier than one already delivered
+APPLICATION_FEED_OVERLAP = float(os.environ.get("APPLICATION_FEED_OVERLAP", "5"))
+APPLICATION_FEED_BACKLOG = int(os.environ.get("APPLICATION_FEED_BACKLOG", "500"))
+APPLICATION_FEED_HEARTBEAT = float(os.environ.get("APPLICATION_FEED_HEARTBEAT", "15"))
+# Streams end after this long (0 = never) and the client resumes; keeps
+# serverless invocations under their time limit
+APPLICATION_STREAM_MAX_SECONDS = float(os.environ.get("APPLICATION_STREAM_MAX_SECONDS", "300"))
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# Event type -> table, in event-id order
+APPLICATION_TABLES = {
+    "partner": "partner_applications",
+    "exhibition": "exhibition_applications",
+}
+
+Cursor = Optional[Tuple[str, str]]
+
+
+def encode_event_id(cursors: Dict[str, Cursor]) -> str:
+    return ".".join(encode_cursor(*cursors[kind]) if cursors.get(kind) else "-" for kind in APPLICATION_TABLES)
+
+
+def decode_event_id(value: str) -> Dict[str, Cursor]:
+    parts = value.split(".")
+    if len(parts) != len(APPLICATION_TABLES):
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    cursors: Dict[str, Cursor] = {}
+    for kind, part in zip(APPLICATION_TABLES, parts):
+        if part == "-":
+            cursors[kind] = None
+        else:
+            created_at, row_id = decode_cursor(part)
+            if not isinstance(created_at, str) or isinstance(row_id, bool) or not isinstance(row_id, (str, int)):
+                raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+            cursors[kind] = (created_at, str(row_id))
+    return cursors
+
+
+def _position(row: dict) -> Tuple[str, str]:
+    return (row.get("created_at") or "", str(row.get("id")))
+
+
+def _order(position: Tuple[str, str]) -> tuple:
+    # Sort key of a position: "10" comes after "9"
+    created_at, row_id = position
+    return (created_at, (0, int(row_id), "") if row_id.isdigit() else (1, 0, row_id))
+
+
+def _after(position: Tuple[str, str], cursor: Cursor) -> bool:
+    return cursor is None or _order(position) > _order(cursor)
+
+
+def _shift(created_at: str, seconds: float) -> Optional[str]:
+    try:
+        return (datetime.fromisoformat(created_at.replace("Z", "+00:00")) - timedelta(seconds=seconds)).isoformat()
+    except ValueError:
+        return None
+
+
+async def fetch_after(kind: str, cursor: Cursor, limit: int, overlap: float = 0.0) -> List[dict]:
+    # Rows after `cursor`, oldest first; with overlap, also the last few seconds before it
+    query = db.table(APPLICATION_TABLES[kind]).select("*")
+    if cursor is not None:
+        created_at, row_id = cursor
+        since = _shift(created_at, overlap) if overlap else None
+        if since is not None:
+            query = query.gte("created_at", since)
+        else:
+            query = query.or_(
+                f"created_at.gt.{quote_value(created_at)},and(created_at.eq.{quote_value(created_at)},id.gt.{quote_value(row_id)})"
+            )
+    response = await query.order("created_at").order("id").limit(limit).execute()
+    return response.data or []
+
+
+async def latest_cursor(kind: str) -> Cursor:
+    response = await db.table(APPLICATION_TABLES[kind]).select("id,created_at").order("created_at", desc=True).order("id", desc=True).limit(1).execute()
+    rows = response.data or []
+    return _position(rows[0]) if rows else None
+
+
+class ApplicationFeed:
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._cursors: Dict[str, Cursor] = {}
+        # kind -> {id: created_at} delivered within the overlap window
+        self._recent: Dict[str, Dict[str, str]] = {kind: {} for kind in APPLICATION_TABLES}
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._ready = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            # Nobody is listening: stop querying
+            self._task.cancel()
+            self._task = None
+
+    def is_subscribed(self, queue: asyncio.Queue) -> bool:
+        return queue in self._subscribers
+
+    async def current_cursors(self) -> Dict[str, Cursor]:
+        await self._ready.wait()
+        return dict(self._cursors)
+
+    def notify(self, table: str, rows: Optional[List[dict]], deleted: bool) -> None:
+        if not deleted and table in APPLICATION_TABLES.values() and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _broadcast(self, kind: str, row: dict) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait((kind, row))
+            except asyncio.QueueFull:
+                # A stuck client: end its stream, it resumes from its last event id
+                self._subscribers.discard(queue)
+                self.dropped += 1
+
+    async def _poll(self, kind: str) -> None:
+        cursor = self._cursors.get(kind)
+        rows = await fetch_after(kind, cursor, APPLICATION_FEED_BACKLOG, overlap=APPLICATION_FEED_OVERLAP)
+        recent = self._recent[kind]
+        for row in rows:
+            position = _position(row)
+            if position[1] in recent:
+                continue
+            recent[position[1]] = position[0]
+            if _after(position, self._cursors.get(kind)):
+                self._cursors[kind] = position
+            self._broadcast(kind, row)
+            self.delivered += 1
+        # Forget ids that have fallen out of the overlap window
+        newest = self._cursors.get(kind)
+        if newest is not None:
+            horizon = _shift(newest[0], APPLICATION_FEED_OVERLAP * 2)
+            if horizon is not None:
+                for row_id in [i for i, created_at in recent.items() if created_at < horizon]:
+                    del recent[row_id]
+
+    async def _run(self) -> None:
+        while not self._ready.is_set():
+            try:
+                for kind in APPLICATION_TABLES:
+                    cursor = await latest_cursor(kind)
+                    # Rows inside the overlap window are old news, not new applications
+                    rows = await fetch_after(kind, cursor, APPLICATION_FEED_BACKLOG, overlap=APPLICATION_FEED_OVERLAP) if cursor else []
+                    self._recent[kind] = {str(row.get("id")): row.get("created_at") or "" for row in rows}
+                    self._cursors[kind] = cursor
+                self._ready.set()
+            except Exception as e:
+                print(f"Application feed could not start: {e}")
+                await asyncio.sleep(APPLICATION_FEED_POLL)
+        while self._subscribers:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=APPLICATION_FEED_POLL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            for kind in APPLICATION_TABLES:
+                try:
+                    await self._poll(kind)
+                except Exception as e:
+                    print(f"Application feed poll of {APPLICATION_TABLES[kind]} failed: {e}")
+
+    def stats(self) -> dict:
+        return {"subscribers": len(self._subscribers), "delivered": self.delivered, "dropped": self.dropped}
+
+
+application_feed = ApplicationFeed()
+subscribe(application_feed.notify)
+
+
+def _event(kind: str, row: dict, cursors: Dict[str, Cursor]) -> str:
+    data = json.dumps({"type": kind, "application": jsonable_encoder(row)}, ensure_ascii=False)
+    return f"id: {encode_event_id(cursors)}\nevent: application\ndata: {data}\n\n"
+
+
+async def application_events(request: Request, resume: Optional[Dict[str, Cursor]]):
+    # `resume` is the decoded Last-Event-ID; subscribe before reading the
+    # backlog so nothing falls in between
+    queue = application_feed.subscribe()
+    started = time.monotonic()
+    sent: Set[Tuple[str, str]] = set()
+    try:
+        yield "retry: 3000\n\n"
+        if resume is not None:
+            # Page through everything after the client's cursors, however
+            # much it missed; each event id carries both tables' cursors, so
+            # a stream cut off mid-replay resumes where it stopped
+            cursors = dict(resume)
+            pending = set(APPLICATION_TABLES)
+            while pending:
+                if await request.is_disconnected() or (
+                    APPLICATION_STREAM_MAX_SECONDS and time.monotonic() - started > APPLICATION_STREAM_MAX_SECONDS
+                ):
+                    return
+                backlog = []
+                for kind in [k for k in APPLICATION_TABLES if k in pending]:
+                    rows = await fetch_after(kind, cursors[kind], APPLICATION_FEED_BACKLOG)
+                    if len(rows) < APPLICATION_FEED_BACKLOG:
+                        pending.discard(kind)
+                    backlog.extend((kind, row) for row in rows)
+                for kind, row in sorted(backlog, key=lambda item: _order(_position(item[1]))):
+                    cursors[kind] = _position(row)
+                    sent.add((kind, str(row.get("id"))))
+                    yield _event(kind, row, cursors)
+        else:
+            # The feed may still be starting (or retrying a failed start):
+            # keep the connection alive while waiting for it
+            while True:
+                try:
+                    cursors = await asyncio.wait_for(application_feed.current_cursors(), timeout=APPLICATION_FEED_HEARTBEAT)
+                    break
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected() or (
+                        APPLICATION_STREAM_MAX_SECONDS and time.monotonic() - started > APPLICATION_STREAM_MAX_SECONDS
+                    ):
+                        return
+                    yield ": keepalive\n\n"
+        # Tells the client where it stands even before the first application
+        yield f"id: {encode_event_id(cursors)}\nevent: ready\ndata: {{}}\n\n"
+
+        while True:
+            if APPLICATION_STREAM_MAX_SECONDS and time.monotonic() - started > APPLICATION_STREAM_MAX_SECONDS:
+                break
+            try:
+                kind, row = await asyncio.wait_for(queue.get(), timeout=APPLICATION_FEED_HEARTBEAT)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected() or not application_feed.is_subscribed(queue):
+                    break
+                yield ": keepalive\n\n"
+                continue
+            key = (kind, str(row.get("id")))
+            if key in sent:
+                continue
+            sent.add(key)
+            if _after(_position(row), cursors.get(kind)):
+                cursors[kind] = _position(row)
+            yield _event(kind, row, cursors)
+    finally:
+        application_feed.unsubscribe(queue)
@@ -1,24 +1,74 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+import asyncio
+import hashlib
 import os
+import threading
+import time
 
 # Password Hashing
 # Use pbkdf2_sha256 which is pure python and more reliable on serverless than bcrypt
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Round count: measure on the deploy target with benchmarks/hash_cost.py.
+# Hashes below PBKDF2_ROUNDS are flagged by needs_update and rehashed on login.
+# passlib and python-jose are imported on first use, so cold starts that never
+# touch /api/auth or an admin endpoint don't pay for the crypto stack.
+PBKDF2_ROUNDS = int(os.environ.get("PBKDF2_ROUNDS", "29000"))
+_pwd_context = None
+
+def get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(
+            schemes=["pbkdf2_sha256"],
+            deprecated="auto",
+            pbkdf2_sha256__default_rounds=PBKDF2_ROUNDS,
+            pbkdf2_sha256__min_rounds=PBKDF2_ROUNDS,
+        )
+    return _pwd_context
+
+# Hashing runs on a small dedicated pool (hashlib's pbkdf2 releases the GIL),
+# so it never blocks the event loop, and at most HASH_MAX_PENDING hashes are
+# queued at once; further logins wait for a slot instead of piling up work.
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", "2"))
+HASH_MAX_PENDING = int(os.environ.get("HASH_MAX_PENDING", "8"))
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="pwd-hash")
+_hash_slots: Optional[asyncio.Semaphore] = None
 
 def verify_password(plain_password, hashed_password):
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_pwd_context().verify(plain_password, hashed_password)
     except Exception as e:
         print(f"Verify Password Error: {e}")
         return False
 
+def verify_and_update_password(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    # Returns (valid, new_hash); new_hash is set when the stored hash is outdated
+    try:
+        return get_pwd_context().verify_and_update(plain_password, hashed_password)
+    except Exception as e:
+        print(f"Verify Password Error: {e}")
+        return False, None
+
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+async def _run_hash(fn, *args):
+    global _hash_slots
+    if _hash_slots is None:
+        _hash_slots = asyncio.Semaphore(HASH_MAX_PENDING)
+    async with _hash_slots:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+
+async def verify_and_update_password_async(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    return await _run_hash(verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    return await _run_hash(get_password_hash, password)
 
 # JWT
 SECRET_KEY = os.environ.get("SECRET_KEY", "YOUR_SUPER_SECRET_KEY_CHANGE_THIS")
@@ -28,6 +78,7 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -37,19 +88,74 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+class TokenCache:
+    # LRU of sha256(token) -> (claims, exp) for tokens that already passed
+    # signature verification. Entries are dropped once the token's exp passes,
+    # so a cached token never outlives what jwt.decode would accept.
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, exp = entry
+            if exp <= time.time():
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return claims
+
+    def set(self, token: str, claims: dict, exp: float) -> None:
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        with self._lock:
+            self._entries[digest] = (claims, exp)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "1024"))
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cached = token_cache.get(token)
+    if cached is not None:
+        return dict(cached)
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         role: str = payload.get("role")
         if username is None:
             raise credentials_exception
-        return {"username": username, "role": role}
+        user = {"username": username, "role": role}
+        # Tokens without exp are never issued by create_access_token; don't cache them
+        if isinstance(payload.get("exp"), (int, float)):
+            token_cache.set(token, dict(user), payload["exp"])
+        return user
     except JWTError:
         raise credentials_exception
 
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+# 添加 backend 目录到搜索路径，以便导入 auth_utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+
+from passlib.hash import pbkdf2_sha256
+from auth_utils import PBKDF2_ROUNDS
+
+# Measures pbkdf2_sha256 cost on this machine and recommends a round count.
+# Run it on (or with the same CPU class as) the deploy target:
+#   python benchmarks/hash_cost.py --target-ms 100
+# then set PBKDF2_ROUNDS to the recommendation. Existing hashes are upgraded
+# on the next successful login.
+
+PROBE_ROUNDS = [10000, 29000, 100000, 200000, 600000]
+
+
+def measure(rounds: int, samples: int) -> float:
+    hasher = pbkdf2_sha256.using(rounds=rounds)
+    best = float("inf")
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("benchmark-password")
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure pbkdf2_sha256 cost and recommend PBKDF2_ROUNDS")
+    parser.add_argument("--target-ms", type=float, default=100.0, help="hash time budget per login (ms)")
+    parser.add_argument("--samples", type=int, default=3, help="timed runs per round count (best is kept)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    args = parser.parse_args()
+
+    results = [{"rounds": r, "ms": round(measure(r, args.samples), 2)} for r in PROBE_ROUNDS]
+
+    # Cost is linear in rounds; derive the per-round cost from the largest probe
+    largest = results[-1]
+    ms_per_round = largest["ms"] / largest["rounds"]
+    recommended = int(args.target_ms / ms_per_round) // 1000 * 1000
+    report = {
+        "current_rounds": PBKDF2_ROUNDS,
+        "current_ms": round(PBKDF2_ROUNDS * ms_per_round, 2),
+        "target_ms": args.target_ms,
+        "recommended_rounds": max(recommended, 1000),
+        "measurements": results,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'rounds':>10}  {'ms/hash':>10}")
+    for row in results:
+        print(f"{row['rounds']:>10}  {row['ms']:>10.2f}")
+    print("-" * 24)
+    print(f"Current PBKDF2_ROUNDS={report['current_rounds']} (~{report['current_ms']} ms)")
+    print(f"Recommended for {args.target_ms:.0f} ms: PBKDF2_ROUNDS={report['recommended_rounds']}")
+
+
+if __name__ == "__main__":
+    main()
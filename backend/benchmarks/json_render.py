@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+# 添加 backend 目录到搜索路径，以便导入 http_cache / models
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+
+from http_cache import orjson, render_json, render_trusted
+from models import Association, Exhibition, ExhibitionApplication, NewsItem, PartnerApplication, PartnerBenefit, Product, Solution
+
+# CPU cost of rendering each list endpoint's body: validated (TypeAdapter
+# validate + dump, what conditional_json did before) vs. trusted rows
+# (render_trusted). Rows are synthetic but shaped like the real tables.
+#   python benchmarks/json_render.py --rows 200
+
+TEXT = "低空经济无人机应用场景与解决方案 " * 4
+
+
+def _row(model, i: int) -> dict:
+    samples = {
+        "id": str(i),
+        "date": "2024-05-01",
+        "start_date": "2024-05-01",
+        "end_date": "2024-05-03",
+        "created_at": "2024-05-01T08:00:00+00:00",
+        "sort_order": i,
+        "featured": i % 5 == 0,
+        "tags": ["无人机", "展会"],
+        "highlights": ["亮点一", "亮点二", "亮点三"],
+        "gallery_images": [f"https://cdn.example.com/g/{i}-{n}.jpg" for n in range(3)],
+        "type": "ticket",
+        "status": "pending",
+    }
+    row = {}
+    for name, field in model.model_fields.items():
+        if name in samples:
+            row[name] = samples[name]
+        elif name in ("image", "logo", "video", "website"):
+            row[name] = f"https://cdn.example.com/{name}/{i}.jpg"
+        else:
+            row[name] = f"{name} {i} {TEXT}"
+    if model in (PartnerBenefit, PartnerApplication, ExhibitionApplication):
+        row["id"] = i
+    return row
+
+
+ENDPOINTS = [
+    ("/api/solutions", Solution),
+    ("/api/products", Product),
+    ("/api/partners", PartnerBenefit),
+    ("/api/news", NewsItem),
+    ("/api/exhibitions", Exhibition),
+    ("/api/associations", Association),
+    ("/api/partners/applications", PartnerApplication),
+    ("/api/exhibitions/applications", ExhibitionApplication),
+]
+
+
+def measure(render, rows, model, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        for _ in range(20):
+            render(rows, model)
+        best = min(best, (time.process_time() - start) / 20)
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare validated vs trusted JSON rendering per list endpoint")
+    parser.add_argument("--rows", type=int, default=100, help="rows per response")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per endpoint (best is kept)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    args = parser.parse_args()
+
+    results = []
+    for path, model in ENDPOINTS:
+        rows = [_row(model, i) for i in range(args.rows)]
+        list_model = List[model]
+        # Both paths must produce the same document
+        assert json.loads(render_json(rows, list_model)) == json.loads(render_trusted(rows, list_model)), path
+        validated = measure(render_json, rows, list_model, args.repeat)
+        trusted = measure(render_trusted, rows, list_model, args.repeat)
+        results.append({
+            "endpoint": path,
+            "validated_us": round(validated, 1),
+            "trusted_us": round(trusted, 1),
+            "saved_us": round(validated - trusted, 1),
+            "speedup": round(validated / trusted, 2) if trusted else None,
+        })
+
+    report = {"rows": args.rows, "serializer": "orjson" if orjson is not None else "json", "endpoints": results}
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{args.rows} rows per response, serializer: {report['serializer']}")
+    print(f"{'endpoint':<32}  {'validated µs':>12}  {'trusted µs':>10}  {'saved µs':>9}  {'x':>5}")
+    for r in results:
+        print(f"{r['endpoint']:<32}  {r['validated_us']:>12.1f}  {r['trusted_us']:>10.1f}  {r['saved_us']:>9.1f}  {r['speedup']:>5.2f}")
+
+
+if __name__ == "__main__":
+    main()
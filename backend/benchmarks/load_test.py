@@ -0,0 +1,337 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# 添加 backend 目录到搜索路径，以便导入 main / seed_data
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.append(backend_dir)
+
+# In-process load test: boots main:app on an in-memory SQLite store seeded
+# from seed_data.py (scaled to --rows per table) and drives a weighted traffic
+# mix through httpx's ASGI transport - no network, no Supabase project.
+#   python benchmarks/load_test.py --rows 500 --requests 5000 --out before.json
+#   python benchmarks/load_test.py --rows 500 --requests 5000 --compare before.json
+# The run is reproducible for a given --seed; results are per endpoint
+# (p50/p95/p99 latency in ms, throughput, errors) and are written as JSON.
+
+os.environ.setdefault("DATA_BACKEND", "sqlite")
+os.environ.setdefault("SQLITE_PATH", ":memory:")
+os.environ.setdefault("INTAKE_ENABLED", "0")
+os.environ.setdefault("SLOW_REQUEST_MS", "1000000")
+os.environ.setdefault("PBKDF2_ROUNDS", "29000")
+# One client address sends the whole mix; measure the endpoints, not the limiter
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+import httpx
+
+ADMIN = {"username": "bench-admin", "password": "bench-password", "role": "super_admin"}
+
+# name -> (weight, method, path template, body builder)
+# Weights approximate production traffic: mostly public reads, a trickle of
+# form submissions, the occasional admin login and reorder.
+SCENARIOS = {
+    "GET /api/bootstrap": (14, "GET", "/api/bootstrap/", None),
+    "GET /api/products": (12, "GET", "/api/products/", None),
+    "GET /api/products (304)": (8, "GET", "/api/products/", None),
+    "GET /api/solutions": (8, "GET", "/api/solutions/", None),
+    "GET /api/news": (10, "GET", "/api/news/", None),
+    "GET /api/news?limit=20": (6, "GET", "/api/news/?limit=20", None),
+    "GET /api/exhibitions": (8, "GET", "/api/exhibitions/", None),
+    "GET /api/exhibitions/{id}": (10, "GET", "/api/exhibitions/{exhibition_id}", None),
+    "GET /api/associations": (5, "GET", "/api/associations/", None),
+    "GET /api/partners": (4, "GET", "/api/partners/", None),
+    "POST /api/partners/apply": (4, "POST", "/api/partners/apply", "partner_application"),
+    "POST /api/exhibitions/apply": (4, "POST", "/api/exhibitions/apply", "exhibition_application"),
+    "GET /api/exhibitions/applications": (2, "GET", "/api/exhibitions/applications?limit=50", None),
+    "POST /api/auth/login": (1, "POST", "/api/auth/login", "login"),
+    "PUT /api/products/reorder": (1, "PUT", "/api/products/reorder", "reorder"),
+}
+# Sent with the benchmark admin's bearer token
+ADMIN_SCENARIOS = {"GET /api/exhibitions/applications"}
+
+
+def _scaled(items: List[dict], rows: int, id_field: Optional[str] = "id") -> List[dict]:
+    out = []
+    for n in range(rows):
+        item = dict(items[n % len(items)])
+        if id_field:
+            item[id_field] = f"{item[id_field]}-{n}"
+        if "title" in item:
+            item["title"] = f"{item['title']} #{n}"
+        out.append(item)
+    return out
+
+
+def _exhibitions(rows: int) -> List[dict]:
+    cities = ["深圳", "上海", "北京", "成都", "杭州", "广州"]
+    return [
+        {
+            "title": f"低空经济博览会 #{n}",
+            "description": "无人机整机、核心部件与低空服务全产业链展示。" * 3,
+            "start_date": f"2024-{n % 12 + 1:02d}-{n % 27 + 1:02d}",
+            "end_date": f"2024-{n % 12 + 1:02d}-{n % 27 + 2:02d}",
+            "location": "国际会展中心",
+            "city": cities[n % len(cities)],
+            "tags": ["无人机", "展会"],
+            "image": f"https://images.example.com/exhibitions/{n}.jpg",
+            "featured": n % 10 == 0,
+            "highlights": ["新品首发", "行业论坛", "采购对接"],
+            "gallery_images": [f"https://images.example.com/gallery/{n}-{i}.jpg" for i in range(3)],
+        }
+        for n in range(rows)
+    ]
+
+
+def _associations(rows: int) -> List[dict]:
+    return [
+        {
+            "name": f"低空经济产业协会 #{n}",
+            "type": "协会",
+            "description": "推动低空经济产业协同发展。" * 3,
+            "logo": f"https://images.example.com/logos/{n}.png",
+        }
+        for n in range(rows)
+    ]
+
+
+async def seed(rows: int) -> Dict[str, list]:
+    from database import db
+    from seed_data import NEWS_ITEMS, PARTNER_BENEFITS, PRODUCTS, SOLUTIONS
+
+    data = {
+        "solutions": _scaled(SOLUTIONS, rows),
+        "products": _scaled(PRODUCTS, rows),
+        "partner_benefits": _scaled(PARTNER_BENEFITS, rows, id_field=None),
+        "news_items": _scaled(NEWS_ITEMS, rows),
+        "exhibitions": _exhibitions(rows),
+        "associations": _associations(rows),
+    }
+    inserted = {}
+    for table, items in data.items():
+        response = await db.table(table).insert(items).execute()
+        inserted[table] = response.data
+    return inserted
+
+
+class Traffic:
+    def __init__(self, seeded: Dict[str, list], rng: random.Random):
+        self.rng = rng
+        self.exhibition_ids = [row["id"] for row in seeded["exhibitions"]]
+        self.product_ids = [row["id"] for row in seeded["products"]]
+        self.exhibitions = seeded["exhibitions"]
+        self.etags: Dict[str, str] = {}
+        self.token: Optional[str] = None
+        names = list(SCENARIOS)
+        self.names = names
+        self.weights = [SCENARIOS[name][0] for name in names]
+
+    def pick(self) -> str:
+        return self.rng.choices(self.names, weights=self.weights)[0]
+
+    def body(self, kind: Optional[str], n: int):
+        if kind == "partner_application":
+            return {"name": f"访客{n}", "phone": f"138{n:08d}", "company": "测试公司", "target_city": "深圳", "message": "希望成为城市合伙人"}
+        if kind == "exhibition_application":
+            exhibition = self.rng.choice(self.exhibitions)
+            return {
+                "exhibition_id": exhibition["id"],
+                "exhibition_title": exhibition["title"],
+                "type": self.rng.choice(["ticket", "booth"]),
+                "name": f"访客{n}",
+                "company": "测试公司",
+                "phone": f"139{n:08d}",
+            }
+        if kind == "login":
+            return {"username": ADMIN["username"], "password": ADMIN["password"]}
+        if kind == "reorder":
+            ids = self.rng.sample(self.product_ids, min(20, len(self.product_ids)))
+            return [{"id": pid, "sort_order": i} for i, pid in enumerate(ids)]
+        return None
+
+    def request(self, name: str, n: int):
+        _, method, path, kind = SCENARIOS[name]
+        path = path.replace("{exhibition_id}", str(self.rng.choice(self.exhibition_ids)))
+        headers = {}
+        if name.endswith("(304)") and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        if name in ADMIN_SCENARIOS and self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return method, path, self.body(kind, n), headers
+
+
+async def run(args) -> dict:
+    import main
+    from cache import read_cache
+
+    rng = random.Random(args.seed)
+    seeded = await seed(args.rows)
+    traffic = Traffic(seeded, rng)
+    if args.no_cache:
+        os.environ["CACHE_ENABLED"] = "0"
+        import cache
+        cache.CACHE_ENABLED = False
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/auth/register", json=ADMIN)
+        if response.status_code != 201:
+            raise RuntimeError(f"Could not create the benchmark admin: {response.status_code} {response.text}")
+        response = await client.post("/api/auth/login", json={"username": ADMIN["username"], "password": ADMIN["password"]})
+        traffic.token = response.json()["access_token"]
+
+        # Warm-up: mounts the lazy routers and primes caches and ETags
+        for name in traffic.names:
+            method, path, body, headers = traffic.request(name, 0)
+            response = await client.request(method, path, json=body, headers=headers)
+            if "ETag" in response.headers:
+                traffic.etags[path] = response.headers["ETag"]
+
+        plan = [traffic.pick() for _ in range(args.requests)]
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        queue: asyncio.Queue = asyncio.Queue()
+        for n, name in enumerate(plan):
+            queue.put_nowait((n, name))
+
+        async def worker():
+            while True:
+                try:
+                    n, name = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                method, path, body, headers = traffic.request(name, n)
+                start = time.perf_counter()
+                response = await client.request(method, path, json=body, headers=headers)
+                latencies[name].append((time.perf_counter() - start) * 1000)
+                statuses[name][response.status_code] += 1
+                if method == "GET" and "ETag" in response.headers:
+                    traffic.etags[path] = response.headers["ETag"]
+
+        read_cache.hits = read_cache.misses = 0
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name in traffic.names:
+        samples = sorted(latencies.get(name, []))
+        if not samples:
+            continue
+        errors = sum(count for status, count in statuses[name].items() if status >= 400)
+        endpoints[name] = {
+            "requests": len(samples),
+            "errors": errors,
+            "statuses": {str(k): v for k, v in sorted(statuses[name].items())},
+            "throughput_rps": round(len(samples) / elapsed, 1),
+            "mean_ms": round(sum(samples) / len(samples), 3),
+            "p50_ms": round(percentile(samples, 50), 3),
+            "p95_ms": round(percentile(samples, 95), 3),
+            "p99_ms": round(percentile(samples, 99), 3),
+            "max_ms": round(samples[-1], 3),
+        }
+
+    every = sorted(x for samples in latencies.values() for x in samples)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rows": args.rows,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "cache": not args.no_cache,
+        },
+        "total": {
+            "requests": len(every),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(every) / elapsed, 1),
+            "p50_ms": round(percentile(every, 50), 3),
+            "p95_ms": round(percentile(every, 95), 3),
+            "p99_ms": round(percentile(every, 99), 3),
+            "cache": read_cache.stats(),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_samples) + 0.5 - 1e-9)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=backend_dir, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: dict, baseline: Optional[dict]) -> None:
+    meta, total = report["meta"], report["total"]
+    print(f"commit {meta['commit']}  rows={meta['rows']} requests={meta['requests']} concurrency={meta['concurrency']} seed={meta['seed']}")
+    header = f"{'endpoint':<36} {'n':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    if baseline:
+        header += f" {'p95 Δ':>8}"
+    print(header)
+    for name, row in report["endpoints"].items():
+        line = f"{name:<36} {row['requests']:>6} {row['errors']:>4} {row['throughput_rps']:>8.1f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f}"
+        if baseline:
+            before = baseline["endpoints"].get(name)
+            line += f" {_delta(before['p95_ms'], row['p95_ms']) if before else '':>8}"
+        print(line)
+    print("-" * len(header))
+    line = f"{'total':<36} {total['requests']:>6} {'':>4} {total['throughput_rps']:>8.1f} {total['p50_ms']:>8.2f} {total['p95_ms']:>8.2f} {total['p99_ms']:>8.2f}"
+    if baseline:
+        line += f" {_delta(baseline['total']['p95_ms'], total['p95_ms']):>8}"
+    print(line)
+
+
+def _delta(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.0f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process load test of the FastAPI app on seeded in-memory data")
+    parser.add_argument("--rows", type=int, default=200, help="rows per content table")
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests (after warm-up)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--seed", type=int, default=42, help="seed for the traffic mix")
+    parser.add_argument("--no-cache", action="store_true", help="disable the in-process read cache")
+    parser.add_argument("--out", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="baseline JSON report to compare p95 against")
+    parser.add_argument("--json", action="store_true", help="print the JSON report instead of a table")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# Cold-start report for the API entry point.
+# Imports `main` in a fresh interpreter with -X importtime and breaks the
+# import cost down by top-level package, optionally followed by mounting the
+# router for a request path (what the first request on a cold instance pays).
+#   python benchmarks/startup_report.py --budget-ms 400
+#   python benchmarks/startup_report.py --path /api/products/ --top 15
+# Exits with status 1 when the total exceeds --budget-ms, so it can gate CI.
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+path = sys.argv[1]
+if path:
+    prefix = next((p for p in main.ROUTERS if path == p or path.startswith(p + "/")), None)
+    if prefix:
+        main.mount_router(prefix)
+mounted = time.perf_counter()
+print("PROBE", (imported - start) * 1000, (mounted - imported) * 1000)
+"""
+
+
+def run_probe(path: str) -> dict:
+    env = dict(os.environ)
+    # Placeholders so database.py does not warn; nothing is contacted at import
+    env.setdefault("SUPABASE_URL", "https://example.supabase.co")
+    env.setdefault("SUPABASE_KEY", "startup-report")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE, path],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    by_package = defaultdict(float)
+    modules = 0
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] |   cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        by_package[package] += int(self_us) / 1000
+        modules += 1
+
+    probe = next(l for l in result.stdout.splitlines() if l.startswith("PROBE")).split()
+    return {
+        "import_main_ms": round(float(probe[1]), 1),
+        "mount_router_ms": round(float(probe[2]), 1),
+        "modules": modules,
+        "packages": sorted(((p, round(ms, 1)) for p, ms in by_package.items()), key=lambda item: -item[1]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Break down API cold-start import time")
+    parser.add_argument("--path", default="", help="also mount the router serving this request path")
+    parser.add_argument("--top", type=int, default=10, help="packages to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if import (+ mount) exceeds this")
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    args = parser.parse_args()
+
+    report = run_probe(args.path)
+    total = report["import_main_ms"] + report["mount_router_ms"]
+    report["total_ms"] = round(total, 1)
+    report["budget_ms"] = args.budget_ms
+    over_budget = args.budget_ms is not None and total > args.budget_ms
+
+    if args.json:
+        report["packages"] = dict(report["packages"][:args.top])
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import main: {report['import_main_ms']:.1f} ms ({report['modules']} modules)")
+        if args.path:
+            print(f"mount router for {args.path}: {report['mount_router_ms']:.1f} ms")
+        print(f"{'package':<24}  {'self ms':>8}")
+        for package, ms in report["packages"][:args.top]:
+            print(f"{package:<24}  {ms:>8.1f}")
+        print("-" * 34)
+        print(f"total: {total:.1f} ms" + (f" (budget {args.budget_ms:.0f} ms)" if args.budget_ms is not None else ""))
+
+    if over_budget:
+        print(f"Cold start over budget: {total:.1f} ms > {args.budget_ms:.0f} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from resilience import is_upstream_failure, mark_stale
+from singleflight import singleflight
+
+# In-process read cache for public content.
+# Content tables change a few times a week, so list responses are kept for a
+# short per-table TTL and dropped as soon as an admin write touches the table.
+
+CACHE_ENABLED = os.environ.get("CACHE_ENABLED", "1") != "0"
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "256"))
+CACHE_DEFAULT_TTL = float(os.environ.get("CACHE_DEFAULT_TTL", "60"))
+# After the TTL, an unchanged list is still served for this long while it is
+# refreshed in the background (stale-while-revalidate)
+CACHE_STALE_TTL = float(os.environ.get("CACHE_STALE_TTL", "60"))
+# How long a last-known-good snapshot may stand in for a failing upstream
+CACHE_SNAPSHOT_MAX_AGE = float(os.environ.get("CACHE_SNAPSHOT_MAX_AGE", "86400"))
+
+# TTL in seconds per table
+TABLE_TTLS: Dict[str, float] = {
+    "solutions": 300,
+    "products": 300,
+    "partner_benefits": 600,
+    "news_items": 120,
+    "exhibitions": 120,
+    "associations": 300,
+}
+
+
+class TTLCache:
+    def __init__(self, max_entries: int, default_ttl: float, ttls: Optional[Dict[str, float]] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def ttl_for(self, table: str) -> float:
+        return self.ttls.get(table, self.default_ttl)
+
+    def get(self, table: str, key: Any = "list", default: Any = None) -> Any:
+        if not CACHE_ENABLED:
+            return default
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((table, key))
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[(table, key)]
+                self.misses += 1
+                return default
+            # LRU: most recently read entries are evicted last
+            self._entries.move_to_end((table, key))
+            self.hits += 1
+            return value
+
+    def set(self, table: str, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        if not CACHE_ENABLED:
+            return
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl_for(table))
+        with self._lock:
+            self._entries[(table, key)] = (value, expires_at)
+            self._entries.move_to_end((table, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, table: str) -> int:
+        # Bumped by every invalidate(), so readers can tell "expired" from "changed"
+        return self._generations.get(table, 0)
+
+    def invalidate(self, table: str) -> None:
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for cache_key in [k for k in self._entries if k[0] == table]:
+                del self._entries[cache_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+read_cache = TTLCache(CACHE_MAX_ENTRIES, CACHE_DEFAULT_TTL, TABLE_TTLS)
+
+
+# Last-known-good snapshots of cached reads. Unlike read_cache entries they
+# survive expiry and invalidation, so a failing upstream can still be
+# answered with the last rows we saw (flagged as stale).
+
+class SnapshotStore:
+    def __init__(self):
+        self._snapshots: Dict[tuple, tuple] = {}
+
+    def get(self, table: str, key: Any = "list") -> Optional[tuple]:
+        # (value, fetched_at, generation) or None
+        return self._snapshots.get((table, key))
+
+    def set(self, table: str, key: Any, value: Any, generation: int) -> None:
+        self._snapshots[(table, key)] = (value, time.time(), generation)
+
+    def clear(self) -> None:
+        self._snapshots.clear()
+
+
+snapshots = SnapshotStore()
+_revalidating: Set[asyncio.Task] = set()
+
+
+async def _refresh(table: str, key: Any, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    generation = read_cache.generation(table)
+    # Keyed by generation: a read that starts after a write never joins a
+    # fetch that started before it
+    value = await singleflight.do(table, (key, generation), fetch)
+    # A write landed while the fetch was in flight: these rows may predate it,
+    # so return them to this caller but do not cache them
+    if read_cache.generation(table) == generation:
+        read_cache.set(table, key, value)
+        snapshots.set(table, key, value, generation)
+    return value
+
+
+def _revalidate(table: str, key: Any, fetch: Callable[[], Awaitable[Any]]) -> None:
+    async def run():
+        try:
+            await _refresh(table, key, fetch)
+        except Exception as e:
+            print(f"Error revalidating {table}: {e}")
+
+    task = asyncio.ensure_future(run())
+    _revalidating.add(task)
+    task.add_done_callback(_revalidating.discard)
+
+
+async def cached_read(table: str, key: Any, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    # fetch() queries the upstream; the result is cached unless a write raced it
+    value = read_cache.get(table, key)
+    if value is not None:
+        return value
+
+    snapshot = snapshots.get(table, key)
+    if snapshot is not None:
+        value, fetched_at, generation = snapshot
+        # Only expired (not invalidated) data may be served while revalidating
+        if CACHE_ENABLED and generation == read_cache.generation(table) and time.time() - fetched_at < read_cache.ttl_for(table) + CACHE_STALE_TTL:
+            _revalidate(table, key, fetch)
+            return value
+
+    try:
+        return await _refresh(table, key, fetch)
+    except Exception as e:
+        if not is_upstream_failure(e):
+            raise
+        if snapshot is None or time.time() - snapshot[1] > CACHE_SNAPSHOT_MAX_AGE:
+            raise
+        value, fetched_at, _ = snapshot
+        print(f"Serving stale {table} snapshot ({int(time.time() - fetched_at)}s old): {e}")
+        mark_stale(time.time() - fetched_at)
+        return value
+
+
+def stale_row(table: str, row_id: Any) -> Optional[dict]:
+    # A single row out of the table's list snapshot, for detail endpoints
+    snapshot = snapshots.get(table, "list")
+    if snapshot is None or time.time() - snapshot[1] > CACHE_SNAPSHOT_MAX_AGE:
+        return None
+    for row in snapshot[0]:
+        if str(row.get("id")) == str(row_id):
+            mark_stale(time.time() - snapshot[1])
+            return row
+    return None
@@ -0,0 +1,30 @@
+from typing import Callable, List, Optional
+
+from cache import read_cache
+
+# Write handlers report what they changed here instead of only dropping the
+# read cache, so in-process derived data (the search index, ...) can be
+# updated incrementally. `rows` are the rows returned by the write; None
+# means "the table changed, rows unknown" (e.g. a bulk reorder).
+
+ChangeListener = Callable[[str, Optional[List[dict]], bool], None]
+
+_listeners: List[ChangeListener] = []
+
+
+def subscribe(listener: ChangeListener) -> ChangeListener:
+    if listener not in _listeners:
+        _listeners.append(listener)
+    return listener
+
+
+def publish_change(table: str, rows: Optional[List[dict]] = None, deleted: bool = False) -> None:
+    read_cache.invalidate(table)
+    if isinstance(rows, dict):
+        rows = [rows]
+    for listener in list(_listeners):
+        try:
+            listener(table, rows, deleted)
+        except Exception as e:
+            # A broken listener must not fail the write that already succeeded
+            print(f"Change listener {getattr(listener, '__name__', listener)} failed for {table}: {e}")
@@ -1,13 +1,50 @@
 import os
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Optional
 from dotenv import load_dotenv
+from repository import AsyncSupabase
 
 load_dotenv()
 
+# "supabase" (default) or "sqlite" for running without a Supabase project
+DATA_BACKEND: str = os.environ.get("DATA_BACKEND", "supabase").lower()
+SQLITE_PATH: str = os.environ.get("SQLITE_PATH", "local.db")
+
 url: str = os.environ.get("SUPABASE_URL", "")
 key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "") or os.environ.get("SUPABASE_KEY", "")
 
-if not url or not key:
-    print("Warning: SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY/SUPABASE_KEY not found in environment variables.")
+if TYPE_CHECKING:
+    from supabase import Client
+
+_supabase: Optional["Client"] = None
+
+if DATA_BACKEND == "sqlite":
+    from sqlite_repository import SQLiteDatabase
+
+    # Async repository used by the API routers
+    db = SQLiteDatabase(SQLITE_PATH)
+elif DATA_BACKEND == "supabase":
+    if not url or not key:
+        print("Warning: SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY/SUPABASE_KEY not found in environment variables.")
+
+    # Async repository used by the API routers; its HTTP client is created on first query
+    db = AsyncSupabase(url, key)
+else:
+    raise RuntimeError(f"Unknown DATA_BACKEND: {DATA_BACKEND} (expected 'supabase' or 'sqlite')")
+
+
+def get_supabase() -> Optional["Client"]:
+    # Sync supabase-py client, used by the CLI scripts (storage setup, admin
+    # creation). Built on first use: the SDK is slow to import and the API
+    # itself only needs `db`.
+    global _supabase
+    if _supabase is None and DATA_BACKEND == "supabase":
+        from supabase import create_client
+        _supabase = create_client(url, key)
+    return _supabase
+
 
-supabase: Client = create_client(url, key)
+def __getattr__(name: str):
+    # Keeps `from database import supabase` working for the scripts
+    if name == "supabase":
+        return get_supabase()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from typing import Optional, Set
+
+# Duplicate detection for the public application forms.
+# Each submission is reduced to a fingerprint of its normalized
+# (phone, exhibition_id / target_city, type) and looked up in two rotating
+# hash sets: `current` collects this generation, `previous` the one before.
+# Both are checked, so a fingerprint is remembered for between one and two
+# DEDUP_WINDOW_SECONDS; on rotation the older set is dropped whole, so there
+# is no per-entry expiry and no database read on the submit path.
+# Fingerprints are 64-bit keyed BLAKE2 digests; unlike a Bloom filter a hit
+# is exact up to a 64-bit collision, so a real applicant is never turned away.
+# Memory is capped by DEDUP_MAX_ENTRIES per set: a full set rotates early,
+# shortening the window rather than growing.
+# State is per process; after a restart, or across instances, a repeat can
+# get through once per process.
+
+DEDUP_ENABLED = os.environ.get("DEDUP_ENABLED", "1") != "0"
+DEDUP_WINDOW_SECONDS = float(os.environ.get("DEDUP_WINDOW_SECONDS", "600"))
+DEDUP_MAX_ENTRIES = int(os.environ.get("DEDUP_MAX_ENTRIES", "100000"))
+
+# Per-process key, so fingerprints cannot be precomputed to collide
+_KEY = os.urandom(16)
+_NON_DIGITS = re.compile(r"\D+")
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    # "+86 138-0000-0000", "008613800000000" and "13800000000" are one number
+    digits = _NON_DIGITS.sub("", phone or "")
+    for prefix in ("0086", "86"):
+        if digits.startswith(prefix) and len(digits) - len(prefix) == 11:
+            return digits[len(prefix):]
+    return digits
+
+
+def normalize_text(value: Optional[str]) -> str:
+    # Full-width forms, case and spacing do not make a submission new
+    return " ".join(unicodedata.normalize("NFKC", value or "").lower().split())
+
+
+def fingerprint(*parts: str) -> int:
+    digest = hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=8, key=_KEY).digest()
+    return int.from_bytes(digest, "big")
+
+
+def partner_fingerprint(data: dict) -> int:
+    return fingerprint("partner", normalize_phone(data.get("phone")), normalize_text(data.get("target_city")))
+
+
+def exhibition_fingerprint(data: dict) -> int:
+    return fingerprint(
+        "exhibition",
+        normalize_phone(data.get("phone")),
+        str(data.get("exhibition_id") or "").strip().lower(),
+        str(data.get("type") or ""),
+    )
+
+
+class SubmissionDeduper:
+    def __init__(self, window: float = DEDUP_WINDOW_SECONDS, max_entries: int = DEDUP_MAX_ENTRIES, enabled: bool = DEDUP_ENABLED):
+        self.enabled = enabled
+        self.window = window
+        self.max_entries = max_entries
+        self._current: Set[int] = set()
+        self._previous: Set[int] = set()
+        self._rotated_at = time.monotonic()
+        self.duplicates = 0
+        self.early_rotations = 0
+
+    def _rotate(self) -> None:
+        now = time.monotonic()
+        if now - self._rotated_at >= 2 * self.window:
+            # Idle for two windows: everything has expired
+            self._previous, self._current = set(), set()
+            self._rotated_at = now
+        elif now - self._rotated_at >= self.window:
+            # Generations stay aligned to the window, so nothing outlives two of them
+            self._previous, self._current = self._current, set()
+            self._rotated_at += self.window
+        elif len(self._current) >= self.max_entries:
+            self._previous, self._current = self._current, set()
+            self._rotated_at = now
+            self.early_rotations += 1
+
+    def check_and_add(self, key: int) -> bool:
+        # True when `key` was seen within the window; otherwise records it.
+        # No await in between, so concurrent submissions cannot both pass.
+        if not self.enabled:
+            return False
+        self._rotate()
+        if key in self._current or key in self._previous:
+            self.duplicates += 1
+            return True
+        self._current.add(key)
+        return False
+
+    def discard(self, key: int) -> None:
+        # The submission was not stored after all; let a retry through
+        self._current.discard(key)
+        self._previous.discard(key)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._current) + len(self._previous),
+            "duplicates": self.duplicates,
+            "early_rotations": self.early_rotations,
+        }
+
+
+submission_dedup = SubmissionDeduper()
@@ -0,0 +1,192 @@
+import re
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from changes import subscribe
+from images import with_thumbnails
+
+# In-process calendar index for /api/exhibitions?city=&from=&to=&featured=.
+# supabase_schema.sql declares start_date/end_date as TEXT while
+# supabase_schema_exhibitions.sql uses DATE, and the model carries plain
+# strings, so dates are parsed leniently here ("2025-03-01", "2025/3/1",
+# "2025年3月1日", timestamps) and compared as dates, never as text.
+# Every bucket (all rows, featured rows, rows per city) keeps
+# (start, id) sorted; a date-range query bisects to the rows starting
+# before `to` and no earlier than `from` minus the longest exhibition in the
+# bucket, so it never scans the table.
+
+_DATE = re.compile(r"^\s*(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})")
+
+
+def parse_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+    match = _DATE.match(str(value))
+    if match is None:
+        return None
+    try:
+        return date(*(int(part) for part in match.groups()))
+    except ValueError:
+        return None
+
+
+def normalize_date(value) -> Optional[str]:
+    # ISO text sorts and compares correctly in both TEXT and DATE columns
+    parsed = parse_date(value)
+    return parsed.isoformat() if parsed else None
+
+
+class _Bucket:
+    def __init__(self):
+        self.keys: List[Tuple[date, str]] = []
+        # Only grows between rebuilds, which keeps range queries correct
+        self.max_days = 0
+
+    def add(self, start: date, end: date, row_id: str) -> None:
+        insort(self.keys, (start, row_id))
+        self.max_days = max(self.max_days, (end - start).days)
+
+    def discard(self, start: date, row_id: str) -> None:
+        i = bisect_left(self.keys, (start, row_id))
+        if i < len(self.keys) and self.keys[i] == (start, row_id):
+            del self.keys[i]
+
+    def overlapping(self, date_from: Optional[date], date_to: Optional[date]) -> List[Tuple[date, str]]:
+        lo = 0
+        if date_from is not None:
+            lo = bisect_left(self.keys, (date_from - timedelta(days=self.max_days), ""))
+        hi = len(self.keys)
+        if date_to is not None:
+            hi = bisect_right(self.keys, (date_to, "￿"))
+        return self.keys[lo:hi]
+
+
+class ExhibitionCalendar:
+    def __init__(self):
+        # id -> (start, end, city, featured, row)
+        self._entries: Dict[str, tuple] = {}
+        self._all = _Bucket()
+        self._featured = _Bucket()
+        self._cities: Dict[str, _Bucket] = {}
+        # Rows whose dates cannot be parsed: listed only when no range is asked for
+        self._undated: Dict[str, dict] = {}
+        self._synced_from: Optional[list] = None
+        self.reindexed = 0
+
+    def _buckets(self, city: str, featured: bool) -> List[_Bucket]:
+        buckets = [self._all, self._cities.setdefault(city, _Bucket())]
+        if featured:
+            buckets.append(self._featured)
+        return buckets
+
+    def upsert(self, row: dict) -> None:
+        if row.get("id") is None:
+            return
+        row_id = str(row["id"])
+        start = parse_date(row.get("start_date"))
+        end = parse_date(row.get("end_date")) or start
+        city = (row.get("city") or "").strip()
+        featured = bool(row.get("featured"))
+
+        current = self._entries.get(row_id)
+        if current is not None and current[:4] == (start, end, city, featured):
+            # Same position in every bucket; just keep the latest row
+            self._entries[row_id] = current[:4] + (row,)
+            return
+        if current is None and row_id in self._undated and start is None:
+            self._undated[row_id] = row
+            return
+        self.remove(row_id)
+        if start is None:
+            print(f"Exhibition {row_id} has an unparseable start_date: {row.get('start_date')!r}")
+            self._undated[row_id] = row
+            return
+        end = max(end, start)
+        for bucket in self._buckets(city, featured):
+            bucket.add(start, end, row_id)
+        self._entries[row_id] = (start, end, city, featured, row)
+        self.reindexed += 1
+
+    def remove(self, row_id) -> None:
+        row_id = str(row_id)
+        self._undated.pop(row_id, None)
+        current = self._entries.pop(row_id, None)
+        if current is None:
+            return
+        start, _, city, featured, _ = current
+        for bucket in self._buckets(city, featured):
+            bucket.discard(start, row_id)
+
+    def sync(self, rows: list) -> None:
+        # Called with the cached list; unchanged rows keep their positions
+        if self._synced_from is rows:
+            return
+        seen = set()
+        for row in rows:
+            self.upsert(row)
+            seen.add(str(row.get("id")))
+        for row_id in [i for i in list(self._entries) + list(self._undated) if i not in seen]:
+            self.remove(row_id)
+        self._synced_from = rows
+
+    def apply_change(self, table: str, rows: Optional[List[dict]], deleted: bool) -> None:
+        if table != "exhibitions" or self._synced_from is None:
+            return
+        if rows is None:
+            self._synced_from = None
+            return
+        for row in rows:
+            if deleted:
+                self.remove(row.get("id"))
+            else:
+                self.upsert(with_thumbnails("exhibitions", [dict(row)])[0])
+
+    def query(
+        self,
+        city: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        featured: Optional[bool] = None,
+    ) -> List[dict]:
+        # Rows overlapping [date_from, date_to], newest start first
+        if city is not None:
+            bucket = self._cities.get(city.strip()) or _Bucket()
+        elif featured:
+            bucket = self._featured
+        else:
+            bucket = self._all
+
+        rows = []
+        for start, row_id in reversed(bucket.overlapping(date_from, date_to)):
+            _, end, _, is_featured, row = self._entries[row_id]
+            if date_from is not None and end < date_from:
+                continue
+            if featured is not None and is_featured != featured:
+                continue
+            rows.append(row)
+
+        if date_from is None and date_to is None:
+            for row_id, row in sorted(self._undated.items(), reverse=True):
+                if city is not None and (row.get("city") or "").strip() != city.strip():
+                    continue
+                if featured is not None and bool(row.get("featured")) != featured:
+                    continue
+                rows.append(row)
+        return rows
+
+    def stats(self) -> dict:
+        return {
+            "exhibitions": len(self._entries),
+            "undated": len(self._undated),
+            "cities": sum(1 for bucket in self._cities.values() if bucket.keys),
+            "reindexed": self.reindexed,
+        }
+
+
+exhibition_calendar = ExhibitionCalendar()
+subscribe(exhibition_calendar.apply_change)
@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Iterable, List, Tuple, Type
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from pagination import fetch_page
+
+# Streaming CSV / NDJSON export for large tables.
+# Rows are read one keyset page at a time and each page is written out as
+# soon as it arrives (in ~64KB chunks), so memory stays flat, the first rows
+# go out before the table is read, and a slow export never goes quiet for
+# longer than one page takes to load.
+
+EXPORT_PAGE_SIZE = 500
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+EXPORT_CHUNK_BYTES = 65536
+
+
+async def iter_pages(
+    table: str,
+    sort_key: str,
+    model: Type[BaseModel],
+    filters: Iterable[Tuple[str, str, Any]] = (),
+) -> AsyncIterator[List[dict]]:
+    fields = ",".join(model.model_fields)
+    filters = list(filters)
+    cursor = None
+    while True:
+        page = await fetch_page(table, sort_key, model, EXPORT_PAGE_SIZE, cursor, fields, filters)
+        if page.rows:
+            yield page.rows
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+
+
+# Cells starting with these are evaluated as formulas by Excel / Sheets
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value) -> str:
+    if value is None:
+        return ""
+    # Form fields are user input: a leading ' keeps "=HYPERLINK(...)" plain text
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def _csv_chunks(pages: AsyncIterator[List[dict]], columns: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so Excel opens the Chinese text as UTF-8
+    writer.writerow(columns)
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+
+    async for rows in pages:
+        for row in rows:
+            writer.writerow([_csv_cell(row.get(c)) for c in columns])
+            # Flush roughly every 64KB rather than per row
+            if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        # ...and at the end of every page, before waiting for the next one
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+
+async def _ndjson_chunks(pages: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    async for rows in pages:
+        lines = []
+        size = 0
+        for row in rows:
+            line = json.dumps(row, ensure_ascii=False, default=str) + "\n"
+            lines.append(line)
+            size += len(line)
+            if size >= EXPORT_CHUNK_BYTES:
+                yield "".join(lines).encode("utf-8")
+                lines = []
+                size = 0
+        # Never hold rows back while the next page loads
+        if lines:
+            yield "".join(lines).encode("utf-8")
+
+
+async def _logged(chunks: AsyncIterator[bytes], table: str) -> AsyncIterator[bytes]:
+    # Headers are already sent once streaming starts: re-raising aborts the
+    # response, so the client sees a failed download instead of a short file
+    try:
+        async for chunk in chunks:
+            yield chunk
+    except Exception as e:
+        print(f"Error exporting {table}: {e}")
+        raise
+
+
+def export_response(
+    table: str,
+    sort_key: str,
+    model: Type[BaseModel],
+    fmt: str,
+    filters: Iterable[Tuple[str, str, Any]] = (),
+) -> StreamingResponse:
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt} (use csv or ndjson)")
+
+    pages = iter_pages(table, sort_key, model, filters)
+    chunks = _csv_chunks(pages, list(model.model_fields)) if fmt == "csv" else _ndjson_chunks(pages)
+    filename = f"{table}-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{fmt}"
+    return StreamingResponse(
+        _logged(chunks, table),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
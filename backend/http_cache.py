@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Union, get_args, get_origin
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+
+from metrics import record_phase
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+# Conditional GET support (ETag / If-None-Match).
+# The ETag is a hash of the exact response body, so it is stable across
+# serverless instances and changes whenever the content does. There is no
+# Last-Modified: rows carry no updated_at, and a timestamp taken from the
+# rows cannot see updates or deletes, only the body hash can.
+
+CACHE_CONTROL = "no-cache"
+
+# Trusted rendering (see render_trusted); TRUSTED_JSON=0 validates everything again
+TRUSTED_JSON = os.environ.get("TRUSTED_JSON", "1") != "0"
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def _adapter(model: Any) -> TypeAdapter:
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters[model] = TypeAdapter(model)
+    return adapter
+
+
+def dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=jsonable_encoder)
+    return json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def render_json(data: Any, model: Any = None, exclude_unset: bool = False) -> bytes:
+    # Same validation/filtering as FastAPI's response_model, then compact JSON
+    start = time.perf_counter()
+    if model is not None:
+        adapter = _adapter(model)
+        validated = adapter.validate_python(data)
+        validated_at = time.perf_counter()
+        record_phase("validate", validated_at - start)
+        body = adapter.dump_json(validated, exclude_unset=exclude_unset)
+        record_phase("serialize", time.perf_counter() - validated_at)
+        return body
+    body = dumps(data)
+    record_phase("serialize", time.perf_counter() - start)
+    return body
+
+
+# Trusted path for rows read from our own repository. The rows already have
+# the model's shape, so instead of building a model per row we only do what
+# validation would change in the output: drop columns the model does not
+# declare and fill in defaults for missing ones. Rows whose keys already match
+# the model are passed through untouched.
+
+_projectors: Dict[Any, Optional[Callable[[Any], Any]]] = {}
+
+
+def _build_projector(tp: Any, exclude_unset: bool) -> Optional[Callable[[Any], Any]]:
+    origin = get_origin(tp)
+    if origin in (list, List):
+        (item_type,) = get_args(tp) or (Any,)
+        item = _projector(item_type, exclude_unset)
+        if item is None:
+            return None
+        return lambda rows: [item(row) for row in rows]
+    if origin is Union:
+        options = [arg for arg in get_args(tp) if arg is not type(None)]
+        return _projector(options[0], exclude_unset) if len(options) == 1 else None
+    if not (isinstance(tp, type) and issubclass(tp, BaseModel)):
+        return None
+
+    names = frozenset(tp.model_fields)
+    specs = []
+    for name, field in tp.model_fields.items():
+        required = field.is_required()
+        default = None if required else field.get_default(call_default_factory=True)
+        specs.append((name, _projector(field.annotation, exclude_unset), required, default))
+    passthrough = all(sub is None for _, sub, _, _ in specs)
+
+    def project(row: dict) -> dict:
+        if passthrough and row.keys() == names:
+            return row
+        out = {}
+        for name, sub, required, default in specs:
+            if name in row:
+                value = row[name]
+                out[name] = sub(value) if sub is not None and value is not None else value
+            elif not required and not exclude_unset:
+                out[name] = default
+        return out
+
+    return project
+
+
+def _projector(tp: Any, exclude_unset: bool = False) -> Optional[Callable[[Any], Any]]:
+    key = (tp, exclude_unset)
+    if key not in _projectors:
+        _projectors[key] = _build_projector(tp, exclude_unset)
+    return _projectors[key]
+
+
+def render_trusted(data: Any, model: Any = None, exclude_unset: bool = False) -> bytes:
+    if not TRUSTED_JSON:
+        return render_json(data, model, exclude_unset)
+    start = time.perf_counter()
+    project = _projector(model, exclude_unset) if model is not None else None
+    body = dumps(project(data) if project is not None else data)
+    record_phase("serialize", time.perf_counter() - start)
+    return body
+
+
+class TrustedJSONResponse(Response):
+    # Opt-in response class for handlers returning repository rows as-is:
+    #   return TrustedJSONResponse(rows, model=List[Product])
+    media_type = "application/json"
+
+    def __init__(self, content: Any, model: Any = None, exclude_unset: bool = False, **kwargs):
+        self.model = model
+        self.exclude_unset = exclude_unset
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return render_trusted(content, self.model, self.exclude_unset)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    return if_none_match is not None and _etag_matches(if_none_match, etag)
+
+
+def conditional_json(request: Request, data: Any, model: Any = None, exclude_unset: bool = False, trusted: bool = False) -> Response:
+    # trusted=True: data comes straight from our repository, skip per-row validation
+    body = render_trusted(data, model, exclude_unset) if trusted else render_json(data, model, exclude_unset)
+    etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
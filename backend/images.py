@@ -0,0 +1,270 @@
+import asyncio
+import io
+import json
+import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from database import db
+
+# Image derivatives for uploaded pictures.
+# The admin uploader puts the original straight into Storage through a signed
+# URL (create_upload), then asks for derivatives of the stored object
+# (process_stored): serverless request bodies are capped at a few MB, far
+# below IMAGE_MAX_BYTES. Backends without direct upload (SQLite) POST the
+# file to the API instead (read_upload + process_upload).
+# An upload is decoded once, scaled down to each width bucket and encoded in
+# modern formats on a small worker pool (Pillow releases the GIL while
+# resizing/encoding). Everything is stored beside the original:
+#   images/<key>/original.<ext>   the file as uploaded
+#   images/<key>/w<width>.<fmt>   derivatives, e.g. w320.webp, w640.avif
+#   images/<key>/manifest.json    the srcset manifest returned by the upload
+# Because the layout is fixed, list endpoints can derive a card thumbnail
+# from the stored image URL without a schema change (thumbnail_url).
+
+IMAGE_BUCKET = os.environ.get("IMAGE_BUCKET", "images")
+IMAGE_WIDTHS = sorted(int(w) for w in os.environ.get("IMAGE_WIDTHS", "320,640,1024,1600").split(","))
+# Preferred first; formats this Pillow build cannot encode are skipped (and logged)
+IMAGE_FORMATS = [f.strip().lower() for f in os.environ.get("IMAGE_FORMATS", "avif,webp").split(",") if f.strip()]
+IMAGE_QUALITY = int(os.environ.get("IMAGE_QUALITY", "75"))
+IMAGE_MAX_BYTES = int(os.environ.get("IMAGE_MAX_BYTES", str(20 * 1024 * 1024)))
+IMAGE_MAX_PIXELS = int(os.environ.get("IMAGE_MAX_PIXELS", str(50_000_000)))
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", "2"))
+THUMBNAIL_WIDTH = IMAGE_WIDTHS[0]
+THUMBNAIL_FORMAT = os.environ.get("THUMBNAIL_FORMAT", "webp")
+
+# Column each table's thumbnail is derived from
+THUMBNAIL_SOURCES = {
+    "products": "image",
+    "news_items": "image",
+    "exhibitions": "image",
+    "associations": "logo",
+}
+
+ORIGINAL_TYPES = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "GIF": ("gif", "image/gif"),
+    "WEBP": ("webp", "image/webp"),
+    "AVIF": ("avif", "image/avif"),
+}
+DERIVATIVE_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+ORIGINAL_EXTENSIONS = {ext for ext, _ in ORIGINAL_TYPES.values()} | {"jpeg"}
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+_image_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image")
+_encoders: Optional[List[str]] = None
+
+
+def _available_formats() -> List[str]:
+    # Derivative formats, preferred first; the thumbnail format is always included
+    global _encoders
+    if _encoders is None:
+        from PIL import features
+        wanted = IMAGE_FORMATS + ([THUMBNAIL_FORMAT] if THUMBNAIL_FORMAT not in IMAGE_FORMATS else [])
+        _encoders = [fmt for fmt in wanted if fmt in DERIVATIVE_TYPES and features.check(fmt)]
+        skipped = [fmt for fmt in wanted if fmt not in _encoders]
+        if skipped:
+            # AVIF needs Pillow >= 11.3 (see requirements.txt)
+            print(f"IMAGE_FORMATS not supported by this Pillow build, skipped: {', '.join(skipped)}")
+        if THUMBNAIL_FORMAT not in _encoders:
+            raise RuntimeError(f"THUMBNAIL_FORMAT={THUMBNAIL_FORMAT} cannot be encoded by this Pillow build")
+    return _encoders
+
+
+def _encode(image, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == "avif":
+        image.save(buffer, "AVIF", quality=IMAGE_QUALITY, speed=8)
+    else:
+        image.save(buffer, "WEBP", quality=IMAGE_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def build_derivatives(data: bytes) -> dict:
+    # Runs on the worker pool: decode once, then scale down bucket by bucket
+    from PIL import Image, ImageOps
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        source_format = image.format
+        stored_width, stored_height = image.size
+    except Exception:
+        raise HTTPException(status_code=400, detail="Unsupported or corrupt image")
+    if source_format not in ORIGINAL_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported image format: {source_format}")
+    if stored_width * stored_height > IMAGE_MAX_PIXELS:
+        raise HTTPException(status_code=413, detail=f"Image too large ({stored_width}x{stored_height})")
+
+    # EXIF orientations 5-8 are stored sideways
+    sideways = image.getexif().get(0x0112, 1) in (5, 6, 7, 8)
+    width, height = (stored_height, stored_width) if sideways else (stored_width, stored_height)
+
+    # Buckets narrower than the image; an image narrower than the smallest
+    # bucket is still stored under that bucket's name, at its own size
+    buckets = [(w, w) for w in IMAGE_WIDTHS if w < width] or [(IMAGE_WIDTHS[0], width)]
+
+    # JPEG can decode straight at a reduced scale, far cheaper than full size
+    scale = max(w for _, w in buckets) / width
+    image.draft("RGB", (max(1, round(stored_width * scale)), max(1, round(stored_height * scale))))
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    derivatives = []
+    current = image
+    for bucket, target in sorted(buckets, reverse=True):
+        target_height = max(1, round(height * target / width))
+        if current.size != (target, target_height):
+            # Each bucket is scaled from the previous (larger) one
+            current = current.resize((target, target_height), Image.LANCZOS)
+        for fmt in _available_formats():
+            derivatives.append({
+                "bucket": bucket,
+                "width": target,
+                "height": target_height,
+                "format": fmt,
+                "data": _encode(current, fmt),
+            })
+
+    ext, content_type = ORIGINAL_TYPES[source_format]
+    return {"width": width, "height": height, "ext": ext, "content_type": content_type, "derivatives": derivatives}
+
+
+def _object_path(key: str, name: str) -> str:
+    return f"{key}/{name}"
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Image larger than {IMAGE_MAX_BYTES // (1024 * 1024)} MB")
+
+
+async def read_upload(file: UploadFile) -> bytes:
+    # Stops as soon as the limit is passed instead of reading the whole body first
+    chunks, size = [], 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            return b"".join(chunks)
+        size += len(chunk)
+        if size > IMAGE_MAX_BYTES:
+            raise _too_large()
+        chunks.append(chunk)
+
+
+async def create_upload(filename: str) -> dict:
+    # Where the client should put the original; upload_url is None when the
+    # backend has no direct upload and the file must be POSTed instead
+    ext = os.path.splitext(filename)[1].lstrip(".").lower()
+    if ext not in ORIGINAL_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Unsupported image type: {filename}")
+    path = _object_path(uuid.uuid4().hex, f"original.{ext}")
+    upload_url = await db.signed_upload_url(IMAGE_BUCKET, path)
+    return {"path": path, "upload_url": upload_url, "max_bytes": IMAGE_MAX_BYTES}
+
+
+async def _build(data: bytes) -> dict:
+    return await asyncio.get_running_loop().run_in_executor(_image_executor, build_derivatives, data)
+
+
+async def process_stored(path: str) -> dict:
+    # Derivatives for an original the client uploaded through create_upload
+    if not _ORIGINAL_PATH.match(path):
+        raise HTTPException(status_code=400, detail="Invalid image path")
+    data = await db.download(IMAGE_BUCKET, path)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Uploaded image not found")
+    if len(data) > IMAGE_MAX_BYTES:
+        raise _too_large()
+    result = await _build(data)
+    key = path.split("/", 1)[0]
+    return await _store_derivatives(key, db.public_url(IMAGE_BUCKET, path), result)
+
+
+async def process_upload(data: bytes) -> dict:
+    if len(data) > IMAGE_MAX_BYTES:
+        raise _too_large()
+    result = await _build(data)
+    key = uuid.uuid4().hex
+    original_url = await db.upload(
+        IMAGE_BUCKET, _object_path(key, f"original.{result['ext']}"), data, result["content_type"]
+    )
+    return await _store_derivatives(key, original_url, result)
+
+
+async def _store_derivatives(key: str, original_url: str, result: dict) -> dict:
+    uploads = [
+        db.upload(
+            IMAGE_BUCKET,
+            _object_path(key, f"w{d['bucket']}.{d['format']}"),
+            d["data"],
+            DERIVATIVE_TYPES[d["format"]],
+        )
+        for d in result["derivatives"]
+    ]
+    urls = await asyncio.gather(*uploads)
+
+    derivatives = [
+        {"url": url, "width": d["width"], "height": d["height"], "type": DERIVATIVE_TYPES[d["format"]], "bytes": len(d["data"])}
+        for url, d in zip(urls, result["derivatives"])
+    ]
+    manifest = build_manifest(original_url, result["width"], result["height"], result["content_type"], derivatives)
+    await db.upload(
+        IMAGE_BUCKET,
+        _object_path(key, "manifest.json"),
+        json.dumps(manifest, ensure_ascii=False).encode("utf-8"),
+        "application/json",
+    )
+    return manifest
+
+
+def build_manifest(original_url: str, width: int, height: int, content_type: str, derivatives: List[dict]) -> dict:
+    sources = []
+    for fmt in _available_formats():
+        mime = DERIVATIVE_TYPES[fmt]
+        variants = sorted((d for d in derivatives if d["type"] == mime), key=lambda d: d["width"])
+        if variants:
+            sources.append({"type": mime, "srcset": ", ".join(f"{d['url']} {d['width']}w" for d in variants)})
+
+    # Fallback <img src> and card thumbnail: largest / smallest in the thumbnail format
+    compatible = [d for d in derivatives if d["type"] == DERIVATIVE_TYPES[THUMBNAIL_FORMAT]]
+    fallback = max(compatible, key=lambda d: d["width"], default=None)
+    thumbnail = min(compatible, key=lambda d: d["width"], default=None)
+    return {
+        "original": original_url,
+        "width": width,
+        "height": height,
+        "type": content_type,
+        "src": fallback["url"] if fallback else original_url,
+        "thumbnail": thumbnail["url"] if thumbnail else original_url,
+        "sources": sources,
+        "sizes": "(max-width: 640px) 100vw, (max-width: 1024px) 50vw, 33vw",
+        "derivatives": derivatives,
+    }
+
+
+_ORIGINAL_PATH = re.compile(r"^[0-9a-f]{32}/original\.[a-z0-9]+$")
+_ORIGINAL_URL = re.compile(r"^(?P<base>.*/" + re.escape(IMAGE_BUCKET) + r"/[0-9a-f]{32})/original\.[a-z0-9]+$")
+
+
+def thumbnail_url(image_url: Optional[str]) -> Optional[str]:
+    # Only images uploaded through /api/images have derivatives
+    if not image_url:
+        return None
+    match = _ORIGINAL_URL.match(image_url)
+    if match is None:
+        return None
+    return f"{match.group('base')}/w{THUMBNAIL_WIDTH}.{THUMBNAIL_FORMAT}"
+
+
+def with_thumbnails(table: str, rows: List[Dict]) -> List[Dict]:
+    source = THUMBNAIL_SOURCES.get(table)
+    if source is not None:
+        for row in rows:
+            if source in row:
+                row["thumbnail"] = thumbnail_url(row.get(source))
+    return rows
@@ -0,0 +1,243 @@
+import asyncio
+import glob
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+from changes import publish_change
+from database import db
+from dedup import submission_dedup
+from repository import APIError
+
+# Buffered intake for public form submissions.
+# submit() appends the row to a local spool file and returns at once; a
+# background task inserts the buffered rows in batches (by size or time).
+# Rows stay in the spool until their insert succeeds, and spools left behind
+# by a crashed process are replayed on startup. Spool I/O (with its fsync)
+# runs in a thread, under a lock so a rewrite never drops a concurrent append.
+# A row's dedup fingerprint is kept beside it in memory only (fingerprint
+# keys are per process, so they would mean nothing after a replay); a row
+# that ends up dead-lettered releases it, so a corrected retry gets through.
+#
+# Off by default on Vercel: /tmp is per-instance and background tasks are
+# frozen between invocations, so submissions are inserted directly there.
+
+INTAKE_ENABLED = os.environ.get("INTAKE_ENABLED", "0" if os.environ.get("VERCEL") else "1") != "0"
+INTAKE_BATCH_SIZE = int(os.environ.get("INTAKE_BATCH_SIZE", "50"))
+INTAKE_FLUSH_INTERVAL = float(os.environ.get("INTAKE_FLUSH_INTERVAL", "1.0"))
+INTAKE_SPOOL_DIR = os.environ.get("INTAKE_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "fanfei_intake"))
+INTAKE_FSYNC = os.environ.get("INTAKE_FSYNC", "1") != "0"
+INTAKE_MAX_BACKOFF = 30.0
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class IntakeQueue:
+    def __init__(self, table: str, batch_size: int = INTAKE_BATCH_SIZE, flush_interval: float = INTAKE_FLUSH_INTERVAL, spool_dir: str = INTAKE_SPOOL_DIR):
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_dir = spool_dir
+        self.dead_letter_path = os.path.join(spool_dir, f"{table}.rejected.jsonl")
+        self.submitted = 0
+        self.inserted = 0
+        self.rejected = 0
+        self._pending: List[dict] = []
+        # id(row) -> dedup fingerprint, for rows still pending
+        self._fingerprints: Dict[int, int] = {}
+        self._spool_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._backoff = 0.0
+
+    # Spool file
+
+    @property
+    def spool_path(self) -> str:
+        # One spool per process so several workers never share a file
+        return os.path.join(self.spool_dir, f"{self.table}.{os.getpid()}.jsonl")
+
+    def _append(self, path: str, rows: List[dict]) -> None:
+        os.makedirs(self.spool_dir, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+            if INTAKE_FSYNC:
+                os.fsync(f.fileno())
+
+    def _rewrite_spool(self, rows: List[dict]) -> None:
+        # Atomically replace the spool with whatever is still pending
+        if not rows:
+            if os.path.exists(self.spool_path):
+                os.remove(self.spool_path)
+            return
+        tmp_path = self.spool_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+            if INTAKE_FSYNC:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.spool_path)
+
+    def replay(self) -> int:
+        # Adopt spools of processes that are gone (crash, redeploy)
+        replayed = 0
+        for path in glob.glob(os.path.join(self.spool_dir, f"{self.table}.*.jsonl")):
+            pid = os.path.basename(path)[len(self.table) + 1:-len(".jsonl")]
+            if not pid.isdigit() or (int(pid) != os.getpid() and _pid_alive(int(pid))):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._pending.append(json.loads(line))
+                        replayed += 1
+                    except ValueError:
+                        print(f"Skipping corrupt spool line in {path}")
+            if path != self.spool_path:
+                os.remove(path)
+        if replayed:
+            self._rewrite_spool(self._pending)
+            print(f"Replaying {replayed} spooled {self.table} submissions")
+        return replayed
+
+    # Queue
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def submit(self, row: dict, fingerprint: Optional[int] = None) -> None:
+        async with self._spool_lock:
+            await asyncio.to_thread(self._append, self.spool_path, [row])
+            self._pending.append(row)
+            if fingerprint is not None:
+                self._fingerprints[id(row)] = fingerprint
+        self.submitted += 1
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _settle(self, count: int) -> None:
+        # The first `count` pending rows are in the database (or dead-lettered):
+        # drop them from the queue and the spool so they are never inserted again.
+        # New submissions only ever append, so they are still the prefix.
+        async with self._spool_lock:
+            for row in self._pending[:count]:
+                self._fingerprints.pop(id(row), None)
+            del self._pending[:count]
+            await asyncio.to_thread(self._rewrite_spool, list(self._pending))
+
+    async def _insert_one_by_one(self, batch: List[dict]) -> None:
+        # A data error fails the whole batch insert; isolate the bad rows.
+        # Each row is settled as soon as it is done, so an upstream failure
+        # halfway through leaves only the rows not yet inserted.
+        inserted = 0
+        try:
+            for row in batch:
+                try:
+                    await db.table(self.table).insert(row).execute()
+                    self.inserted += 1
+                    inserted += 1
+                except APIError as e:
+                    if e.status_code is not None and e.status_code >= 500:
+                        raise
+                    print(f"Rejected {self.table} submission: {e}")
+                    await asyncio.to_thread(self._append, self.dead_letter_path, [row])
+                    self.rejected += 1
+                    fingerprint = self._fingerprints.get(id(row))
+                    if fingerprint is not None:
+                        submission_dedup.discard(fingerprint)
+                await self._settle(1)
+        finally:
+            if inserted:
+                publish_change(self.table, None)
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch = self._pending[:self.batch_size]
+        try:
+            try:
+                response = await db.table(self.table).insert(batch).execute()
+            except APIError as e:
+                if e.status_code is None or e.status_code >= 500:
+                    raise
+                await self._insert_one_by_one(batch)
+                self._backoff = 0.0
+                return len(batch)
+        except Exception as e:
+            # Upstream is down or slow; keep what is left spooled and retry later
+            print(f"Error flushing {self.table} intake ({len(self._pending)} pending): {e}")
+            self._backoff = min(max(self._backoff * 2, self.flush_interval), INTAKE_MAX_BACKOFF)
+            return 0
+        self.inserted += len(batch)
+        self._backoff = 0.0
+        await self._settle(len(batch))
+        publish_change(self.table, response.data)
+        return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval + self._backoff)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._pending:
+                if not await self.flush():
+                    break
+
+    async def start(self) -> None:
+        self.replay()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._pending:
+            if not await self.flush():
+                break
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+        }
+
+
+partner_intake = IntakeQueue("partner_applications")
+exhibition_intake = IntakeQueue("exhibition_applications")
+QUEUES = (partner_intake, exhibition_intake)
+
+
+async def start_intake() -> None:
+    if INTAKE_ENABLED:
+        for queue in QUEUES:
+            await queue.start()
+
+
+async def stop_intake() -> None:
+    if INTAKE_ENABLED:
+        for queue in QUEUES:
+            await queue.stop()
@@ -1,6 +1,18 @@
-from fastapi import FastAPI
+import importlib
+import os
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routers import solutions, products, partners, news, auth, exhibitions, associations
+from fastapi.responses import JSONResponse, PlainTextResponse
+from auth_utils import token_cache
+from cache import read_cache
+from database import DATA_BACKEND, db
+from dedup import submission_dedup
+from intake import QUEUES, start_intake, stop_intake
+from metrics import MetricsMiddleware, gauge, render_prometheus
+from rate_limit import RateLimitMiddleware, rate_limiter
+from resilience import STALE_HEADER, StaleHeaderMiddleware, UpstreamUnavailable, breakers, retry_after_header
+from singleflight import singleflight
+from static_export import configure_snapshots, stop_snapshots
 
 app = FastAPI(
     title="Fanfei UAV Platform API",
@@ -19,22 +31,127 @@ origins = [
     "*"
 ]
 
+# Flags responses served from a last-known-good snapshot (inside CORS)
+app.add_middleware(StaleHeaderMiddleware)
+
+# Per-IP token buckets; inside CORS so browsers can read the 429, and
+# ahead of routing so a rejected request costs no DB access or hashing
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Link", STALE_HEADER, "Retry-After"],
 )
 
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailable):
+    # Supabase is down or its circuit is open and there is nothing stale to serve
+    print(f"Upstream unavailable for {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily unavailable, please retry shortly"},
+        headers={"Retry-After": retry_after_header(exc)},
+    )
+
 # Include Routers
-app.include_router(solutions.router)
-app.include_router(products.router)
-app.include_router(partners.router)
-app.include_router(news.router)
-app.include_router(auth.router)
-app.include_router(exhibitions.router)
-app.include_router(associations.router)
+# Routers are imported and mounted on the first request under their prefix,
+# so a cold start only pays for the router it actually serves.
+# LAZY_ROUTERS=0 mounts everything at import time instead.
+LAZY_ROUTERS = os.environ.get("LAZY_ROUTERS", "1") != "0"
+ROUTERS = {
+    "/api/solutions": "routers.solutions",
+    "/api/products": "routers.products",
+    "/api/partners": "routers.partners",
+    "/api/news": "routers.news",
+    "/api/auth": "routers.auth",
+    "/api/exhibitions": "routers.exhibitions",
+    "/api/associations": "routers.associations",
+    "/api/bootstrap": "routers.bootstrap",
+    "/api/images": "routers.images",
+    "/api/search": "routers.search",
+    "/api/admin": "routers.admin",
+}
+# These describe the whole API, so they need every router mounted
+FULL_SCHEMA_PATHS = ("/docs", "/redoc", "/openapi.json")
+_mounted = set()
+
+def mount_router(prefix: str):
+    if prefix not in _mounted:
+        module = importlib.import_module(ROUTERS[prefix])
+        app.include_router(module.router)
+        _mounted.add(prefix)
+
+def mount_all_routers():
+    for prefix in ROUTERS:
+        mount_router(prefix)
+
+class LazyRouterMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and len(_mounted) < len(ROUTERS):
+            path = scope["path"]
+            if path in FULL_SCHEMA_PATHS:
+                mount_all_routers()
+            else:
+                for prefix in ROUTERS:
+                    if path == prefix or path.startswith(prefix + "/"):
+                        mount_router(prefix)
+                        break
+        await self.app(scope, receive, send)
+
+if LAZY_ROUTERS:
+    app.add_middleware(LazyRouterMiddleware)
+else:
+    mount_all_routers()
+
+# With the SQLite backend, uploaded images are stored and served locally
+if DATA_BACKEND == "sqlite":
+    from fastapi.staticfiles import StaticFiles
+    app.mount("/media", StaticFiles(directory=db.media_dir, check_dir=False), name="media")
+
+# Optional static snapshots (SNAPSHOT_DIR / SNAPSHOT_BUCKET), refreshed after admin writes
+configure_snapshots(app)
+
+# Outermost, so the timings include every other middleware
+app.add_middleware(MetricsMiddleware, router=app.router)
+
+# Optional bearer token for /metrics (set it when the API is public)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    cache_stats = read_cache.stats()
+    flight_stats = singleflight.stats()["by_namespace"]
+    tokens = token_cache.stats()
+    extra = []
+    extra += gauge("read_cache_entries", "Entries in the read cache", [({}, cache_stats["entries"])])
+    extra += gauge("read_cache_requests_total", "Read cache lookups", [({"result": "hit"}, cache_stats["hits"]), ({"result": "miss"}, cache_stats["misses"])], kind="counter")
+    extra += gauge("singleflight_calls_total", "Reads that ran upstream vs. joined an in-flight one", [({"table": t, "result": r}, s[r]) for t, s in flight_stats.items() for r in ("executed", "coalesced")], kind="counter")
+    extra += gauge("circuit_breaker_state", "0 closed, 1 half-open, 2 open", [({"table": name}, BREAKER_STATES[b.state]) for name, b in breakers.items()])
+    extra += gauge("submission_duplicates_total", "Public form submissions dropped as duplicates", [({}, submission_dedup.stats()["duplicates"])], kind="counter")
+    extra += gauge("intake_pending", "Buffered submissions not yet inserted", [({"table": q.table}, q.stats()["pending"]) for q in QUEUES])
+    extra += gauge("rate_limited_total", "Requests rejected with 429", [({"group": g}, n) for g, n in rate_limiter.stats()["rejected"].items()], kind="counter")
+    extra += gauge("token_cache_requests_total", "Verified-JWT cache lookups", [({"result": "hit"}, tokens["hits"]), ({"result": "miss"}, tokens["misses"])], kind="counter")
+    return PlainTextResponse(render_prometheus(extra), media_type="text/plain; version=0.0.4")
+
+@app.on_event("startup")
+async def start_background_tasks():
+    await start_intake()
+
+@app.on_event("shutdown")
+async def close_db():
+    await stop_intake()
+    await stop_snapshots()
+    await db.aclose()
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Request metrics in Prometheus text format (served at /metrics by main.py).
+# MetricsMiddleware times every request per route template and collects what
+# happened inside it: upstream calls (recorded by resilience.guarded), render
+# phases (recorded by http_cache) and response bytes. Requests slower than
+# SLOW_REQUEST_MS are logged with that per-phase breakdown.
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", "1000"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 4, 8, 16, 32)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float]):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        # labels -> ([count per bucket, +Inf last], sum)
+        self._values: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts = entry[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            entry[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_number(bound)))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_number(total)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+REQUESTS = Counter("http_requests_total", "Requests by route and status")
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Total request time", LATENCY_BUCKETS)
+RESPONSE_BYTES = Histogram("http_response_size_bytes", "Response body size", BYTES_BUCKETS)
+REQUEST_UPSTREAM_CALLS = Histogram("http_request_upstream_calls", "Upstream (Supabase) calls per request", COUNT_BUCKETS)
+REQUEST_UPSTREAM_SECONDS = Histogram("http_request_upstream_seconds", "Time per request spent waiting on upstream calls", LATENCY_BUCKETS)
+REQUEST_PHASE_SECONDS = Histogram("http_request_phase_seconds", "Time per request in validation/serialization", LATENCY_BUCKETS)
+UPSTREAM_SECONDS = Histogram("upstream_call_duration_seconds", "Upstream call time by table", LATENCY_BUCKETS)
+UPSTREAM_ERRORS = Counter("upstream_call_errors_total", "Failed upstream calls by table")
+
+METRICS = (
+    REQUESTS,
+    REQUEST_SECONDS,
+    RESPONSE_BYTES,
+    REQUEST_UPSTREAM_CALLS,
+    REQUEST_UPSTREAM_SECONDS,
+    REQUEST_PHASE_SECONDS,
+    UPSTREAM_SECONDS,
+    UPSTREAM_ERRORS,
+)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.upstream_calls = 0
+        self.upstream_seconds = 0.0
+        self.phases: Dict[str, float] = {}
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def record_upstream(name: str, seconds: float, failed: bool = False) -> None:
+    if not METRICS_ENABLED:
+        return
+    UPSTREAM_SECONDS.observe(seconds, table=name)
+    if failed:
+        UPSTREAM_ERRORS.inc(table=name)
+    current = _current.get()
+    if current is not None:
+        current.upstream_calls += 1
+        current.upstream_seconds += seconds
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    current = _current.get()
+    if current is not None:
+        current.phases[phase] = current.phases.get(phase, 0.0) + seconds
+
+
+def _route_template(scope, router) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", "unmatched")
+    # Older Starlette only leaves the endpoint in the scope
+    endpoint = scope.get("endpoint")
+    if endpoint is not None and router is not None:
+        for candidate in router.routes:
+            if getattr(candidate, "endpoint", None) is endpoint:
+                return candidate.path
+    # Never label by raw path: unmatched URLs would explode the series count
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, router=None, skip_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.router = router
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if not METRICS_ENABLED or scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        current = RequestMetrics()
+        token = _current.set(current)
+        status = {"code": 500, "bytes": 0}
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                status["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - start
+            route = _route_template(scope, self.router)
+            method = scope["method"]
+            REQUESTS.inc(method=method, route=route, status=str(status["code"]))
+            REQUEST_SECONDS.observe(elapsed, method=method, route=route)
+            RESPONSE_BYTES.observe(status["bytes"], method=method, route=route)
+            REQUEST_UPSTREAM_CALLS.observe(current.upstream_calls, method=method, route=route)
+            REQUEST_UPSTREAM_SECONDS.observe(current.upstream_seconds, method=method, route=route)
+            for phase, seconds in current.phases.items():
+                REQUEST_PHASE_SECONDS.observe(seconds, route=route, phase=phase)
+
+            if elapsed * 1000 >= SLOW_REQUEST_MS:
+                other = elapsed - current.upstream_seconds - sum(current.phases.values())
+                parts = [
+                    f"total={elapsed * 1000:.0f}ms",
+                    f"upstream={current.upstream_calls}x/{current.upstream_seconds * 1000:.0f}ms",
+                ]
+                parts += [f"{p}={s * 1000:.0f}ms" for p, s in sorted(current.phases.items())]
+                parts += [f"other={max(other, 0) * 1000:.0f}ms", f"bytes={status['bytes']}"]
+                print(f"Slow request: {method} {scope['path']} ({route}) {status['code']} " + " ".join(parts))
+
+
+def gauge(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]], kind: str = "gauge") -> List[str]:
+    # Values read from other components' stats() at scrape time
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {_format_number(value)}")
+    return lines
+
+
+def render_prometheus(extra: Iterable[str] = ()) -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Literal, Union
 
 class Solution(BaseModel):
     id: str
@@ -16,6 +16,11 @@ class Product(BaseModel):
     image: str
     video: Optional[str] = None
     sort_order: Optional[int] = 0
+    thumbnail: Optional[str] = None  # Derived from image, never stored
+
+class ProductOrder(BaseModel):
+    id: str
+    sort_order: int
 
 class PartnerBenefit(BaseModel):
     id: Optional[int] = None  # Auto-generated by DB
@@ -32,26 +37,43 @@ class NewsItem(BaseModel):
     image: str
     source: Optional[str] = None
     author: Optional[str] = None
+    thumbnail: Optional[str] = None  # Derived from image, never stored
 
 class PartnerApplication(BaseModel):
+    id: Optional[int] = None  # Auto-generated by DB
     name: str
     phone: str
     company: str
     target_city: str
     message: str
+    created_at: Optional[str] = None
+
+ApplicationStatus = Literal['pending', 'contacted', 'approved', 'rejected']
 
 class ExhibitionApplication(BaseModel):
     id: Optional[int] = None
     exhibition_id: str
     exhibition_title: str
-    type: str  # 'ticket' | 'booth'
+    type: Literal['ticket', 'booth']
     name: str
     company: str
     phone: str
     email: Optional[str] = None
     message: Optional[str] = None
+    status: Optional[ApplicationStatus] = None  # Set by the DB on submit, then by admins
     created_at: Optional[str] = None
 
+class ApplicationStatusUpdate(BaseModel):
+    status: ApplicationStatus
+
+class ApplicationBulkStatusUpdate(BaseModel):
+    ids: List[Union[int, str]]
+    status: ApplicationStatus
+
+class ApplicationCounts(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+
 class Exhibition(BaseModel):
     id: Optional[str] = None # UUID generated by DB
     title: str
@@ -67,6 +89,13 @@ class Exhibition(BaseModel):
     highlights: List[str] = []
     gallery_images: List[str] = []
     created_at: Optional[str] = None
+    thumbnail: Optional[str] = None  # Derived from image, never stored
+
+class ImageUploadRequest(BaseModel):
+    filename: str
+
+class ImageDerivativesRequest(BaseModel):
+    path: str  # As returned by POST /api/images/uploads
 
 class LoginRequest(BaseModel):
     username: str
@@ -94,3 +123,27 @@ class Association(BaseModel):
     contact_info: Optional[str] = None
     website: Optional[str] = None
     created_at: Optional[str] = None
+    thumbnail: Optional[str] = None  # Derived from logo, never stored
+
+class Bootstrap(BaseModel):
+    # Only the requested sections are set (and serialized)
+    solutions: Optional[List[Solution]] = None
+    products: Optional[List[Product]] = None
+    benefits: Optional[List[PartnerBenefit]] = None
+    news: Optional[List[NewsItem]] = None
+    exhibitions: Optional[List[Exhibition]] = None
+    errors: Optional[Dict[str, str]] = None
+
+class SearchHit(BaseModel):
+    type: Literal['product', 'news', 'exhibition', 'association']
+    id: str
+    title: str
+    summary: str
+    image: Optional[str] = None
+    thumbnail: Optional[str] = None
+    score: float
+
+class SearchResults(BaseModel):
+    query: str
+    total: int
+    hits: List[SearchHit]
@@ -0,0 +1,119 @@
+import base64
+import json
+from typing import Any, Iterable, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Request, Response
+from pydantic import BaseModel
+
+from database import db
+from http_cache import conditional_json
+from images import THUMBNAIL_SOURCES, with_thumbnails
+
+# Keyset pagination and field projection for list endpoints.
+# Pages are ordered by (sort_key desc, id desc); the cursor carries the last
+# row's (sort_key, id) so the next page starts strictly after it, no matter
+# how many rows were inserted in between.
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class Page:
+    def __init__(self, rows: List[dict], next_cursor: Optional[str]):
+        self.rows = rows
+        self.next_cursor = next_cursor
+
+
+def encode_cursor(value: Any, row_id: Any) -> str:
+    raw = json.dumps([value, row_id], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        return value, row_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def quote_value(value: Any) -> str:
+    # Double-quoted PostgREST value, safe for timestamps and ids containing , . : ( )
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def select_columns(fields: Optional[str], model: Type[BaseModel], always: Iterable[str] = ()) -> str:
+    # ?fields=id,title,city -> "id,title,city" restricted to the model's fields
+    if not fields:
+        return "*"
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    columns = list(dict.fromkeys(list(always) + requested))
+    return ",".join(columns)
+
+
+async def fetch_page(
+    table: str,
+    sort_key: str,
+    model: Type[BaseModel],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    filters: Iterable[Tuple[str, str, Any]] = (),
+) -> Page:
+    # filters: (column, builder method, value), e.g. ("status", "in_", ["pending"])
+    if cursor and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+
+    columns = select_columns(fields, model, always=("id", sort_key))
+    # thumbnail is derived from another column rather than stored
+    source = THUMBNAIL_SOURCES.get(table) if "thumbnail" in model.model_fields else None
+    derive = source is not None and columns == "*"
+    drop_source = False
+    if source and columns != "*":
+        names = columns.split(",")
+        if "thumbnail" in names:
+            derive = True
+            drop_source = source not in names
+            names = [name for name in names if name != "thumbnail"] + ([source] if drop_source else [])
+        columns = ",".join(names)
+
+    query = db.table(table).select(columns)
+    for column, op, value in filters:
+        query = getattr(query, op)(column, value)
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        query = query.or_(
+            f"{sort_key}.lt.{quote_value(value)},and({sort_key}.eq.{quote_value(value)},id.lt.{quote_value(row_id)})"
+        )
+    query = query.order(sort_key, desc=True).order("id", desc=True)
+    if limit is not None:
+        # One extra row tells us whether there is a next page
+        query = query.limit(limit + 1)
+
+    response = await query.execute()
+    rows = response.data or []
+    if derive:
+        with_thumbnails(table, rows)
+        if drop_source:
+            for row in rows:
+                row.pop(source, None)
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.get(sort_key), last.get("id"))
+    return Page(rows, next_cursor)
+
+
+def page_response(request: Request, page: Page, model: Any = None, trusted: bool = False) -> Response:
+    response = conditional_json(request, page.rows, model, trusted=trusted)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+        next_url = request.url.include_query_params(cursor=page.next_cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
@@ -0,0 +1,245 @@
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Token-bucket rate limiting per client IP and route group.
+# A bucket holds up to `capacity` tokens and refills at capacity/period per
+# second; each request takes one token and is answered 429 with Retry-After
+# when none is left. The check runs in RateLimitMiddleware before routing,
+# so a rejected request never reaches the database or the password hasher.
+#
+# Groups are set as "<requests>/<seconds>" (0 disables a group):
+#   RATE_LIMIT_AUTH=5/60       POST /api/auth/login and /register, per IP
+#   RATE_LIMIT_LOGIN_USER=10/300   failed logins per (username, IP); cleared
+#                              by a successful login, so others cannot lock an admin out
+#   RATE_LIMIT_SUBMIT=10/60    public form submissions
+#   RATE_LIMIT_READ=120/10     other GET /api/ requests
+#
+# Backends (RATE_LIMIT_BACKEND):
+#   memory - per-process buckets (default); each instance limits on its own
+#   redis  - buckets shared by every instance, kept in Redis at
+#            RATE_LIMIT_REDIS_URL and updated by one atomic script
+#            (needs `pip install redis`); if Redis fails, the process
+#            falls back to its memory buckets rather than failing open
+
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") != "0"
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND") or ("redis" if os.environ.get("RATE_LIMIT_REDIS_URL") else "memory")
+RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL", "")
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "100000"))
+# Number of proxies in front of the app that append to X-Forwarded-For
+# (1 on Vercel). The client is the hop the outermost proxy appended, counted
+# from the right: everything left of it is whatever the client sent.
+# Blank counts as unset, so a copied .env.example cannot override the Vercel default
+RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get("RATE_LIMIT_TRUSTED_PROXIES") or ("1" if os.environ.get("VERCEL") else "0"))
+
+LIMIT_DEFAULTS = {
+    "auth": "5/60",
+    "login_user": "10/300",
+    "submit": "10/60",
+    "read": "120/10",
+}
+
+# (methods, path) -> group; a path ending in "/" matches everything under it
+ROUTE_GROUPS: List[Tuple[Tuple[str, ...], str, str]] = [
+    (("POST",), "/api/auth/login", "auth"),
+    (("POST",), "/api/auth/register", "auth"),
+    (("POST",), "/api/partners/apply", "submit"),
+    (("POST",), "/api/exhibitions/apply", "submit"),
+    (("GET", "HEAD"), "/api/", "read"),
+]
+
+
+def parse_limit(value: str) -> Optional[Tuple[float, float]]:
+    # "5/60" -> (capacity 5, refill 5/60 tokens per second); "0" -> disabled
+    try:
+        count, _, period = value.partition("/")
+        capacity, seconds = float(count), float(period or 1)
+    except ValueError:
+        raise ValueError(f"Invalid rate limit {value!r}, expected <requests>/<seconds>")
+    if capacity <= 0 or seconds <= 0:
+        return None
+    return capacity, capacity / seconds
+
+
+LIMITS: Dict[str, Optional[Tuple[float, float]]] = {
+    group: parse_limit(os.environ.get(f"RATE_LIMIT_{group.upper()}", default))
+    for group, default in LIMIT_DEFAULTS.items()
+}
+
+
+def route_group(method: str, path: str) -> Optional[str]:
+    for methods, route, group in ROUTE_GROUPS:
+        if method in methods and (path == route or (route.endswith("/") and path.startswith(route))):
+            return group
+    return None
+
+
+class MemoryBucketStore:
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        # key -> (tokens, updated); least recently used first
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: float, rate: float, cost: int = 1) -> float:
+        # 0 if a token was available (and taken, unless cost=0), else seconds until one is
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= cost
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            # An evicted client just starts over with a full bucket
+            self._buckets.popitem(last=False)
+        return wait
+
+    async def reset(self, key: str) -> None:
+        self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# KEYS[1] bucket; ARGV capacity, rate, cost. Returns the wait in ms.
+# Uses the Redis clock, so instances with skewed clocks share one timeline.
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - cost
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return math.ceil(wait * 1000)
+"""
+
+
+class RedisBucketStore:
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(_TAKE_SCRIPT)
+        self.prefix = prefix
+        # Used while Redis is unreachable
+        self._fallback = MemoryBucketStore()
+
+    async def take(self, key: str, capacity: float, rate: float, cost: int = 1) -> float:
+        try:
+            wait_ms = await self._script(keys=[self.prefix + key], args=[capacity, rate, cost])
+            return int(wait_ms) / 1000
+        except Exception as e:
+            print(f"Rate limit store unavailable, using local buckets: {e}")
+            return await self._fallback.take(key, capacity, rate, cost)
+
+    async def reset(self, key: str) -> None:
+        await self._fallback.reset(key)
+        try:
+            await self._redis.delete(self.prefix + key)
+        except Exception as e:
+            print(f"Rate limit store unavailable, could not reset {key}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._fallback)
+
+
+class RateLimiter:
+    def __init__(self, store, limits: Dict[str, Optional[Tuple[float, float]]] = LIMITS, enabled: bool = RATE_LIMIT_ENABLED):
+        self.store = store
+        self.limits = limits
+        self.enabled = enabled
+        self.rejected: Dict[str, int] = {group: 0 for group in limits}
+
+    async def hit(self, group: str, key: str, cost: int = 1) -> float:
+        # 0 when allowed, else the Retry-After in seconds; cost=0 only checks
+        limit = self.limits.get(group)
+        if not self.enabled or limit is None:
+            return 0.0
+        capacity, rate = limit
+        wait = await self.store.take(f"{group}:{key}", capacity, rate, cost)
+        if wait > 0:
+            self.rejected[group] = self.rejected.get(group, 0) + 1
+        return wait
+
+    async def reset(self, group: str, key: str) -> None:
+        if self.enabled and self.limits.get(group) is not None:
+            await self.store.reset(f"{group}:{key}")
+
+    def stats(self) -> dict:
+        return {"keys": len(self.store), "rejected": dict(self.rejected)}
+
+
+def _make_store():
+    if RATE_LIMIT_BACKEND == "redis":
+        if not RATE_LIMIT_REDIS_URL:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs RATE_LIMIT_REDIS_URL")
+        return RedisBucketStore(RATE_LIMIT_REDIS_URL)
+    if RATE_LIMIT_BACKEND != "memory":
+        raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND: {RATE_LIMIT_BACKEND}")
+    return MemoryBucketStore()
+
+
+rate_limiter = RateLimiter(_make_store())
+
+
+def retry_after(wait: float) -> str:
+    return str(max(1, math.ceil(wait)))
+
+
+# Client address of in-process requests (static_export renders through the
+# app); never produced by a real connection, and checked before any header
+INTERNAL_CLIENT = ("internal", 0)
+
+
+def client_ip(scope) -> str:
+    if RATE_LIMIT_TRUSTED_PROXIES > 0:
+        hops = []
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                hops.extend(hop.strip() for hop in value.decode("latin-1").split(",") if hop.strip())
+        if hops:
+            return hops[-min(RATE_LIMIT_TRUSTED_PROXIES, len(hops))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, limiter: RateLimiter = rate_limiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.limiter.enabled and tuple(scope.get("client") or ()) != INTERNAL_CLIENT:
+            group = route_group(scope["method"], scope["path"])
+            if group is not None:
+                wait = await self.limiter.hit(group, client_ip(scope))
+                if wait > 0:
+                    body = json.dumps({"detail": "Too many requests, please retry later"}).encode("utf-8")
+                    await send({
+                        "type": "http.response.start",
+                        "status": 429,
+                        "headers": [
+                            (b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode("latin-1")),
+                            (b"retry-after", retry_after(wait).encode("latin-1")),
+                        ],
+                    })
+                    await send({"type": "http.response.body", "body": body})
+                    return
+        await self.app(scope, receive, send)
@@ -0,0 +1,327 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from resilience import guarded
+
+# Data-access layer used by the API routers.
+# Mirrors the subset of the supabase-py query builder the routers use
+# (select/insert/update/upsert/delete, eq/neq/gt/gte/lt/lte/in_/or_, order, limit,
+# single, count, plus rpc for server-side functions and storage uploads) so a call site looks like
+# `await db.table(...)...execute()` whatever the backend.
+#
+# Backends (selected by DATA_BACKEND in database.py):
+#   supabase - AsyncSupabase below, PostgREST over a pooled keep-alive client
+#   sqlite   - SQLiteDatabase in sqlite_repository.py, for offline runs/benchmarks
+#
+# Every call runs through the table's circuit breaker and call timeout
+# (resilience.py); upstream failures surface as UpstreamUnavailable.
+
+DB_MAX_CONNECTIONS = int(os.environ.get("DB_MAX_CONNECTIONS", "100"))
+DB_MAX_KEEPALIVE = int(os.environ.get("DB_MAX_KEEPALIVE", "20"))
+DB_KEEPALIVE_EXPIRY = float(os.environ.get("DB_KEEPALIVE_EXPIRY", "30"))
+DB_TIMEOUT = float(os.environ.get("DB_TIMEOUT", "10"))
+STORAGE_TIMEOUT = float(os.environ.get("STORAGE_TIMEOUT", "60"))
+
+# Tables the API reads and writes
+TABLES = (
+    "solutions",
+    "products",
+    "partner_benefits",
+    "news_items",
+    "exhibitions",
+    "exhibition_applications",
+    "partner_applications",
+    "associations",
+    "admin_users",
+)
+
+
+class APIError(Exception):
+    def __init__(self, message: str, code: Optional[str] = None, details: Any = None, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.details = details
+        self.status_code = status_code
+
+
+class APIResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class BaseQuery:
+    # Builder state shared by all backends; subclasses implement _execute()
+
+    def __init__(self, table: str):
+        self.table_name = table
+        self.operation = "select"
+        self.columns = "*"
+        self.count: Optional[str] = None
+        self.filters: List[Tuple[str, str, Any]] = []
+        self.orders: List[Tuple[str, bool]] = []
+        self.limit_size: Optional[int] = None
+        self.is_single = False
+        self.body: Any = None
+        self.on_conflict: Optional[str] = None
+
+    # Operations
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "BaseQuery":
+        self.operation = "select"
+        self.columns = columns
+        self.count = count
+        return self
+
+    def insert(self, data: Any) -> "BaseQuery":
+        self.operation = "insert"
+        self.body = data
+        return self
+
+    def upsert(self, data: Any, on_conflict: Optional[str] = None) -> "BaseQuery":
+        self.operation = "upsert"
+        self.body = data
+        self.on_conflict = on_conflict
+        return self
+
+    def update(self, data: Dict[str, Any]) -> "BaseQuery":
+        self.operation = "update"
+        self.body = data
+        return self
+
+    def delete(self) -> "BaseQuery":
+        self.operation = "delete"
+        return self
+
+    # Modifiers
+
+    def eq(self, column: str, value: Any) -> "BaseQuery":
+        self.filters.append((column, "eq", value))
+        return self
+
+    def neq(self, column: str, value: Any) -> "BaseQuery":
+        self.filters.append((column, "neq", value))
+        return self
+
+    def gt(self, column: str, value: Any) -> "BaseQuery":
+        self.filters.append((column, "gt", value))
+        return self
+
+    def gte(self, column: str, value: Any) -> "BaseQuery":
+        self.filters.append((column, "gte", value))
+        return self
+
+    def lt(self, column: str, value: Any) -> "BaseQuery":
+        self.filters.append((column, "lt", value))
+        return self
+
+    def lte(self, column: str, value: Any) -> "BaseQuery":
+        self.filters.append((column, "lte", value))
+        return self
+
+    def in_(self, column: str, values: List[Any]) -> "BaseQuery":
+        self.filters.append((column, "in", list(values)))
+        return self
+
+    def or_(self, filters: str) -> "BaseQuery":
+        # PostgREST logical syntax, e.g. 'date.lt."2024-05-01",and(date.eq."2024-05-01",id.lt."n3")'
+        self.filters.append(("or", "or", filters))
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "BaseQuery":
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> "BaseQuery":
+        self.limit_size = size
+        return self
+
+    def single(self) -> "BaseQuery":
+        self.is_single = True
+        return self
+
+    async def execute(self) -> APIResponse:
+        return await guarded(self.table_name, self._execute)
+
+    async def _execute(self) -> APIResponse:
+        raise NotImplementedError
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    return str(value)
+
+
+def _quote_item(value: Any) -> str:
+    # in.(...) list item, double-quoted so values may contain , . ( )
+    text = _format_value(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _raise_for_error(response: httpx.Response) -> None:
+    if response.status_code < 400:
+        return
+    try:
+        error = response.json()
+    except ValueError:
+        error = {"message": response.text}
+    raise APIError(
+        error.get("message") or response.reason_phrase,
+        code=error.get("code"),
+        details=error.get("details"),
+        status_code=response.status_code,
+    )
+
+
+_METHODS = {"select": "GET", "insert": "POST", "upsert": "POST", "update": "PATCH", "delete": "DELETE"}
+
+
+class PostgrestQuery(BaseQuery):
+    def __init__(self, client: "AsyncSupabase", table: str):
+        super().__init__(table)
+        self._client = client
+
+    def _build(self) -> Tuple[List[Tuple[str, str]], Dict[str, str]]:
+        params: List[Tuple[str, str]] = [("select", self.columns)]
+        for column, op, value in self.filters:
+            if op == "or":
+                params.append(("or", f"({value})"))
+            elif op == "in":
+                params.append((column, f"in.({','.join(_quote_item(v) for v in value)})"))
+            else:
+                params.append((column, f"{op}.{_format_value(value)}"))
+        if self.orders:
+            params.append(("order", ",".join(f"{c}.{'desc' if d else 'asc'}" for c, d in self.orders)))
+        if self.limit_size is not None:
+            params.append(("limit", str(self.limit_size)))
+        if self.on_conflict:
+            params.append(("on_conflict", self.on_conflict))
+
+        headers: Dict[str, str] = {}
+        prefer = []
+        if self.operation == "upsert":
+            prefer.append("resolution=merge-duplicates")
+        if self.operation != "select":
+            prefer.append("return=representation")
+        if self.count:
+            prefer.append(f"count={self.count}")
+        if prefer:
+            headers["Prefer"] = ",".join(prefer)
+        if self.is_single:
+            headers["Accept"] = "application/vnd.pgrst.object+json"
+        return params, headers
+
+    async def _execute(self) -> APIResponse:
+        params, headers = self._build()
+        response = await self._client.http.request(
+            _METHODS[self.operation],
+            f"{self._client.rest_url}/{self.table_name}",
+            params=params,
+            headers=headers,
+            json=self.body,
+        )
+        _raise_for_error(response)
+
+        data = response.json() if response.content else ([] if not self.is_single else None)
+        count = None
+        content_range = response.headers.get("content-range")
+        if self.count and content_range and "/" in content_range:
+            total = content_range.split("/")[-1]
+            count = int(total) if total.isdigit() else None
+        return APIResponse(data, count)
+
+
+class PostgrestRpc:
+    def __init__(self, client: "AsyncSupabase", fn: str, params: Dict[str, Any]):
+        self._client = client
+        self.fn = fn
+        self.params = params
+
+    async def execute(self) -> APIResponse:
+        return await guarded(f"rpc/{self.fn}", self._execute)
+
+    async def _execute(self) -> APIResponse:
+        response = await self._client.http.post(f"{self._client.rest_url}/rpc/{self.fn}", json=self.params)
+        _raise_for_error(response)
+        return APIResponse(response.json() if response.content else None)
+
+
+class AsyncSupabase:
+    def __init__(self, url: str, key: str):
+        self.rest_url = url.rstrip("/") + "/rest/v1"
+        self.storage_url = url.rstrip("/") + "/storage/v1"
+        self.headers = {"apikey": key, "Authorization": f"Bearer {key}"}
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=DB_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=DB_MAX_CONNECTIONS,
+                    max_keepalive_connections=DB_MAX_KEEPALIVE,
+                    keepalive_expiry=DB_KEEPALIVE_EXPIRY,
+                ),
+            )
+        return self._http
+
+    def table(self, name: str) -> PostgrestQuery:
+        return PostgrestQuery(self, name)
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> PostgrestRpc:
+        return PostgrestRpc(self, fn, params or {})
+
+    async def upload(self, bucket: str, path: str, data: bytes, content_type: str, cache_control: str = "31536000") -> str:
+        # Supabase Storage object upload (overwrites); returns the public URL
+        async def put() -> None:
+            response = await self.http.post(
+                f"{self.storage_url}/object/{bucket}/{path}",
+                content=data,
+                headers={"Content-Type": content_type, "x-upsert": "true", "cache-control": f"max-age={cache_control}"},
+                timeout=STORAGE_TIMEOUT,
+            )
+            _raise_for_error(response)
+
+        await guarded(f"storage/{bucket}", put, timeout=STORAGE_TIMEOUT)
+        return self.public_url(bucket, path)
+
+    async def download(self, bucket: str, path: str) -> Optional[bytes]:
+        # None when the object does not exist
+        async def get() -> Optional[bytes]:
+            response = await self.http.get(f"{self.storage_url}/object/{bucket}/{path}", timeout=STORAGE_TIMEOUT)
+            if response.status_code in (400, 404):
+                return None
+            _raise_for_error(response)
+            return response.content
+
+        return await guarded(f"storage/{bucket}", get, timeout=STORAGE_TIMEOUT)
+
+    async def signed_upload_url(self, bucket: str, path: str) -> Optional[str]:
+        # One-time URL the browser can PUT the object to, so the file never
+        # passes through the (size-limited) serverless function
+        async def sign() -> str:
+            response = await self.http.post(
+                f"{self.storage_url}/object/upload/sign/{bucket}/{path}",
+                headers={"x-upsert": "true"},
+                timeout=STORAGE_TIMEOUT,
+            )
+            _raise_for_error(response)
+            return self.storage_url + response.json()["url"]
+
+        return await guarded(f"storage/{bucket}", sign, timeout=STORAGE_TIMEOUT)
+
+    def public_url(self, bucket: str, path: str) -> str:
+        return f"{self.storage_url}/object/public/{bucket}/{path}"
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
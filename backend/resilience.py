@@ -0,0 +1,169 @@
+import asyncio
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from metrics import record_upstream
+
+# Per-table circuit breakers and call timeouts for upstream (PostgREST) calls.
+# After BREAKER_FAILURES consecutive failures a table's breaker opens and calls
+# fail fast for BREAKER_RESET seconds; then a single probe is let through and
+# its outcome closes or re-opens the breaker. Only timeouts, network errors
+# and 5xx responses count as failures - a 404 or a constraint error is an
+# answer, not an outage.
+
+DB_CALL_TIMEOUT = float(os.environ.get("DB_CALL_TIMEOUT", "5"))
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.environ.get("BREAKER_RESET", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailable(Exception):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.message = message
+        self.code = "upstream_unavailable"
+        self.status_code = 503
+        self.retry_after = retry_after
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    if isinstance(error, (UpstreamUnavailable, asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return status_code is not None and status_code >= 500
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probing = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self.retry_after() <= 0:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            print(f"Circuit for {self.name} closed")
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                print(f"Circuit for {self.name} opened after {self.failures} failures")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+
+breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker_for(name: str) -> CircuitBreaker:
+    breaker = breakers.get(name)
+    if breaker is None:
+        breaker = breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+async def guarded(name: str, call: Callable[[], Awaitable[Any]], timeout: float = DB_CALL_TIMEOUT) -> Any:
+    breaker = breaker_for(name)
+    if not breaker.allow():
+        raise UpstreamUnavailable(f"{name} is unavailable (circuit open)", retry_after=breaker.retry_after())
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(call(), timeout=timeout)
+    except asyncio.CancelledError:
+        # The caller went away; that says nothing about the upstream
+        breaker._probing = False
+        raise
+    except Exception as e:
+        if not is_upstream_failure(e):
+            record_upstream(name, time.perf_counter() - start)
+            breaker.record_success()
+            raise
+        record_upstream(name, time.perf_counter() - start, failed=True)
+        breaker.record_failure()
+        if isinstance(e, UpstreamUnavailable):
+            raise
+        if isinstance(e, asyncio.TimeoutError):
+            raise UpstreamUnavailable(f"{name} timed out after {timeout}s", retry_after=breaker.retry_after())
+        # Network errors and 5xx responses alike, so callers handle one type
+        raise UpstreamUnavailable(f"{name} failed: {e}", retry_after=breaker.retry_after()) from e
+    record_upstream(name, time.perf_counter() - start)
+    breaker.record_success()
+    return result
+
+
+def retry_after_header(error: UpstreamUnavailable) -> str:
+    return str(max(1, int(error.retry_after or 0) + 1))
+
+
+# Staleness marker for responses served from a last-known-good snapshot.
+# StaleHeaderMiddleware gives each request a holder; the read path records
+# the snapshot age in it and the middleware turns that into a header.
+
+STALE_HEADER = "X-Data-Stale"
+
+_stale_age: ContextVar[Optional[list]] = ContextVar("stale_age", default=None)
+
+
+def mark_stale(age: float) -> None:
+    holder = _stale_age.get()
+    if holder is not None:
+        holder.append(age)
+
+
+class StaleHeaderMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        holder: list = []
+        token = _stale_age.set(holder)
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start" and holder:
+                headers = list(message.get("headers", []))
+                # Age of the oldest snapshot used, in seconds
+                headers.append((STALE_HEADER.lower().encode("latin-1"), str(int(max(holder))).encode("latin-1")))
+                headers.append((b"warning", b'110 - "Response is Stale"'))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            _stale_age.reset(token)
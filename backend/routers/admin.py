@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from auth_utils import get_current_super_admin, get_current_user
+import static_export
+from application_feed import application_events, decode_event_id
+from typing import Optional
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+@router.get("/applications/stream")
+async def stream_applications(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    since: Optional[str] = Query(None, description="Last event id, for clients that cannot set headers"),
+    current_user: dict = Depends(get_current_user),
+):
+    # Server-Sent Events: one `application` event per new partner/exhibition
+    # application; reconnect with Last-Event-ID to receive what was missed
+    resume_from = last_event_id or since
+    resume = decode_event_id(resume_from) if resume_from else None
+    return StreamingResponse(
+        application_events(request, resume),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/snapshots")
+async def export_snapshots(current_user: dict = Depends(get_current_super_admin)):
+    # Full export: re-renders every public path and rewrites the manifest,
+    # picking up anything an inline export after a write did not finish
+    exporter = static_export.snapshot_exporter
+    if exporter is None:
+        raise HTTPException(status_code=404, detail="Snapshots are not configured (SNAPSHOT_DIR / SNAPSHOT_BUCKET)")
+    manifest = await exporter.export()
+    return {"files": len(manifest["files"]), "generated_at": manifest.get("generated_at"), **exporter.stats()}
@@ -1,53 +1,99 @@
-from fastapi import APIRouter, HTTPException
-from database import supabase
+from fastapi import APIRouter, HTTPException, Query, Request
+from database import db
+from cache import cached_read, read_cache, stale_row
+from changes import publish_change
+from singleflight import singleflight
+from resilience import UpstreamUnavailable
+from http_cache import conditional_json
+from images import with_thumbnails
+from pagination import MAX_PAGE_SIZE, fetch_page, page_response
 from models import Association
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/api/associations", tags=["Associations"])
 
+async def load_associations() -> list:
+    # Cached list, shared by the list endpoint and /api/bootstrap
+    # Concurrent misses share one query; a stale snapshot covers upstream outages
+    return await cached_read("associations", "list", _fetch_associations)
+
+async def _fetch_associations() -> list:
+    response = await db.table("associations").select("*").order("created_at", desc=True).execute()
+    rows = with_thumbnails("associations", response.data)
+    return rows
+
 @router.get("/", response_model=List[Association])
-def get_associations():
+async def get_associations(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    # Without limit/cursor/fields the full cached list is returned, as before
     try:
-        response = supabase.table("associations").select("*").order("created_at", desc=True).execute()
-        return response.data
+        if limit is None and cursor is None and fields is None:
+            rows = await load_associations()
+            return conditional_json(request, rows, List[Association], trusted=True)
+        page = await fetch_page("associations", "created_at", Association, limit, cursor, fields)
+    except (HTTPException, UpstreamUnavailable):
+        raise
     except Exception as e:
         print(f"Error fetching associations: {e}")
         return []
+    return page_response(request, page, None if fields else List[Association], trusted=True)
 
 @router.get("/{association_id}", response_model=Association)
-def get_association(association_id: str):
+async def get_association(association_id: str, request: Request):
     try:
-        response = supabase.table("associations").select("*").eq("id", association_id).single().execute()
-        return response.data
+        # Shared links bring bursts of identical requests; they share one fetch,
+        # keyed by write generation so a read after an update never joins an older one
+        query = db.table("associations").select("*").eq("id", association_id).single()
+        response = await singleflight.do("associations:id", (association_id, read_cache.generation("associations")), query.execute)
+    except UpstreamUnavailable:
+        # Fall back to the row in the last good list, if we have one
+        row = stale_row("associations", association_id)
+        if row is None:
+            raise
+        return conditional_json(request, row, Association)
     except Exception as e:
         print(f"Error fetching association {association_id}: {e}")
         raise HTTPException(status_code=404, detail="Association not found")
+    return conditional_json(request, with_thumbnails("associations", [response.data])[0], Association)
 
 @router.post("/")
-def create_association(association: Association):
+async def create_association(association: Association):
     try:
-        data = association.model_dump(exclude={"id", "created_at"})
-        response = supabase.table("associations").insert(data).execute()
+        data = association.model_dump(exclude={"id", "created_at", "thumbnail"})
+        response = await db.table("associations").insert(data).execute()
+        publish_change("associations", response.data)
         return {"status": "success", "data": response.data}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         print(f"Error creating association: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{association_id}")
-def update_association(association_id: str, association: Association):
+async def update_association(association_id: str, association: Association):
     try:
-        data = association.model_dump(exclude={"id", "created_at"})
-        response = supabase.table("associations").update(data).eq("id", association_id).execute()
+        data = association.model_dump(exclude={"id", "created_at", "thumbnail"})
+        response = await db.table("associations").update(data).eq("id", association_id).execute()
+        publish_change("associations", response.data)
         return {"status": "success", "data": response.data}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         print(f"Error updating association: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{association_id}")
-def delete_association(association_id: str):
+async def delete_association(association_id: str):
     try:
-        response = supabase.table("associations").delete().eq("id", association_id).execute()
+        response = await db.table("associations").delete().eq("id", association_id).execute()
+        publish_change("associations", response.data, deleted=True)
         return {"status": "success", "data": response.data}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         print(f"Error deleting association: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,24 +1,48 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from database import supabase
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from database import db
+from resilience import UpstreamUnavailable
 from models import LoginRequest, Token, AdminUserCreate
-from auth_utils import verify_password, create_access_token, get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES, get_current_super_admin
+from auth_utils import verify_and_update_password_async, create_access_token, get_password_hash_async, ACCESS_TOKEN_EXPIRE_MINUTES, get_current_super_admin
+from rate_limit import client_ip, rate_limiter, retry_after
 from datetime import timedelta
 
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
 
 @router.post("/login", response_model=Token)
-def login(request: LoginRequest):
+async def login(request: LoginRequest, http_request: Request):
+    # Failed attempts per (username, IP), on top of the per-IP limit. Checked
+    # before any lookup or hashing but only charged on failure and cleared on
+    # success, so guesses from other addresses cannot lock the real admin out
+    throttle_key = f"{request.username.strip().lower()}|{client_ip(http_request.scope)}"
+    wait = await rate_limiter.hit("login_user", throttle_key, cost=0)
+    if wait > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="登录尝试过于频繁，请稍后再试",
+            headers={"Retry-After": retry_after(wait)},
+        )
     try:
         # Query database for user
-        response = supabase.table("admin_users").select("*").eq("username", request.username).execute()
+        response = await db.table("admin_users").select("*").eq("username", request.username).execute()
         
         if not response.data or len(response.data) == 0:
+            await rate_limiter.hit("login_user", throttle_key)
             raise HTTPException(status_code=400, detail="用户名或密码错误")
         
         user = response.data[0]
         
-        if not verify_password(request.password, user["password_hash"]):
+        valid, new_hash = await verify_and_update_password_async(request.password, user["password_hash"])
+        if not valid:
+            await rate_limiter.hit("login_user", throttle_key)
             raise HTTPException(status_code=400, detail="用户名或密码错误")
+        await rate_limiter.reset("login_user", throttle_key)
+
+        if new_hash:
+            # Stored hash uses outdated parameters; upgrade it transparently
+            try:
+                await db.table("admin_users").update({"password_hash": new_hash}).eq("username", user["username"]).execute()
+            except Exception as e:
+                print(f"Password rehash failed for {user['username']}: {e}")
         
         # Create Access Token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -33,7 +57,7 @@ def login(request: LoginRequest):
             "username": user["username"],
             "role": user["role"]
         }
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         print(f"Login Error: {str(e)}")
@@ -43,9 +67,9 @@ def login(request: LoginRequest):
         raise HTTPException(status_code=500, detail=f"Internal Error: {str(e)} | {debug_info}")
 
 @router.post("/register", status_code=201)
-def register(user: AdminUserCreate):
+async def register(user: AdminUserCreate):
     # Check if any users exist
-    all_users = supabase.table("admin_users").select("id", count="exact").execute()
+    all_users = await db.table("admin_users").select("id", count="exact").execute()
     count = all_users.count if all_users.count is not None else len(all_users.data)
     
     # If users exist, this endpoint should strictly be protected.
@@ -63,12 +87,12 @@ def register(user: AdminUserCreate):
         raise HTTPException(status_code=403, detail="系统已初始化，请登录后台添加用户")
 
     # Check if user exists (redundant if count is 0 but good for safety)
-    response = supabase.table("admin_users").select("*").eq("username", user.username).execute()
+    response = await db.table("admin_users").select("*").eq("username", user.username).execute()
     if response.data and len(response.data) > 0:
         raise HTTPException(status_code=400, detail="用户名已存在")
         
     # Hash password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     
     # Insert user
     try:
@@ -77,22 +101,24 @@ def register(user: AdminUserCreate):
             "password_hash": hashed_password,
             "role": user.role
         }
-        supabase.table("admin_users").insert(data).execute()
+        await db.table("admin_users").insert(data).execute()
         return {"message": "初始管理员创建成功"}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         import os
         debug_info = f"Supabase URL set: {bool(os.environ.get('SUPABASE_URL'))}, Key set: {bool(os.environ.get('SUPABASE_KEY'))}"
         raise HTTPException(status_code=500, detail=f"Internal Error: {str(e)} | {debug_info}")
 
 @router.post("/users", status_code=201)
-def create_user(user: AdminUserCreate, current_user: dict = Depends(get_current_super_admin)):
+async def create_user(user: AdminUserCreate, current_user: dict = Depends(get_current_super_admin)):
     # Check if user exists
-    response = supabase.table("admin_users").select("*").eq("username", user.username).execute()
+    response = await db.table("admin_users").select("*").eq("username", user.username).execute()
     if response.data and len(response.data) > 0:
         raise HTTPException(status_code=400, detail="用户名已存在")
         
     # Hash password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     
     # Insert user
     try:
@@ -101,13 +127,15 @@ def create_user(user: AdminUserCreate, current_user: dict = Depends(get_current_
             "password_hash": hashed_password,
             "role": user.role
         }
-        supabase.table("admin_users").insert(data).execute()
+        await db.table("admin_users").insert(data).execute()
         return {"message": "用户创建成功"}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/users")
-def get_users(current_user: dict = Depends(get_current_super_admin)):
-    response = supabase.table("admin_users").select("id, username, role, created_at").order("created_at", desc=True).execute()
+async def get_users(current_user: dict = Depends(get_current_super_admin)):
+    response = await db.table("admin_users").select("id, username, role, created_at").order("created_at", desc=True).execute()
     return response.data
 
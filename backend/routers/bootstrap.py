@@ -0,0 +1,54 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Request
+from http_cache import conditional_json
+from models import Bootstrap
+from routers.solutions import load_solutions
+from routers.products import load_products
+from routers.partners import load_benefits
+from routers.news import load_news
+from routers.exhibitions import load_exhibitions
+from exhibition_calendar import exhibition_calendar
+from typing import Optional
+
+router = APIRouter(prefix="/api/bootstrap", tags=["Bootstrap"])
+
+async def load_featured_exhibitions() -> list:
+    exhibition_calendar.sync(await load_exhibitions())
+    return exhibition_calendar.query(featured=True)
+
+# Homepage sections, in the order they are returned
+SECTIONS = {
+    "solutions": load_solutions,
+    "products": load_products,
+    "benefits": load_benefits,
+    "news": load_news,
+    "exhibitions": load_featured_exhibitions,
+}
+
+@router.get("/", response_model=Bootstrap, response_model_exclude_unset=True)
+async def get_bootstrap(request: Request, sections: Optional[str] = None):
+    # ?sections=solutions,products selects a subset; default is every section
+    if sections:
+        names = [name.strip() for name in sections.split(",") if name.strip()]
+        unknown = [name for name in names if name not in SECTIONS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+    else:
+        names = list(SECTIONS)
+
+    # Fan out to all sections concurrently; each one is served from the read cache when warm
+    results = await asyncio.gather(*(SECTIONS[name]() for name in names), return_exceptions=True)
+
+    payload = {}
+    errors = {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            print(f"Error loading bootstrap section {name}: {type(result).__name__}: {result}")
+            # Public endpoint: the details stay in the log
+            errors[name] = "unavailable"
+            payload[name] = []
+        else:
+            payload[name] = result
+    if errors:
+        payload["errors"] = errors
+    return conditional_json(request, payload, Bootstrap, exclude_unset=True, trusted=True)
@@ -1,77 +1,357 @@
-from fastapi import APIRouter, HTTPException
-from database import supabase
-from models import ExhibitionApplication, Exhibition
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from database import db
+from cache import cached_read, read_cache, stale_row
+from changes import publish_change
+from singleflight import singleflight
+from resilience import UpstreamUnavailable
+from http_cache import conditional_json
+from images import with_thumbnails
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Page, decode_cursor, encode_cursor, fetch_page, page_response, select_columns
+from exhibition_calendar import exhibition_calendar, normalize_date, parse_date
+from exporter import export_response
+from auth_utils import get_current_user
+from intake import exhibition_intake
+from dedup import exhibition_fingerprint, submission_dedup
+from models import ApplicationBulkStatusUpdate, ApplicationCounts, ApplicationStatus, ApplicationStatusUpdate, ExhibitionApplication, Exhibition
+from datetime import date, timedelta
+from typing import List, Literal, Optional, get_args
 
 router = APIRouter(prefix="/api/exhibitions", tags=["Exhibitions"])
 
+async def load_exhibitions() -> list:
+    # Cached list, shared by the list endpoint and /api/bootstrap
+    # Concurrent misses share one query; a stale snapshot covers upstream outages
+    return await cached_read("exhibitions", "list", _fetch_exhibitions)
+
+async def _fetch_exhibitions() -> list:
+    response = await db.table("exhibitions").select("*").order("start_date", desc=True).execute()
+    rows = with_thumbnails("exhibitions", response.data)
+    return rows
+
+def _calendar_page(
+    rows: list,
+    limit: Optional[int],
+    cursor: Optional[str],
+    fields: Optional[str],
+) -> Page:
+    # Same (start_date desc, id desc) keyset cursor as fetch_page, applied to index results
+    columns = select_columns(fields, Exhibition, always=("id", "start_date"))
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        after = (parse_date(value) or date.min, str(row_id))
+        rows = [row for row in rows if (parse_date(row.get("start_date")) or date.min, str(row.get("id"))) < after]
+        if limit is None:
+            limit = DEFAULT_PAGE_SIZE
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].get("start_date"), rows[-1].get("id"))
+    if columns != "*":
+        names = columns.split(",")
+        rows = [{name: row.get(name) for name in names} for row in rows]
+    return Page(rows, next_cursor)
+
 @router.get("/", response_model=List[Exhibition])
-def get_exhibitions():
+async def get_exhibitions(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    city: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    featured: Optional[bool] = None,
+):
+    # city/from/to/featured are answered from the in-process calendar index;
+    # from/to select exhibitions overlapping that (inclusive) date range
+    if city is not None or date_from is not None or date_to is not None or featured is not None:
+        if date_from is not None and date_to is not None and date_from > date_to:
+            raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+        try:
+            exhibition_calendar.sync(await load_exhibitions())
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        rows = exhibition_calendar.query(city, date_from, date_to, featured)
+        page = _calendar_page(rows, limit, cursor, fields)
+        return page_response(request, page, None if fields else List[Exhibition], trusted=True)
+
+    # Without limit/cursor/fields the full cached list is returned, as before
     try:
-        response = supabase.table("exhibitions").select("*").order("start_date", desc=True).execute()
-        return response.data
+        if limit is None and cursor is None and fields is None:
+            rows = await load_exhibitions()
+            return conditional_json(request, rows, List[Exhibition], trusted=True)
+        page = await fetch_page("exhibitions", "start_date", Exhibition, limit, cursor, fields)
+    except (HTTPException, UpstreamUnavailable):
+        raise
     except Exception as e:
         print(f"Error fetching exhibitions: {e}")
         return []
+    return page_response(request, page, None if fields else List[Exhibition], trusted=True)
+
+APPLICATION_STATUSES = get_args(ApplicationStatus)
+# status -> statuses an admin may move it to; decisions can be revised but
+# never sent back to pending
+APPLICATION_TRANSITIONS = {
+    "pending": ("contacted", "approved", "rejected"),
+    "contacted": ("approved", "rejected"),
+    "approved": ("rejected",),
+    "rejected": ("approved",),
+}
+MAX_BULK_UPDATE = 500
+
+def application_filters(
+    status: Optional[str] = None,
+    exhibition_id: Optional[str] = None,
+    type: Optional[Literal["ticket", "booth"]] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+) -> dict:
+    # ?status=pending,contacted&exhibition_id=&type=booth&from=2025-01-01&to=2025-01-31
+    # from/to are inclusive submission dates (UTC)
+    statuses = None
+    if status:
+        statuses = [name.strip() for name in status.split(",") if name.strip()]
+        unknown = [name for name in statuses if name not in APPLICATION_STATUSES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown status: {', '.join(unknown)}")
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    return {
+        "statuses": statuses,
+        "exhibition_id": exhibition_id,
+        "type": type,
+        "created_from": date_from.isoformat() if date_from else None,
+        "created_to": (date_to + timedelta(days=1)).isoformat() if date_to else None,
+    }
+
+def _filter_list(filters: dict) -> list:
+    # Each combination is served by an index in update_applications_status.sql
+    result = []
+    if filters["statuses"]:
+        result.append(("status", "in_", filters["statuses"]))
+    if filters["exhibition_id"]:
+        result.append(("exhibition_id", "eq", filters["exhibition_id"]))
+    if filters["type"]:
+        result.append(("type", "eq", filters["type"]))
+    if filters["created_from"]:
+        result.append(("created_at", "gte", filters["created_from"]))
+    if filters["created_to"]:
+        result.append(("created_at", "lt", filters["created_to"]))
+    return result
+
+def _status_sources(status: str) -> List[str]:
+    # Statuses that may move to `status`; setting the current status again is a no-op
+    return [status] + [source for source, targets in APPLICATION_TRANSITIONS.items() if status in targets]
+
+# Declared before /{exhibition_id} so "applications" is not taken for an id
+@router.get("/applications", response_model=List[ExhibitionApplication])
+async def get_applications(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    filters: dict = Depends(application_filters),
+    current_user: dict = Depends(get_current_user),
+):
+    try:
+        page = await fetch_page(
+            "exhibition_applications", "created_at", ExhibitionApplication, limit, cursor, fields, _filter_list(filters)
+        )
+    except (HTTPException, UpstreamUnavailable):
+        raise
+    except Exception as e:
+        print(f"Error fetching exhibition applications: {e}")
+        # Return empty list if table doesn't exist or other error, to avoid crashing frontend
+        return []
+    return page_response(request, page, None if fields else List[ExhibitionApplication], trusted=True)
+
+@router.get("/applications/counts", response_model=ApplicationCounts)
+async def count_applications(filters: dict = Depends(application_filters), current_user: dict = Depends(get_current_user)):
+    # Applications per status in one GROUP BY; every filter but status applies
+    params = {f"p_{key}": filters[key] for key in ("exhibition_id", "type", "created_from", "created_to")}
+    try:
+        response = await db.rpc("exhibition_application_counts", params).execute()
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        print(f"Error counting exhibition applications: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    by_status = {status: 0 for status in APPLICATION_STATUSES}
+    for row in response.data or []:
+        status = row.get("status") or "pending"
+        by_status[status] = by_status.get(status, 0) + int(row["count"])
+    return {"total": sum(by_status.values()), "by_status": by_status}
+
+@router.get("/applications/export")
+async def export_applications(
+    format: str = "csv",
+    filters: dict = Depends(application_filters),
+    current_user: dict = Depends(get_current_user),
+):
+    # Streams the matching applications as CSV or NDJSON, one page at a time
+    return export_response("exhibition_applications", "created_at", ExhibitionApplication, format, _filter_list(filters))
+
+@router.patch("/applications")
+async def update_application_statuses(update: ApplicationBulkStatusUpdate, current_user: dict = Depends(get_current_user)):
+    # One conditional UPDATE for the whole selection; rows that are missing or
+    # whose status cannot move to the new one are reported as skipped
+    ids = list(dict.fromkeys(update.ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="No application ids given")
+    if len(ids) > MAX_BULK_UPDATE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_UPDATE} applications per update")
+    try:
+        response = await (
+            db.table("exhibition_applications")
+            .update({"status": update.status})
+            .in_("id", ids)
+            .in_("status", _status_sources(update.status))
+            .execute()
+        )
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        print(f"Error updating exhibition application statuses: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    publish_change("exhibition_applications", response.data)
+    updated = {str(row["id"]) for row in response.data or []}
+    return {
+        "status": "success",
+        "updated": [i for i in ids if str(i) in updated],
+        "skipped": [i for i in ids if str(i) not in updated],
+    }
+
+@router.patch("/applications/{application_id}")
+async def update_application_status(
+    application_id: str,
+    update: ApplicationStatusUpdate,
+    current_user: dict = Depends(get_current_user),
+):
+    try:
+        response = await (
+            db.table("exhibition_applications")
+            .update({"status": update.status})
+            .eq("id", application_id)
+            .in_("status", _status_sources(update.status))
+            .execute()
+        )
+        if not response.data:
+            current = await db.table("exhibition_applications").select("id,status").eq("id", application_id).execute()
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        print(f"Error updating exhibition application {application_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if not response.data:
+        if not current.data:
+            raise HTTPException(status_code=404, detail="Application not found")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Cannot change status from {current.data[0].get('status')} to {update.status}",
+        )
+    publish_change("exhibition_applications", response.data)
+    return {"status": "success", "data": response.data}
 
 @router.get("/{exhibition_id}", response_model=Exhibition)
-def get_exhibition(exhibition_id: str):
+async def get_exhibition(exhibition_id: str, request: Request):
     try:
-        response = supabase.table("exhibitions").select("*").eq("id", exhibition_id).single().execute()
-        return response.data
+        # Shared links bring bursts of identical requests; they share one fetch,
+        # keyed by write generation so a read after an update never joins an older one
+        query = db.table("exhibitions").select("*").eq("id", exhibition_id).single()
+        response = await singleflight.do("exhibitions:id", (exhibition_id, read_cache.generation("exhibitions")), query.execute)
+    except UpstreamUnavailable:
+        # Fall back to the row in the last good list, if we have one
+        row = stale_row("exhibitions", exhibition_id)
+        if row is None:
+            raise
+        return conditional_json(request, row, Exhibition)
     except Exception as e:
         print(f"Error fetching exhibition {exhibition_id}: {e}")
         raise HTTPException(status_code=404, detail="Exhibition not found")
+    return conditional_json(request, with_thumbnails("exhibitions", [response.data])[0], Exhibition)
+
+def _exhibition_data(exhibition: Exhibition) -> dict:
+    # Exclude 'id' and 'created_at' as they are handled by DB
+    data = exhibition.model_dump(exclude={"id", "created_at", "thumbnail"})
+    # Stored as ISO dates, which sort and compare the same in TEXT and DATE columns
+    for column in ("start_date", "end_date"):
+        value = normalize_date(data[column])
+        if value is None:
+            raise HTTPException(status_code=400, detail=f"Invalid {column}: {data[column]!r}")
+        data[column] = value
+    if data["end_date"] < data["start_date"]:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    return data
 
 @router.post("/")
-def create_exhibition(exhibition: Exhibition):
+async def create_exhibition(exhibition: Exhibition):
+    data = _exhibition_data(exhibition)
     try:
-        # Exclude 'id' and 'created_at' as they are handled by DB
-        data = exhibition.model_dump(exclude={"id", "created_at"})
-        response = supabase.table("exhibitions").insert(data).execute()
+        response = await db.table("exhibitions").insert(data).execute()
+        publish_change("exhibitions", response.data)
         return {"status": "success", "data": response.data}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         print(f"Error creating exhibition: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{exhibition_id}")
-def update_exhibition(exhibition_id: str, exhibition: Exhibition):
+async def update_exhibition(exhibition_id: str, exhibition: Exhibition):
+    data = _exhibition_data(exhibition)
     try:
-        data = exhibition.model_dump(exclude={"id", "created_at"})
-        response = supabase.table("exhibitions").update(data).eq("id", exhibition_id).execute()
+        response = await db.table("exhibitions").update(data).eq("id", exhibition_id).execute()
+        publish_change("exhibitions", response.data)
         return {"status": "success", "data": response.data}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         print(f"Error updating exhibition: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{exhibition_id}")
-def delete_exhibition(exhibition_id: str):
+async def delete_exhibition(exhibition_id: str):
     try:
-        response = supabase.table("exhibitions").delete().eq("id", exhibition_id).execute()
+        response = await db.table("exhibitions").delete().eq("id", exhibition_id).execute()
+        publish_change("exhibitions", response.data, deleted=True)
         return {"status": "success", "data": response.data}
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         print(f"Error deleting exhibition: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/apply")
-def submit_application(application: ExhibitionApplication):
+async def submit_application(application: ExhibitionApplication):
+    # Exclude 'id' and 'created_at' as they are handled by DB (or should be)
+    # But for 'created_at', sometimes we might want to pass it or let DB handle default now()
+    # 'id' is definitely DB generated.
+    # status starts as the DB default ('pending'); only admins change it
+    data = application.model_dump(exclude={"id", "created_at", "status"})
+    key = exhibition_fingerprint(data)
+    if submission_dedup.check_and_add(key):
+        # Same phone, exhibition and type within the dedup window: already received
+        return {"status": "success", "duplicate": True}
+    if exhibition_intake.running:
+        # Spooled locally and inserted with the next batch; the fingerprint
+        # is released if the row is rejected later
+        try:
+            await exhibition_intake.submit(data, key)
+        except Exception:
+            submission_dedup.discard(key)
+            raise
+        return JSONResponse(status_code=202, content={"status": "success", "queued": True})
     try:
-        # Exclude 'id' and 'created_at' as they are handled by DB (or should be)
-        # But for 'created_at', sometimes we might want to pass it or let DB handle default now()
-        # 'id' is definitely DB generated.
-        data = application.model_dump(exclude={"id", "created_at"})
-        response = supabase.table("exhibition_applications").insert(data).execute()
+        response = await db.table("exhibition_applications").insert(data).execute()
+        publish_change("exhibition_applications", response.data)
         return {"status": "success", "data": response.data}
+    except UpstreamUnavailable:
+        submission_dedup.discard(key)
+        raise
     except Exception as e:
         print(f"Error submitting exhibition application: {e}")
+        submission_dedup.discard(key)
         raise HTTPException(status_code=500, detail=str(e))
-
-@router.get("/applications", response_model=List[ExhibitionApplication])
-def get_applications():
-    try:
-        response = supabase.table("exhibition_applications").select("*").order("created_at", desc=True).execute()
-        return response.data
-    except Exception as e:
-        print(f"Error fetching exhibition applications: {e}")
-        # Return empty list if table doesn't exist or other error, to avoid crashing frontend
-        return []
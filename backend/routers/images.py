@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, File, UploadFile
+from auth_utils import get_current_user
+from images import create_upload, process_stored, process_upload, read_upload
+from models import ImageDerivativesRequest, ImageUploadRequest
+
+router = APIRouter(prefix="/api/images", tags=["Images"])
+
+@router.post("/uploads", status_code=201)
+async def start_upload(request: ImageUploadRequest, current_user: dict = Depends(get_current_user)):
+    # Step 1: a signed URL to PUT the original to Storage directly
+    # (upload_url is null when the backend has none; POST the file to / instead)
+    return await create_upload(request.filename)
+
+@router.post("/derivatives", status_code=201)
+async def create_derivatives(request: ImageDerivativesRequest, current_user: dict = Depends(get_current_user)):
+    # Step 2: resized AVIF/WebP versions of the stored original; returns the srcset manifest
+    return await process_stored(request.path)
+
+@router.post("/", status_code=201)
+async def upload_image(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
+    # Stores the original plus resized AVIF/WebP derivatives and returns the srcset manifest;
+    # save manifest["original"] as the record's image URL
+    return await process_upload(await read_upload(file))
@@ -1,54 +1,80 @@
-from fastapi import APIRouter, HTTPException
-from database import supabase
+from fastapi import APIRouter, HTTPException, Query, Request
+from database import db
+from cache import cached_read
+from changes import publish_change
+from resilience import UpstreamUnavailable
+from http_cache import conditional_json
+from images import with_thumbnails
+from pagination import MAX_PAGE_SIZE, fetch_page, page_response
 from models import NewsItem
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/api/news", tags=["News"])
 
+async def load_news() -> list:
+    # Cached list, shared by the list endpoint and /api/bootstrap
+    # Concurrent misses share one query; a stale snapshot covers upstream outages
+    return await cached_read("news_items", "list", _fetch_news)
+
+async def _fetch_news() -> list:
+    response = await db.table("news_items").select("*").order("date", desc=True).order("id", desc=True).execute()
+    rows = with_thumbnails("news_items", response.data)
+    return rows
+
 @router.get("/", response_model=List[NewsItem])
-def get_news():
+async def get_news(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    # Without limit/cursor/fields the full cached list is returned, as before
     try:
-        response = supabase.table("news_items").select("*").execute()
-        if getattr(response, "error", None):
-            raise HTTPException(status_code=500, detail=str(response.error))
-        return response.data
-    except HTTPException:
+        if limit is None and cursor is None and fields is None:
+            rows = await load_news()
+            return conditional_json(request, rows, List[NewsItem], trusted=True)
+        page = await fetch_page("news_items", "date", NewsItem, limit, cursor, fields)
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return page_response(request, page, None if fields else List[NewsItem], trusted=True)
 
 @router.post("/", response_model=List[NewsItem])
-def create_news(news: NewsItem):
+async def create_news(news: NewsItem):
     try:
-        response = supabase.table("news_items").insert(news.model_dump()).execute()
+        response = await db.table("news_items").insert(news.model_dump(exclude={"thumbnail"})).execute()
         if getattr(response, "error", None):
             raise HTTPException(status_code=500, detail=str(response.error))
+        publish_change("news_items", response.data)
         return response.data
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{news_id}", response_model=List[NewsItem])
-def update_news(news_id: str, news: NewsItem):
+async def update_news(news_id: str, news: NewsItem):
     try:
-        response = supabase.table("news_items").update(news.model_dump()).eq("id", news_id).execute()
+        response = await db.table("news_items").update(news.model_dump(exclude={"thumbnail"})).eq("id", news_id).execute()
         if getattr(response, "error", None):
             raise HTTPException(status_code=500, detail=str(response.error))
+        publish_change("news_items", response.data)
         return response.data
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{news_id}")
-def delete_news(news_id: str):
+async def delete_news(news_id: str):
     try:
-        response = supabase.table("news_items").delete().eq("id", news_id).execute()
+        response = await db.table("news_items").delete().eq("id", news_id).execute()
         if getattr(response, "error", None):
             raise HTTPException(status_code=500, detail=str(response.error))
+        publish_change("news_items", response.data, deleted=True)
         return {"message": "News item deleted successfully"}
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,30 +1,82 @@
-from fastapi import APIRouter, HTTPException
-from database import supabase
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from database import db
+from cache import cached_read
+from changes import publish_change
+from resilience import UpstreamUnavailable
+from http_cache import conditional_json
+from pagination import MAX_PAGE_SIZE, fetch_page, page_response
+from exporter import export_response
+from auth_utils import get_current_user
+from intake import partner_intake
+from dedup import partner_fingerprint, submission_dedup
 from models import PartnerBenefit, PartnerApplication
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/api/partners", tags=["Partners"])
 
+async def load_benefits() -> list:
+    # Cached list, shared by the list endpoint and /api/bootstrap
+    # Concurrent misses share one query; a stale snapshot covers upstream outages
+    return await cached_read("partner_benefits", "list", _fetch_benefits)
+
+async def _fetch_benefits() -> list:
+    response = await db.table("partner_benefits").select("*").execute()
+    rows = response.data
+    return rows
+
 @router.get("/", response_model=List[PartnerBenefit])
-def get_benefits():
-    response = supabase.table("partner_benefits").select("*").execute()
-    return response.data
+async def get_benefits(request: Request):
+    rows = await load_benefits()
+    return conditional_json(request, rows, List[PartnerBenefit], trusted=True)
 
 @router.post("/apply")
-def submit_application(application: PartnerApplication):
+async def submit_application(application: PartnerApplication):
+    data = application.model_dump(exclude={"id", "created_at"})
+    key = partner_fingerprint(data)
+    if submission_dedup.check_and_add(key):
+        # Same phone and city within the dedup window: already received, store nothing
+        return {"status": "success", "duplicate": True}
+    if partner_intake.running:
+        # Spooled locally and inserted with the next batch; the fingerprint
+        # is released if the row is rejected later
+        try:
+            await partner_intake.submit(data, key)
+        except Exception:
+            submission_dedup.discard(key)
+            raise
+        return JSONResponse(status_code=202, content={"status": "success", "queued": True})
     try:
-        response = supabase.table("partner_applications").insert(application.model_dump()).execute()
+        response = await db.table("partner_applications").insert(data).execute()
+        publish_change("partner_applications", response.data)
         return {"status": "success", "data": response.data}
+    except UpstreamUnavailable:
+        submission_dedup.discard(key)
+        raise
     except Exception as e:
+        submission_dedup.discard(key)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/applications", response_model=List[PartnerApplication])
-def get_applications():
+async def get_applications(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
     # Only for admin (RLS will handle security if configured, but here we just expose the endpoint)
     # Ideally, we should check auth token here, but for now we rely on Supabase client key in frontend or RLS
     try:
-        response = supabase.table("partner_applications").select("*").order("created_at", desc=True).execute()
-        return response.data
+        page = await fetch_page("partner_applications", "created_at", PartnerApplication, limit, cursor, fields)
+    except (HTTPException, UpstreamUnavailable):
+        raise
     except Exception as e:
         print(f"Error fetching applications: {e}")
         return []
+    return page_response(request, page, None if fields else List[PartnerApplication], trusted=True)
+
+@router.get("/applications/export")
+async def export_applications(format: str = "csv", current_user: dict = Depends(get_current_user)):
+    # Streams every application as CSV or NDJSON, one page at a time
+    return export_response("partner_applications", "created_at", PartnerApplication, format)
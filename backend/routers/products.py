@@ -1,68 +1,86 @@
-from fastapi import APIRouter, HTTPException
-from database import supabase
-from models import Product
+from fastapi import APIRouter, HTTPException, Request
+from database import db
+from cache import cached_read
+from changes import publish_change
+from resilience import UpstreamUnavailable
+from http_cache import conditional_json
+from images import with_thumbnails
+from models import Product, ProductOrder
 from typing import List
 
 router = APIRouter(prefix="/api/products", tags=["Products"])
 
+async def load_products() -> list:
+    # Cached list, shared by the list endpoint and /api/bootstrap
+    # Concurrent misses share one query; a stale snapshot covers upstream outages
+    return await cached_read("products", "list", _fetch_products)
+
+async def _fetch_products() -> list:
+    # Sort by sort_order ascending, then by id descending (newest first if sort_order same)
+    response = await db.table("products").select("*").order("sort_order", desc=False).order("id", desc=True).execute()
+    rows = with_thumbnails("products", response.data)
+    return rows
+
 @router.get("/", response_model=List[Product])
-def get_products():
+async def get_products(request: Request):
     try:
-        # Sort by sort_order ascending, then by id descending (newest first if sort_order same)
-        response = supabase.table("products").select("*").order("sort_order", desc=False).order("id", desc=True).execute()
-        if getattr(response, "error", None):
-            raise HTTPException(status_code=500, detail=str(response.error))
-        return response.data
-    except HTTPException:
+        rows = await load_products()
+    except UpstreamUnavailable:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return conditional_json(request, rows, List[Product], trusted=True)
 
 @router.put("/reorder")
-def reorder_products(items: List[dict]):
-    # items should be a list of {"id": "...", "sort_order": 1}
+async def reorder_products(items: List[ProductOrder]):
+    # Applied in one round trip by the reorder_products SQL function (see update_products_sort.sql),
+    # which updates every row in a single statement and returns the ids that matched no product
     try:
-        # Since Supabase Python client doesn't support bulk upsert easily for partial updates without checking primary keys,
-        # we will loop update. For a small number of products (e.g. < 100), this is acceptable.
-        # Ideally, we would use an RPC call if performance is critical.
-        for item in items:
-            supabase.table("products").update({"sort_order": item["sort_order"]}).eq("id", item["id"]).execute()
-        return {"message": "success"}
+        response = await db.rpc("reorder_products", {"items": [item.model_dump() for item in items]}).execute()
+    except UpstreamUnavailable:
+        # Answered 503 with Retry-After by the app-level handler
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    publish_change("products")
+    unmatched = response.data or []
+    return {"message": "success", "updated": len(items) - len(unmatched), "unmatched": unmatched}
 
 @router.post("/", response_model=List[Product])
-def create_product(product: Product):
+async def create_product(product: Product):
     try:
-        response = supabase.table("products").insert(product.model_dump()).execute()
+        response = await db.table("products").insert(product.model_dump(exclude={"thumbnail"})).execute()
         if getattr(response, "error", None):
             raise HTTPException(status_code=500, detail=str(response.error))
+        publish_change("products", response.data)
         return response.data
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{product_id}", response_model=List[Product])
-def update_product(product_id: str, product: Product):
+async def update_product(product_id: str, product: Product):
     try:
-        response = supabase.table("products").update(product.model_dump()).eq("id", product_id).execute()
+        response = await db.table("products").update(product.model_dump(exclude={"thumbnail"})).eq("id", product_id).execute()
         if getattr(response, "error", None):
             raise HTTPException(status_code=500, detail=str(response.error))
+        publish_change("products", response.data)
         return response.data
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{product_id}")
-def delete_product(product_id: str):
+async def delete_product(product_id: str):
     try:
-        response = supabase.table("products").delete().eq("id", product_id).execute()
+        response = await db.table("products").delete().eq("id", product_id).execute()
         if getattr(response, "error", None):
             raise HTTPException(status_code=500, detail=str(response.error))
+        publish_change("products", response.data, deleted=True)
         return {"message": "Product deleted successfully"}
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,51 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from resilience import UpstreamUnavailable
+from models import SearchResults
+from pagination import MAX_PAGE_SIZE
+from search import SEARCH_TYPES, search_index
+from routers.products import load_products
+from routers.news import load_news
+from routers.exhibitions import load_exhibitions
+from routers.associations import load_associations
+from typing import Optional
+
+router = APIRouter(prefix="/api/search", tags=["Search"])
+
+# The index is fed from the same cached lists the list endpoints serve
+LOADERS = {
+    "products": load_products,
+    "news_items": load_news,
+    "exhibitions": load_exhibitions,
+    "associations": load_associations,
+}
+
+@router.get("/", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    types: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    # ?types=product,news restricts the hit types; default is every type
+    if types:
+        names = [name.strip() for name in types.split(",") if name.strip()]
+        unknown = [name for name in names if name not in SEARCH_TYPES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown types: {', '.join(unknown)}")
+        tables = [SEARCH_TYPES[name] for name in names]
+    else:
+        tables = list(LOADERS)
+
+    try:
+        # Warm lists come from the read cache; only changed rows are reindexed
+        results = await asyncio.gather(*(LOADERS[table]() for table in tables))
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    for table, rows in zip(tables, results):
+        search_index.sync(table, rows)
+
+    hits = search_index.search(q, tables)
+    return {"query": q, "total": len(hits), "hits": hits[offset:offset + limit]}
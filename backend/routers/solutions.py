@@ -1,54 +1,69 @@
-from fastapi import APIRouter, HTTPException
-from database import supabase
+from fastapi import APIRouter, HTTPException, Request
+from database import db
+from cache import cached_read
+from changes import publish_change
+from resilience import UpstreamUnavailable
+from http_cache import conditional_json
 from models import Solution
 from typing import List
 
 router = APIRouter(prefix="/api/solutions", tags=["Solutions"])
 
+async def load_solutions() -> list:
+    # Cached list, shared by the list endpoint and /api/bootstrap
+    # Concurrent misses share one query; a stale snapshot covers upstream outages
+    return await cached_read("solutions", "list", _fetch_solutions)
+
+async def _fetch_solutions() -> list:
+    response = await db.table("solutions").select("*").execute()
+    rows = response.data
+    return rows
+
 @router.get("/", response_model=List[Solution])
-def get_solutions():
+async def get_solutions(request: Request):
     try:
-        response = supabase.table("solutions").select("*").execute()
-        if getattr(response, "error", None):
-            raise HTTPException(status_code=500, detail=str(response.error))
-        return response.data
-    except HTTPException:
+        rows = await load_solutions()
+    except UpstreamUnavailable:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return conditional_json(request, rows, List[Solution], trusted=True)
 
 @router.post("/", response_model=List[Solution])
-def create_solution(solution: Solution):
+async def create_solution(solution: Solution):
     try:
-        response = supabase.table("solutions").insert(solution.model_dump()).execute()
+        response = await db.table("solutions").insert(solution.model_dump()).execute()
         if getattr(response, "error", None):
             raise HTTPException(status_code=500, detail=str(response.error))
+        publish_change("solutions", response.data)
         return response.data
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{solution_id}", response_model=List[Solution])
-def update_solution(solution_id: str, solution: Solution):
+async def update_solution(solution_id: str, solution: Solution):
     try:
-        response = supabase.table("solutions").update(solution.model_dump()).eq("id", solution_id).execute()
+        response = await db.table("solutions").update(solution.model_dump()).eq("id", solution_id).execute()
         if getattr(response, "error", None):
             raise HTTPException(status_code=500, detail=str(response.error))
+        publish_change("solutions", response.data)
         return response.data
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{solution_id}")
-def delete_solution(solution_id: str):
+async def delete_solution(solution_id: str):
     try:
-        response = supabase.table("solutions").delete().eq("id", solution_id).execute()
+        response = await db.table("solutions").delete().eq("id", solution_id).execute()
         if getattr(response, "error", None):
             raise HTTPException(status_code=500, detail=str(response.error))
+        publish_change("solutions", response.data, deleted=True)
         return {"message": "Solution deleted successfully"}
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,247 @@
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from changes import subscribe
+from images import thumbnail_url
+
+# In-process full-text index over the public content tables.
+# Text is NFKC-normalized and lower-cased; Latin/digit runs become word
+# tokens and CJK runs become overlapping character bigrams (a lone CJK
+# character stays a unigram), so "无人机" matches "工业无人机巡检" without a
+# dictionary. A single-character query term such as "机" matches every
+# bigram containing it. Hits are ranked with BM25 over weighted fields.
+# Documents are (re)indexed one row at a time: write handlers push their
+# rows through changes.publish_change, and sync() diffs a table against its
+# freshly loaded list so writes made on other instances converge too.
+
+SEARCH_MIN_MATCH = float(os.environ.get("SEARCH_MIN_MATCH", "0.6"))
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# table -> hit type, title/summary/image columns and weighted text fields
+SEARCH_SOURCES = {
+    "products": {
+        "type": "product",
+        "title": "name",
+        "summary": "description",
+        "image": "image",
+        "fields": {"name": 3.0, "category": 1.5, "description": 1.0},
+    },
+    "news_items": {
+        "type": "news",
+        "title": "title",
+        "summary": "summary",
+        "image": "image",
+        "fields": {"title": 3.0, "summary": 1.0, "category": 1.0},
+    },
+    "exhibitions": {
+        "type": "exhibition",
+        "title": "title",
+        "summary": "description",
+        "image": "image",
+        "fields": {"title": 3.0, "city": 2.0, "tags": 2.0, "location": 1.0, "description": 1.0},
+    },
+    "associations": {
+        "type": "association",
+        "title": "name",
+        "summary": "description",
+        "image": "logo",
+        "fields": {"name": 3.0, "type": 1.5, "description": 1.0, "content": 0.5},
+    },
+}
+SEARCH_TYPES = {source["type"]: table for table, source in SEARCH_SOURCES.items()}
+
+SUMMARY_LENGTH = 120
+
+_CJK = "㐀-䶿一-鿿豈-﫿぀-ヿ가-힯"
+_TOKEN_RUNS = re.compile(f"([{_CJK}]+)|([0-9a-z]+)")
+_CJK_CHAR = re.compile(f"[{_CJK}]")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for cjk, word in _TOKEN_RUNS.findall(unicodedata.normalize("NFKC", text).lower()):
+        if word:
+            tokens.append(word)
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def _field_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return "" if value is None else str(value)
+
+
+class SearchIndex:
+    def __init__(self, sources: Dict[str, dict]):
+        self.sources = sources
+        # token -> {(table, id): weighted term frequency}
+        self._postings: Dict[str, Dict[Tuple[str, str], float]] = {}
+        # CJK character -> bigram tokens containing it, for single-character queries
+        self._bigrams: Dict[str, Set[str]] = {}
+        # (table, id) -> (indexed values, weighted length, token counts, stored row)
+        self._docs: Dict[Tuple[str, str], tuple] = {}
+        self._total_length = 0.0
+        # table -> list object the table was last synced from
+        self._synced_from: Dict[str, Optional[list]] = {}
+        self.reindexed = 0
+
+    def _signature(self, table: str, row: dict) -> tuple:
+        source = self.sources[table]
+        columns = list(source["fields"]) + [source["title"], source["summary"], source["image"]]
+        return tuple(_field_text(row.get(c)) for c in columns)
+
+    def upsert(self, table: str, row: dict) -> None:
+        if row.get("id") is None:
+            return
+        key = (table, str(row["id"]))
+        signature = self._signature(table, row)
+        current = self._docs.get(key)
+        if current is not None and current[0] == signature:
+            return
+        self.remove(table, row["id"])
+
+        counts: Counter = Counter()
+        for field, weight in self.sources[table]["fields"].items():
+            for token in tokenize(_field_text(row.get(field))):
+                counts[token] += weight
+        length = sum(counts.values())
+        for token, tf in counts.items():
+            postings = self._postings.setdefault(token, {})
+            if not postings and len(token) == 2 and _CJK_CHAR.match(token):
+                for char in set(token):
+                    self._bigrams.setdefault(char, set()).add(token)
+            postings[key] = tf
+        source = self.sources[table]
+        stored = {
+            "id": row["id"],
+            "title": _field_text(row.get(source["title"])),
+            "summary": _field_text(row.get(source["summary"]))[:SUMMARY_LENGTH],
+            "image": row.get(source["image"]),
+        }
+        self._docs[key] = (signature, length, counts, stored)
+        self._total_length += length
+        self.reindexed += 1
+
+    def remove(self, table: str, row_id) -> None:
+        key = (table, str(row_id))
+        current = self._docs.pop(key, None)
+        if current is None:
+            return
+        _, length, counts, _ = current
+        for token in counts:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[token]
+                    for char in set(token) if len(token) == 2 else ():
+                        bigrams = self._bigrams.get(char)
+                        if bigrams is not None:
+                            bigrams.discard(token)
+                            if not bigrams:
+                                del self._bigrams[char]
+        self._total_length -= length
+
+    def is_synced(self, table: str, rows: list) -> bool:
+        return self._synced_from.get(table) is rows
+
+    def sync(self, table: str, rows: list) -> None:
+        # Cheap when nothing changed: unchanged rows are skipped by signature
+        if self.is_synced(table, rows):
+            return
+        seen = set()
+        for row in rows:
+            self.upsert(table, row)
+            seen.add(str(row.get("id")))
+        for key in [k for k in self._docs if k[0] == table and k[1] not in seen]:
+            self.remove(table, key[1])
+        self._synced_from[table] = rows
+
+    def apply_change(self, table: str, rows: Optional[List[dict]], deleted: bool) -> None:
+        if table not in self.sources or table not in self._synced_from:
+            return
+        if rows is None:
+            # Rows unknown: re-sync from the table on the next search
+            self._synced_from[table] = None
+            return
+        for row in rows:
+            if deleted:
+                self.remove(table, row.get("id"))
+            else:
+                self.upsert(table, row)
+
+    def _term_postings(self, term: str) -> Optional[Dict[Tuple[str, str], float]]:
+        if len(term) != 1 or not _CJK_CHAR.match(term):
+            return self._postings.get(term)
+        # A lone CJK character is mostly indexed inside bigrams: a document
+        # matches through any of them, weighted by the strongest one
+        merged = dict(self._postings.get(term, {}))
+        for token in self._bigrams.get(term, ()):
+            for key, tf in self._postings[token].items():
+                merged[key] = max(merged.get(key, 0.0), tf)
+        return merged
+
+    def search(self, query: str, tables: Optional[List[str]] = None) -> List[dict]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        tables = set(tables or self.sources)
+        doc_count = max(len(self._docs), 1)
+        avg_length = self._total_length / doc_count or 1.0
+
+        scores: Dict[Tuple[str, str], float] = {}
+        matched: Counter = Counter()
+        for term in terms:
+            postings = self._term_postings(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, tf in postings.items():
+                if key[0] not in tables:
+                    continue
+                length = self._docs[key][1]
+                norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+                scores[key] = scores.get(key, 0.0) + idf * norm
+                matched[key] += 1
+
+        # n-grams make single-token overlaps common, so require most of the query
+        needed = max(1, math.ceil(len(terms) * SEARCH_MIN_MATCH))
+        ranked = sorted(
+            (key for key in scores if matched[key] >= needed),
+            key=lambda key: (-matched[key], -scores[key], key),
+        )
+        hits = []
+        for key in ranked:
+            table = key[0]
+            stored = self._docs[key][3]
+            hits.append({
+                "type": self.sources[table]["type"],
+                "id": stored["id"],
+                "title": stored["title"],
+                "summary": stored["summary"],
+                "image": stored["image"],
+                "thumbnail": thumbnail_url(stored["image"]),
+                "score": round(scores[key], 4),
+            })
+        return hits
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self._docs),
+            "tokens": len(self._postings),
+            "reindexed": self.reindexed,
+            "tables": sorted(t for t, rows in self._synced_from.items() if rows is not None),
+        }
+
+
+search_index = SearchIndex(SEARCH_SOURCES)
+subscribe(search_index.apply_change)
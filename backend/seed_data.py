@@ -1,6 +1,6 @@
 import asyncio
 import os
-from database import supabase
+from database import db
 from models import Solution, Product, PartnerBenefit, NewsItem
 
 # Data from constants.tsx
@@ -120,18 +120,18 @@ NEWS_ITEMS = [
   }
 ]
 
-def seed():
+async def seed():
     print("Seeding Solutions...")
     for item in SOLUTIONS:
         try:
-            supabase.table("solutions").upsert(item).execute()
+            await db.table("solutions").upsert(item).execute()
         except Exception as e:
             print(f"Error seeding solution {item['id']}: {e}")
 
     print("Seeding Products...")
     for item in PRODUCTS:
         try:
-            supabase.table("products").upsert(item).execute()
+            await db.table("products").upsert(item).execute()
         except Exception as e:
             print(f"Error seeding product {item['id']}: {e}")
 
@@ -141,18 +141,19 @@ def seed():
             # Note: ID is auto-generated for benefits, so we might insert duplicates if we run multiple times without checking
             # Ideally we would check existence, but for seed script simple insert is okay or upsert if we had IDs.
             # Since we don't have IDs in constants, we just insert.
-            supabase.table("partner_benefits").insert(item).execute()
+            await db.table("partner_benefits").insert(item).execute()
         except Exception as e:
             print(f"Error seeding benefit {item['title']}: {e}")
 
     print("Seeding News...")
     for item in NEWS_ITEMS:
         try:
-            supabase.table("news_items").upsert(item).execute()
+            await db.table("news_items").upsert(item).execute()
         except Exception as e:
             print(f"Error seeding news {item['id']}: {e}")
             
     print("Seeding completed!")
+    await db.aclose()
 
 if __name__ == "__main__":
-    seed()
+    asyncio.run(seed())
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+# Request coalescing ("single-flight") for identical concurrent reads.
+# The first caller for a key starts the upstream fetch; callers arriving
+# while it is in flight await the same result instead of issuing their own.
+# Nothing is kept once the fetch finishes - caching is cache.py's job.
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Tuple[str, Any], asyncio.Future] = {}
+        # Per-namespace counters: fetches actually issued vs. callers that joined one
+        self._executed: Dict[str, int] = {}
+        self._coalesced: Dict[str, int] = {}
+
+    async def do(self, namespace: str, key: Any, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight_key = (namespace, key)
+        future = self._inflight.get(flight_key)
+        if future is not None:
+            self._coalesced[namespace] = self._coalesced.get(namespace, 0) + 1
+            # shield: a disconnecting client must not cancel the fetch for everyone else
+            return await asyncio.shield(future)
+
+        self._executed[namespace] = self._executed.get(namespace, 0) + 1
+        future = asyncio.ensure_future(fn())
+        self._inflight[flight_key] = future
+        future.add_done_callback(lambda f: self._done(flight_key, f))
+        return await asyncio.shield(future)
+
+    def _done(self, flight_key: Tuple[str, Any], future: asyncio.Future) -> None:
+        self._inflight.pop(flight_key, None)
+        # Mark the error as retrieved in case every caller went away
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self) -> dict:
+        namespaces = sorted(set(self._executed) | set(self._coalesced))
+        return {
+            "in_flight": len(self._inflight),
+            "executed": sum(self._executed.values()),
+            "coalesced": sum(self._coalesced.values()),
+            "by_namespace": {
+                ns: {"executed": self._executed.get(ns, 0), "coalesced": self._coalesced.get(ns, 0)}
+                for ns in namespaces
+            },
+        }
+
+
+singleflight = SingleFlight()
@@ -0,0 +1,447 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from repository import APIError, APIResponse, BaseQuery, TABLES
+from resilience import guarded
+
+# SQLite implementation of the repository interface.
+# Used with DATA_BACKEND=sqlite to run and load-test the API without a
+# Supabase project. Queries run synchronously on one shared connection:
+# they take microseconds on local data, which keeps profiles free of
+# threadpool noise.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+  id TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  description TEXT NOT NULL,
+  image TEXT NOT NULL,
+  icon TEXT NOT NULL,
+  created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS products (
+  id TEXT PRIMARY KEY,
+  name TEXT NOT NULL,
+  category TEXT NOT NULL,
+  description TEXT NOT NULL,
+  image TEXT NOT NULL,
+  video TEXT,
+  sort_order INTEGER DEFAULT 0,
+  created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS partner_benefits (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  title TEXT NOT NULL,
+  description TEXT NOT NULL,
+  icon TEXT NOT NULL,
+  created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS news_items (
+  id TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  date TEXT NOT NULL,
+  category TEXT NOT NULL,
+  summary TEXT NOT NULL,
+  image TEXT NOT NULL,
+  source TEXT,
+  author TEXT,
+  created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS exhibitions (
+  id TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  description TEXT NOT NULL,
+  start_date TEXT NOT NULL,
+  end_date TEXT NOT NULL,
+  location TEXT NOT NULL,
+  city TEXT NOT NULL,
+  tags TEXT DEFAULT '[]',
+  image TEXT NOT NULL,
+  featured INTEGER DEFAULT 0,
+  core_value TEXT,
+  highlights TEXT DEFAULT '[]',
+  gallery_images TEXT DEFAULT '[]',
+  created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exhibition_applications (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  exhibition_id TEXT NOT NULL,
+  exhibition_title TEXT NOT NULL,
+  type TEXT NOT NULL CHECK (type IN ('ticket', 'booth')),
+  name TEXT NOT NULL,
+  company TEXT NOT NULL,
+  phone TEXT NOT NULL,
+  email TEXT,
+  message TEXT,
+  status TEXT DEFAULT 'pending' CHECK (status IN ('pending', 'contacted', 'approved', 'rejected')),
+  created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS exhibition_applications_created_idx ON exhibition_applications (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS exhibition_applications_status_idx ON exhibition_applications (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS exhibition_applications_exhibition_idx ON exhibition_applications (exhibition_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS exhibition_applications_type_idx ON exhibition_applications (type, created_at DESC, id DESC);
+CREATE TABLE IF NOT EXISTS partner_applications (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL,
+  phone TEXT NOT NULL,
+  company TEXT NOT NULL,
+  target_city TEXT NOT NULL,
+  message TEXT,
+  created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS associations (
+  id TEXT PRIMARY KEY,
+  name TEXT NOT NULL,
+  type TEXT NOT NULL,
+  description TEXT,
+  content TEXT,
+  join_info TEXT,
+  logo TEXT,
+  contact_info TEXT,
+  website TEXT,
+  created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS admin_users (
+  id TEXT PRIMARY KEY,
+  username TEXT NOT NULL UNIQUE,
+  password_hash TEXT NOT NULL,
+  role TEXT NOT NULL CHECK (role IN ('super_admin', 'content_operator', 'business_operator')),
+  created_at TEXT
+);
+"""
+
+# Postgres array columns, stored as JSON text
+JSON_COLUMNS: Dict[str, set] = {
+    "exhibitions": {"tags", "highlights", "gallery_images"},
+}
+BOOL_COLUMNS: Dict[str, set] = {
+    "exhibitions": {"featured"},
+}
+# Tables whose id defaults to gen_random_uuid() in Postgres
+UUID_TABLES = {"exhibitions", "associations", "admin_users"}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _ident(name: str) -> str:
+    name = name.strip()
+    if not _IDENTIFIER.match(name):
+        raise APIError(f"Invalid identifier: {name}", code="PGRST100", status_code=400)
+    return f'"{name}"'
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+_OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def _parse_logic(expr: str) -> List[Any]:
+    # Parses the PostgREST logical filter syntax used by or_():
+    #   item[,item...] where item is col.op.value, and(...) or or(...)
+    # Values may be double-quoted (with backslash escapes) to contain , . ( )
+    pos = 0
+
+    def parse_list() -> List[Any]:
+        nonlocal pos
+        items = [parse_item()]
+        while pos < len(expr) and expr[pos] == ",":
+            pos += 1
+            items.append(parse_item())
+        return items
+
+    def parse_item() -> Any:
+        nonlocal pos
+        for keyword in ("and(", "or("):
+            if expr.startswith(keyword, pos):
+                pos += len(keyword)
+                items = parse_list()
+                if pos >= len(expr) or expr[pos] != ")":
+                    raise APIError(f"Invalid logic tree: {expr}", code="PGRST100", status_code=400)
+                pos += 1
+                return (keyword[:-1], items)
+        column, _, rest = expr[pos:].partition(".")
+        op, _, _ = rest.partition(".")
+        pos += len(column) + len(op) + 2
+        if pos < len(expr) and expr[pos] == '"':
+            pos += 1
+            chars = []
+            while pos < len(expr) and expr[pos] != '"':
+                if expr[pos] == "\\" and pos + 1 < len(expr):
+                    pos += 1
+                chars.append(expr[pos])
+                pos += 1
+            pos += 1
+            value: Any = "".join(chars)
+        else:
+            end = pos
+            while end < len(expr) and expr[end] not in ",)":
+                end += 1
+            value = expr[pos:end]
+            pos = end
+            value = None if value == "null" else value
+        return (column, op, value)
+
+    items = parse_list()
+    if pos != len(expr):
+        raise APIError(f"Invalid logic tree: {expr}", code="PGRST100", status_code=400)
+    return items
+
+
+def _compile_logic(items: List[Any], joiner: str, query: "SQLiteQuery", params: List[Any]) -> str:
+    parts = []
+    for item in items:
+        if item[0] in ("and", "or") and isinstance(item[1], list):
+            parts.append(_compile_logic(item[1], item[0].upper(), query, params))
+        else:
+            parts.append(query._condition(item[0], item[1], item[2], params))
+    return "(" + f" {joiner} ".join(parts) + ")"
+
+
+class SQLiteQuery(BaseQuery):
+    def __init__(self, database: "SQLiteDatabase", table: str):
+        super().__init__(table)
+        self._database = database
+
+    def _condition(self, column: str, op: str, value: Any, params: List[Any]) -> str:
+        if op == "or":
+            return _compile_logic(_parse_logic(value), "OR", self, params)
+        if op == "in":
+            if not value:
+                return "0"
+            params.extend(self._encode(column, v) for v in value)
+            return f"{_ident(column)} IN ({', '.join('?' for _ in value)})"
+        if op not in _OPERATORS:
+            raise APIError(f"Unsupported filter: {op}", code="PGRST100", status_code=400)
+        if value is None and op in ("eq", "neq"):
+            return f"{_ident(column)} IS {'NOT ' if op == 'neq' else ''}NULL"
+        params.append(self._encode(column, value))
+        return f"{_ident(column)} {_OPERATORS[op]} ?"
+
+    def _where(self) -> Tuple[str, List[Any]]:
+        params: List[Any] = []
+        clauses = [self._condition(column, op, value, params) for column, op, value in self.filters]
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _order_by(self) -> str:
+        if not self.orders:
+            return ""
+        # Match PostgREST defaults: NULLS LAST for asc, NULLS FIRST for desc
+        parts = []
+        for column, desc in self.orders:
+            col = _ident(column)
+            parts.append(f"{col} IS NULL DESC, {col} DESC" if desc else f"{col} IS NULL, {col} ASC")
+        return " ORDER BY " + ", ".join(parts)
+
+    def _columns(self) -> str:
+        if self.columns.strip() == "*":
+            return "*"
+        return ", ".join(_ident(c) for c in self.columns.split(","))
+
+    def _encode(self, column: str, value: Any) -> Any:
+        if column in JSON_COLUMNS.get(self.table_name, ()) and not isinstance(value, str):
+            return json.dumps(value, ensure_ascii=False)
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
+    def _decode(self, row: sqlite3.Row) -> Dict[str, Any]:
+        data = dict(row)
+        for column in JSON_COLUMNS.get(self.table_name, ()):
+            if isinstance(data.get(column), str):
+                data[column] = json.loads(data[column])
+        for column in BOOL_COLUMNS.get(self.table_name, ()):
+            if column in data and data[column] is not None:
+                data[column] = bool(data[column])
+        return data
+
+    def _with_defaults(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(row)
+        if row.get("id") is None:
+            if self.table_name in UUID_TABLES:
+                row["id"] = str(uuid.uuid4())
+            else:
+                row.pop("id", None)
+        if not row.get("created_at"):
+            row["created_at"] = _now()
+        return row
+
+    def _write(self, conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        table = _ident(self.table_name)
+        where, where_params = self._where()
+        if self.operation in ("insert", "upsert"):
+            rows = self.body if isinstance(self.body, list) else [self.body]
+            result = []
+            for original in rows:
+                row = self._with_defaults(original)
+                columns = list(row)
+                sql = (
+                    f"INSERT INTO {table} ({', '.join(_ident(c) for c in columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})"
+                )
+                if self.operation == "upsert":
+                    conflict = [c.strip() for c in (self.on_conflict or "id").split(",")]
+                    # Only overwrite the columns the caller sent, not filled-in defaults
+                    updates = [c for c in columns if c not in conflict and c in original]
+                    sql += f" ON CONFLICT ({', '.join(_ident(c) for c in conflict)}) DO "
+                    sql += ("UPDATE SET " + ", ".join(f"{_ident(c)} = excluded.{_ident(c)}" for c in updates)) if updates else "NOTHING"
+                sql += " RETURNING *"
+                result.extend(conn.execute(sql, [self._encode(c, row[c]) for c in columns]).fetchall())
+            return [self._decode(r) for r in result]
+        if self.operation == "update":
+            columns = list(self.body)
+            sql = f"UPDATE {table} SET {', '.join(f'{_ident(c)} = ?' for c in columns)}{where} RETURNING *"
+            params = [self._encode(c, self.body[c]) for c in columns] + where_params
+            return [self._decode(r) for r in conn.execute(sql, params).fetchall()]
+        sql = f"DELETE FROM {table}{where} RETURNING *"
+        return [self._decode(r) for r in conn.execute(sql, where_params).fetchall()]
+
+    def _run(self) -> APIResponse:
+        if self.table_name not in TABLES:
+            raise APIError(f"relation \"public.{self.table_name}\" does not exist", code="42P01", status_code=404)
+        conn = self._database.conn
+        count = None
+        with self._database.lock:
+            try:
+                if self.operation == "select":
+                    where, params = self._where()
+                    table = _ident(self.table_name)
+                    sql = f"SELECT {self._columns()} FROM {table}{where}{self._order_by()}"
+                    if self.limit_size is not None:
+                        sql += f" LIMIT {int(self.limit_size)}"
+                    data = [self._decode(r) for r in conn.execute(sql, params).fetchall()]
+                    if self.count:
+                        count = conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+                else:
+                    with conn:
+                        data = self._write(conn)
+            except sqlite3.IntegrityError as e:
+                raise APIError(str(e), code="23505", status_code=409)
+            except sqlite3.Error as e:
+                raise APIError(str(e), status_code=400)
+
+        if self.is_single:
+            if len(data) != 1:
+                raise APIError(
+                    "JSON object requested, multiple (or no) rows returned",
+                    code="PGRST116",
+                    details=f"The result contains {len(data)} rows",
+                    status_code=406,
+                )
+            return APIResponse(data[0], count)
+        return APIResponse(data, count)
+
+    async def _execute(self) -> APIResponse:
+        return self._run()
+
+
+def _rpc_reorder_products(conn: sqlite3.Connection, params: Dict[str, Any]) -> List[str]:
+    # Same contract as public.reorder_products in update_products_sort.sql
+    items = params.get("items") or []
+    unmatched = []
+    for item in items:
+        cursor = conn.execute('UPDATE "products" SET "sort_order" = ? WHERE "id" = ?', (item["sort_order"], item["id"]))
+        if cursor.rowcount == 0:
+            unmatched.append(item["id"])
+    return unmatched
+
+
+def _rpc_exhibition_application_counts(conn: sqlite3.Connection, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Same contract as public.exhibition_application_counts in update_applications_status.sql
+    clauses, values = [], []
+    for column, op, key in (
+        ("exhibition_id", "=", "p_exhibition_id"),
+        ("type", "=", "p_type"),
+        ("created_at", ">=", "p_created_from"),
+        ("created_at", "<", "p_created_to"),
+    ):
+        if params.get(key) is not None:
+            clauses.append(f'"{column}" {op} ?')
+            values.append(params[key])
+    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    sql = f'SELECT "status", COUNT(*) AS "count" FROM "exhibition_applications"{where} GROUP BY "status"'
+    return [dict(row) for row in conn.execute(sql, values).fetchall()]
+
+
+# Python stand-ins for the SQL functions the API calls through rpc()
+RPC_FUNCTIONS: Dict[str, Callable[[sqlite3.Connection, Dict[str, Any]], Any]] = {
+    "reorder_products": _rpc_reorder_products,
+    "exhibition_application_counts": _rpc_exhibition_application_counts,
+}
+
+
+class SQLiteRpc:
+    def __init__(self, database: "SQLiteDatabase", fn: str, params: Dict[str, Any]):
+        self._database = database
+        self.fn = fn
+        self.params = params
+
+    async def execute(self) -> APIResponse:
+        return await guarded(f"rpc/{self.fn}", self._execute)
+
+    async def _execute(self) -> APIResponse:
+        handler = RPC_FUNCTIONS.get(self.fn)
+        if handler is None:
+            raise APIError(f"Could not find the function public.{self.fn}", code="PGRST202", status_code=404)
+        with self._database.lock:
+            try:
+                with self._database.conn:
+                    return APIResponse(handler(self._database.conn, self.params))
+            except sqlite3.Error as e:
+                raise APIError(str(e), status_code=400)
+
+
+class SQLiteDatabase:
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        # Stand-in for Supabase Storage, served at /media by main.py
+        self.media_dir = os.environ.get("MEDIA_DIR", "media")
+
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> SQLiteRpc:
+        return SQLiteRpc(self, fn, params or {})
+
+    def _media_path(self, bucket: str, path: str) -> str:
+        parts = path.split("/")
+        if not _IDENTIFIER.match(bucket) or any(part in ("", ".", "..") for part in parts):
+            raise APIError(f"Invalid object path: {bucket}/{path}", status_code=400)
+        return os.path.join(self.media_dir, bucket, *parts)
+
+    async def upload(self, bucket: str, path: str, data: bytes, content_type: str, cache_control: str = "31536000") -> str:
+        target = self._media_path(bucket, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(data)
+        return self.public_url(bucket, path)
+
+    async def download(self, bucket: str, path: str) -> Optional[bytes]:
+        try:
+            with open(self._media_path(bucket, path), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    async def signed_upload_url(self, bucket: str, path: str) -> Optional[str]:
+        # No direct upload to the local media dir; clients POST the file instead
+        return None
+
+    def public_url(self, bucket: str, path: str) -> str:
+        return f"/media/{bucket}/{path}"
+
+    async def aclose(self) -> None:
+        # Keep the connection open: an in-memory database would lose its data
+        pass
@@ -0,0 +1,349 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from changes import subscribe
+from database import db
+from rate_limit import INTERNAL_CLIENT
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines; DirectoryStore then skips the lock
+    fcntl = None
+
+# Static snapshots of the public GET API, for serving from a CDN.
+# Every public response (the lists, /api/bootstrap/ and each exhibition and
+# association) is rendered through the app itself, so a file holds exactly
+# the bytes the API would return, and is stored under its content hash:
+#   v1/products.3f9a1c0e7b2d.json            immutable, cache forever
+#   v1/exhibitions/<id>.<hash>.json
+#   manifest.json                            API path -> file, short cache
+# An unchanged response keeps its file name, so reruns only write what
+# changed. With SNAPSHOT_DIR or SNAPSHOT_BUCKET set on the API, admin writes
+# regenerate just the paths that read the written table, inline before the
+# write's response is sent (a serverless instance freezes once it has
+# answered, so nothing is left to a background task). Several instances may
+# export at once: each re-reads manifest.json, applies only the paths it
+# rendered and replaces it only if nobody else did in between, else retries.
+# POST /api/admin/snapshots (or a scheduled job) runs a full export, which
+# also repairs anything a failed inline export left behind.
+#   python static_export.py --out ../public/snapshot --prune
+#   python static_export.py --bucket snapshots
+
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "")
+SNAPSHOT_BUCKET = os.environ.get("SNAPSHOT_BUCKET", "")
+# Attempts to replace manifest.json when other exporters keep changing it
+SNAPSHOT_MANIFEST_RETRIES = int(os.environ.get("SNAPSHOT_MANIFEST_RETRIES", "5"))
+SNAPSHOT_VERSION = "v1"
+MANIFEST = "manifest.json"
+MANIFEST_MAX_AGE = "60"
+
+# Public list endpoints -> file stem
+LIST_PATHS = {
+    "/api/solutions/": "solutions",
+    "/api/products/": "products",
+    "/api/partners/": "benefits",
+    "/api/news/": "news",
+    "/api/exhibitions/": "exhibitions",
+    "/api/associations/": "associations",
+    "/api/bootstrap/": "bootstrap",
+}
+# Tables with a public per-id endpoint, and the list that enumerates the ids
+DETAIL_PATHS = {
+    "exhibitions": ("/api/exhibitions/", "/api/exhibitions/{id}"),
+    "associations": ("/api/associations/", "/api/associations/{id}"),
+}
+# Which snapshots read each table
+TABLE_PATHS = {
+    "solutions": ["/api/solutions/", "/api/bootstrap/"],
+    "products": ["/api/products/", "/api/bootstrap/"],
+    "partner_benefits": ["/api/partners/", "/api/bootstrap/"],
+    "news_items": ["/api/news/", "/api/bootstrap/"],
+    "exhibitions": ["/api/exhibitions/", "/api/bootstrap/"],
+    "associations": ["/api/associations/"],
+}
+
+
+def snapshot_file(path: str, body: bytes) -> str:
+    # "/api/exhibitions/<id>" -> "v1/exhibitions/<id>.<hash>.json"
+    stem = LIST_PATHS.get(path) or path[len("/api/"):].strip("/")
+    digest = hashlib.sha256(body).hexdigest()[:12]
+    return f"{SNAPSHOT_VERSION}/{stem}.{digest}.json"
+
+
+class DirectoryStore:
+    def __init__(self, root: str):
+        self.root = root
+
+    async def read(self, name: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.root, name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    async def write(self, name: str, data: bytes, immutable: bool) -> None:
+        target = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Readers never see a half-written manifest
+        tmp = f"{target}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+
+    async def replace_if(self, name: str, data: bytes, expected: Optional[bytes]) -> bool:
+        # Compare-and-swap: write only if the file still holds `expected`
+        # (None: does not exist). The lock serializes exporters on this host.
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, f".{name}.lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            if await self.read(name) != expected:
+                return False
+            await self.write(name, data, immutable=False)
+            return True
+
+    def prune(self, keep: Iterable[str]) -> int:
+        keep = set(keep)
+        removed = 0
+        version_dir = os.path.join(self.root, SNAPSHOT_VERSION)
+        for dirpath, _, filenames in os.walk(version_dir):
+            for filename in filenames:
+                name = os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, "/")
+                if name not in keep:
+                    os.remove(os.path.join(dirpath, filename))
+                    removed += 1
+        return removed
+
+
+class BucketStore:
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+
+    async def read(self, name: str) -> Optional[bytes]:
+        return await db.download(self.bucket, name)
+
+    async def write(self, name: str, data: bytes, immutable: bool) -> None:
+        cache_control = "31536000" if immutable else MANIFEST_MAX_AGE
+        await db.upload(self.bucket, name, data, "application/json", cache_control=cache_control)
+
+    async def replace_if(self, name: str, data: bytes, expected: Optional[bytes]) -> bool:
+        # Storage has no conditional upload: check, then write. Two exporters
+        # can still both pass the check within one round trip; the next full
+        # export repairs that.
+        if await self.read(name) != expected:
+            return False
+        await self.write(name, data, immutable=False)
+        return True
+
+
+class SnapshotExporter:
+    def __init__(self, store, app):
+        self.store = store
+        self.app = app
+        # Last manifest this process read or wrote, for stats only
+        self.manifest: Optional[dict] = None
+        self.written = 0
+        self.unchanged = 0
+        self.conflicts = 0
+        # Paths to re-render, and tables whose every detail page must be re-rendered
+        self._pending: Set[str] = set()
+        self._pending_tables: Set[str] = set()
+        self._lock = asyncio.Lock()
+
+    async def _read_manifest(self) -> Tuple[Optional[bytes], dict]:
+        # Always from the store: other instances export too
+        raw = await self.store.read(MANIFEST)
+        self.manifest = json.loads(raw) if raw else {"version": SNAPSHOT_VERSION, "files": {}}
+        return raw, self.manifest
+
+    async def _render(self, client, path: str) -> Optional[bytes]:
+        response = await client.get(path)
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+        # Never publish a stale fallback as if it were current
+        if "x-data-stale" in response.headers:
+            raise RuntimeError(f"GET {path} served stale data")
+        if path == "/api/bootstrap/" and "errors" in response.json():
+            raise RuntimeError(f"GET {path} is missing sections: {response.json()['errors']}")
+        return response.content
+
+    async def export(self, paths: Optional[Iterable[str]] = None, detail_tables: Iterable[str] = ()) -> dict:
+        # paths=None exports everything and drops snapshots that no longer exist
+        import httpx
+
+        _, manifest = await self._read_manifest()
+        full = paths is None
+        paths = list(LIST_PATHS) if full else list(paths)
+        detail_tables = set(DETAIL_PATHS) if full else set(detail_tables)
+        rendered: Dict[str, Optional[bytes]] = {}
+
+        # Rendered as an internal client, exempt from rate limiting
+        transport = httpx.ASGITransport(app=self.app, client=INTERNAL_CLIENT)
+        async with httpx.AsyncClient(transport=transport, base_url="http://snapshot") as client:
+            for path in list(dict.fromkeys(paths)):
+                rendered[path] = await self._render(client, path)
+            for table in detail_tables:
+                list_path, detail_path = DETAIL_PATHS[table]
+                body = rendered.get(list_path) or await self._render(client, list_path)
+                ids = [str(row["id"]) for row in json.loads(body or b"[]") if row.get("id") is not None]
+                for row_id in ids:
+                    rendered[detail_path.format(id=row_id)] = await self._render(client, detail_path.format(id=row_id))
+                # Detail pages of rows that are gone
+                prefix = detail_path.format(id="")
+                for path in [p for p in manifest["files"] if p.startswith(prefix) and p != list_path and p[len(prefix):] not in ids]:
+                    rendered[path] = None
+
+        # Content files are immutable, so writing them needs no coordination
+        names: Dict[str, Optional[str]] = {}
+        for path, body in rendered.items():
+            if body is None:
+                names[path] = None
+                continue
+            name = names[path] = snapshot_file(path, body)
+            if manifest["files"].get(path) == name:
+                self.unchanged += 1
+                continue
+            await self.store.write(name, body, immutable=True)
+            self.written += 1
+
+        for _ in range(SNAPSHOT_MANIFEST_RETRIES):
+            # Re-read: another instance may have published while we rendered.
+            # Only the paths rendered here change; the rest is whatever is stored now
+            raw, manifest = await self._read_manifest()
+            files: Dict[str, str] = {} if full else dict(manifest["files"])
+            for path, name in names.items():
+                if name is None:
+                    files.pop(path, None)
+                else:
+                    files[path] = name
+            if files == manifest["files"]:
+                return manifest
+            updated = {
+                "version": SNAPSHOT_VERSION,
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "files": dict(sorted(files.items())),
+            }
+            data = json.dumps(updated, ensure_ascii=False, indent=1).encode("utf-8")
+            if await self.store.replace_if(MANIFEST, data, raw):
+                self.manifest = updated
+                return updated
+            self.conflicts += 1
+        raise RuntimeError(f"{MANIFEST} kept changing, gave up after {SNAPSHOT_MANIFEST_RETRIES} attempts")
+
+    def apply_change(self, table: str, rows: Optional[List[dict]], deleted: bool) -> None:
+        if table not in TABLE_PATHS:
+            return
+        self._pending.update(TABLE_PATHS[table])
+        if table in DETAIL_PATHS:
+            _, detail_path = DETAIL_PATHS[table]
+            if rows is None:
+                self._pending_tables.add(table)
+            else:
+                # A deleted row renders as 404 and is dropped from the manifest
+                self._pending.update(detail_path.format(id=row["id"]) for row in rows if row.get("id") is not None)
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._pending or self._pending_tables)
+
+    async def flush(self) -> None:
+        # Concurrent writes in this process export one after the other
+        async with self._lock:
+            while self.pending:
+                paths, tables = self._pending, self._pending_tables
+                self._pending, self._pending_tables = set(), set()
+                try:
+                    await self.export(paths, tables)
+                    print(f"Snapshot export: refreshed {len(paths)} path(s)")
+                except Exception as e:
+                    # Keep the manifest pointing at the last good files; the next write retries
+                    print(f"Snapshot export failed: {e}")
+                    self._pending |= paths
+                    self._pending_tables |= tables
+                    return
+
+    async def stop(self) -> None:
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "files": len((self.manifest or {}).get("files", {})),
+            "written": self.written,
+            "unchanged": self.unchanged,
+            "pending": len(self._pending) + len(self._pending_tables),
+            "conflicts": self.conflicts,
+        }
+
+
+class SnapshotFlushMiddleware:
+    # Exports what a write changed before its response starts, so the work
+    # is done while the (serverless) invocation is still running
+    def __init__(self, app, exporter: SnapshotExporter):
+        self.app = app
+        self.exporter = exporter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_after_flush(message):
+            if message["type"] == "http.response.start" and self.exporter.pending:
+                await self.exporter.flush()
+            await send(message)
+
+        await self.app(scope, receive, send_after_flush)
+
+
+snapshot_exporter: Optional[SnapshotExporter] = None
+
+
+def configure_snapshots(app) -> Optional[SnapshotExporter]:
+    # Regenerate snapshots after admin writes when a target is configured
+    global snapshot_exporter
+    if SNAPSHOT_DIR:
+        snapshot_exporter = SnapshotExporter(DirectoryStore(SNAPSHOT_DIR), app)
+    elif SNAPSHOT_BUCKET:
+        snapshot_exporter = SnapshotExporter(BucketStore(SNAPSHOT_BUCKET), app)
+    if snapshot_exporter is not None:
+        subscribe(snapshot_exporter.apply_change)
+        app.add_middleware(SnapshotFlushMiddleware, exporter=snapshot_exporter)
+    return snapshot_exporter
+
+
+async def stop_snapshots() -> None:
+    if snapshot_exporter is not None:
+        await snapshot_exporter.stop()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Export public API responses as content-hashed static JSON")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="directory to write, e.g. ../public/snapshot")
+    target.add_argument("--bucket", help="storage bucket to upload to")
+    parser.add_argument("--prune", action="store_true", help="delete files no longer in the manifest (--out only)")
+    args = parser.parse_args()
+
+    from main import app
+
+    store = DirectoryStore(args.out) if args.out else BucketStore(args.bucket)
+    exporter = SnapshotExporter(store, app)
+    try:
+        manifest = await exporter.export()
+    finally:
+        await db.aclose()
+    print(f"Exported {len(manifest['files'])} paths: {exporter.written} written, {exporter.unchanged} unchanged")
+    if args.prune and args.out:
+        removed = store.prune(manifest["files"].values())
+        print(f"Pruned {removed} old files")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { supabase } from '../lib/supabaseClient';
+import { api } from '../services/api';
 import { Upload, X, Loader2 } from 'lucide-react';
 
 interface ImageUploadProps {
@@ -24,27 +24,10 @@ export default function ImageUpload({ value, onChange, disabled, className = '',
       }
 
       const file = event.target.files[0];
-      const fileExt = file.name.split('.').pop();
-      const fileName = `${Math.random().toString(36).substring(2, 15)}_${Date.now()}.${fileExt}`;
-      const filePath = `${fileName}`;
 
-      // 1. 上传到 Supabase Storage 'images' bucket
-      const { error: uploadError } = await supabase.storage
-        .from('images')
-        .upload(filePath, file);
-
-      if (uploadError) {
-        throw uploadError;
-      }
-
-      // 2. 获取公开访问 URL
-      const { data } = supabase.storage
-        .from('images')
-        .getPublicUrl(filePath);
-
-      if (data) {
-        onChange(data.publicUrl);
-      }
+      // 上传到后端，由服务端生成缩略图及 WebP/AVIF 多尺寸版本
+      const manifest = await api.admin.uploadImage(file);
+      onChange(manifest.original);
     } catch (error: any) {
       console.error('Error uploading image:', error);
       setError(error.message || '上传失败，请重试');
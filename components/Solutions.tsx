@@ -4,12 +4,20 @@ import { api } from '../services/api';
 import { Solution } from '../types';
 import * as Icons from 'lucide-react';
 
-const Solutions: React.FC = () => {
-  const [solutions, setSolutions] = useState<Solution[]>([]);
+interface SolutionsProps {
+  // Preloaded by the parent (e.g. from /api/bootstrap); fetched here when omitted
+  items?: Solution[];
+}
+
+const Solutions: React.FC<SolutionsProps> = ({ items }) => {
+  const [fetched, setFetched] = useState<Solution[]>([]);
+  const solutions = items ?? fetched;
 
   useEffect(() => {
-    api.getSolutions().then(setSolutions);
-  }, []);
+    if (items === undefined) {
+      api.getSolutions().then(setFetched);
+    }
+  }, [items]);
 
   return (
     <section id="solutions" className="py-24 bg-white">
@@ -1,7 +1,111 @@
-import { Solution, Product, PartnerBenefit, NewsItem, AdminUserCreate, AdminUser, ExhibitionApplication, Exhibition } from '../types';
+import { Solution, Product, PartnerBenefit, NewsItem, AdminUserCreate, AdminUser, ExhibitionApplication, Exhibition, ExhibitionFilters, Bootstrap, BootstrapSection, ImageManifest, ImageUploadTarget, SearchHitType, SearchResults, ApplicationEvent, ApplicationFilters, ApplicationCounts, ApplicationStatus, ApplicationBulkResult } from '../types';
 
 const API_BASE_URL = import.meta.env.PROD ? '/api' : 'http://localhost:8000/api';
 
+// Optional static snapshots of public content (backend/static_export.py), e.g. '/snapshot' or a CDN URL
+const SNAPSHOT_URL: string = import.meta.env.VITE_SNAPSHOT_URL || '';
+const SNAPSHOT_MANIFEST_TTL = 60_000;
+let snapshotManifest: { files: Record<string, string> | null; loadedAt: number; pending?: Promise<Record<string, string> | null> } = { files: null, loadedAt: 0 };
+
+async function loadSnapshotManifest(): Promise<Record<string, string> | null> {
+  if (snapshotManifest.loadedAt && Date.now() - snapshotManifest.loadedAt < SNAPSHOT_MANIFEST_TTL) {
+    return snapshotManifest.files;
+  }
+  if (!snapshotManifest.pending) {
+    snapshotManifest.pending = fetch(`${SNAPSHOT_URL}/manifest.json`, { cache: 'no-cache' })
+      .then(response => (response.ok ? response.json() : null))
+      .then(data => (data && data.files) || null)
+      .catch(() => null)
+      .then(files => {
+        snapshotManifest = { files, loadedAt: Date.now() };
+        return files;
+      });
+  }
+  return snapshotManifest.pending;
+}
+
+// Public GETs: the snapshot file when the manifest has this exact path, otherwise the API.
+// Signed-in admins always read the API so their own edits show up immediately.
+async function fetchPublic(path: string): Promise<Response> {
+  if (SNAPSHOT_URL && !localStorage.getItem('access_token')) {
+    const files = await loadSnapshotManifest();
+    const file = files?.[`/api${path}`];
+    if (file) {
+      try {
+        const response = await fetch(`${SNAPSHOT_URL}/${file}`);
+        if (response.ok) {
+          return response;
+        }
+      } catch {
+        // Fall through to the API
+      }
+    }
+  }
+  return fetch(`${API_BASE_URL}${path}`);
+}
+
+// EventSource cannot send an Authorization header, so the admin feed is
+// read with fetch and parsed here; reconnects resume from Last-Event-ID.
+async function readEventStream(
+  url: string,
+  onEvent: (event: string, data: string) => void,
+  signal: AbortSignal,
+) {
+  let lastEventId = '';
+  let retry = 3000;
+  while (!signal.aborted) {
+    try {
+      const headers: Record<string, string> = { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` };
+      if (lastEventId) headers['Last-Event-ID'] = lastEventId;
+      const response = await fetch(url, { headers, signal });
+      if (response.status === 401 || response.status === 403) return;
+      if (response.status === 400) lastEventId = '';
+      if (!response.ok || !response.body) throw new Error(`Stream failed: ${response.status}`);
+
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = '';
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+        let end;
+        while ((end = buffer.indexOf('\n\n')) !== -1) {
+          const block = buffer.slice(0, end);
+          buffer = buffer.slice(end + 2);
+          let event = 'message';
+          const data: string[] = [];
+          for (const line of block.split('\n')) {
+            if (!line || line.startsWith(':')) continue;
+            const sep = line.indexOf(':');
+            const field = sep === -1 ? line : line.slice(0, sep);
+            const text = sep === -1 ? '' : line.slice(sep + 1).replace(/^ /, '');
+            if (field === 'id') lastEventId = text;
+            else if (field === 'event') event = text;
+            else if (field === 'data') data.push(text);
+            else if (field === 'retry' && /^\d+$/.test(text)) retry = Number(text);
+          }
+          if (data.length) onEvent(event, data.join('\n'));
+        }
+      }
+    } catch (e) {
+      if (signal.aborted) return;
+      console.warn('Application stream interrupted, reconnecting:', e);
+    }
+    await new Promise((resolve) => setTimeout(resolve, retry));
+  }
+}
+
+function applicationQuery(filters: ApplicationFilters): string {
+  const params = new URLSearchParams();
+  if (filters.status?.length) params.set('status', filters.status.join(','));
+  if (filters.exhibition_id) params.set('exhibition_id', filters.exhibition_id);
+  if (filters.type) params.set('type', filters.type);
+  if (filters.from) params.set('from', filters.from);
+  if (filters.to) params.set('to', filters.to);
+  const query = params.toString();
+  return query ? `?${query}` : '';
+}
+
 async function handleJsonResponse(response: Response, defaultMessage: string) {
   if (response.ok) {
     return response.json();
@@ -32,7 +136,7 @@ async function handleJsonResponse(response: Response, defaultMessage: string) {
 export const api = {
   getSolutions: async (): Promise<Solution[]> => {
     try {
-      const response = await fetch(`${API_BASE_URL}/solutions/`);
+      const response = await fetchPublic('/solutions/');
       return await handleJsonResponse(response, 'Failed to fetch solutions');
     } catch (error) {
       console.error('Error fetching solutions:', error);
@@ -41,7 +145,7 @@ export const api = {
   },
   getProducts: async (): Promise<Product[]> => {
     try {
-      const response = await fetch(`${API_BASE_URL}/products/`);
+      const response = await fetchPublic('/products/');
       return await handleJsonResponse(response, 'Failed to fetch products');
     } catch (error) {
       console.error('Error fetching products:', error);
@@ -50,7 +154,7 @@ export const api = {
   },
   getBenefits: async (): Promise<PartnerBenefit[]> => {
     try {
-      const response = await fetch(`${API_BASE_URL}/partners/`);
+      const response = await fetchPublic('/partners/');
       return await handleJsonResponse(response, 'Failed to fetch benefits');
     } catch (error) {
       console.error('Error fetching benefits:', error);
@@ -59,16 +163,23 @@ export const api = {
   },
   getNews: async (): Promise<NewsItem[]> => {
     try {
-      const response = await fetch(`${API_BASE_URL}/news/`);
+      const response = await fetchPublic('/news/');
       return await handleJsonResponse(response, 'Failed to fetch news');
     } catch (error) {
       console.error('Error fetching news:', error);
       return [];
     }
   },
-  getExhibitions: async (): Promise<Exhibition[]> => {
+  getExhibitions: async (filters?: ExhibitionFilters): Promise<Exhibition[]> => {
     try {
-      const response = await fetch(`${API_BASE_URL}/exhibitions/`);
+      // city / from / to / featured are answered by the server-side calendar index
+      const params = new URLSearchParams();
+      if (filters?.city) params.set('city', filters.city);
+      if (filters?.from) params.set('from', filters.from);
+      if (filters?.to) params.set('to', filters.to);
+      if (filters?.featured !== undefined) params.set('featured', String(filters.featured));
+      const query = params.toString() ? `?${params}` : '';
+      const response = await fetchPublic(`/exhibitions/${query}`);
       return await handleJsonResponse(response, 'Failed to fetch exhibitions');
     } catch (error) {
       console.error('Error fetching exhibitions:', error);
@@ -77,7 +188,7 @@ export const api = {
   },
   getExhibition: async (id: string): Promise<Exhibition | null> => {
     try {
-      const response = await fetch(`${API_BASE_URL}/exhibitions/${id}`);
+      const response = await fetchPublic(`/exhibitions/${id}`);
       return await handleJsonResponse(response, 'Failed to fetch exhibition');
     } catch (error) {
       console.error(`Error fetching exhibition ${id}:`, error);
@@ -86,7 +197,7 @@ export const api = {
   },
   getAssociations: async (): Promise<Association[]> => {
     try {
-      const response = await fetch(`${API_BASE_URL}/associations/`);
+      const response = await fetchPublic('/associations/');
       return await handleJsonResponse(response, 'Failed to fetch associations');
     } catch (error) {
       console.error('Error fetching associations:', error);
@@ -95,13 +206,31 @@ export const api = {
   },
   getAssociation: async (id: string): Promise<Association | null> => {
     try {
-      const response = await fetch(`${API_BASE_URL}/associations/${id}`);
+      const response = await fetchPublic(`/associations/${id}`);
       return await handleJsonResponse(response, 'Failed to fetch association');
     } catch (error) {
       console.error(`Error fetching association ${id}:`, error);
       return null;
     }
   },
+  getBootstrap: async (sections?: BootstrapSection[]): Promise<Bootstrap> => {
+    try {
+      const query = sections && sections.length > 0 ? `?sections=${sections.join(',')}` : '';
+      const response = await fetchPublic(`/bootstrap/${query}`);
+      return await handleJsonResponse(response, 'Failed to fetch bootstrap');
+    } catch (error) {
+      console.error('Error fetching bootstrap:', error);
+      return {};
+    }
+  },
+  search: async (q: string, types?: SearchHitType[], limit = 20, offset = 0): Promise<SearchResults> => {
+    const params = new URLSearchParams({ q, limit: String(limit), offset: String(offset) });
+    if (types && types.length > 0) {
+      params.set('types', types.join(','));
+    }
+    const response = await fetch(`${API_BASE_URL}/search/?${params}`);
+    return await handleJsonResponse(response, 'Search failed');
+  },
   submitApplication: async (data: { name: string; phone: string; company: string; target_city: string; message: string }) => {
     try {
       const response = await fetch(`${API_BASE_URL}/partners/apply`, {
@@ -173,6 +302,46 @@ export const api = {
     }
   },
   admin: {
+    uploadImage: async (file: File): Promise<ImageManifest> => {
+      // The server stores the original plus resized AVIF/WebP versions
+      const token = localStorage.getItem('access_token');
+      const headers = { 'Content-Type': 'application/json', 'Authorization': `Bearer ${token}` };
+      // 1. 申请直传地址：原图直接上传到 Storage，不经过 serverless 函数（请求体上限约 4.5MB）
+      const target: ImageUploadTarget = await handleJsonResponse(await fetch(`${API_BASE_URL}/images/uploads`, {
+        method: 'POST',
+        headers,
+        body: JSON.stringify({ filename: file.name }),
+      }), 'Failed to upload image');
+      if (file.size > target.max_bytes) {
+        throw new Error(`图片不能超过 ${Math.floor(target.max_bytes / 1024 / 1024)} MB`);
+      }
+      if (!target.upload_url) {
+        // 本地 SQLite 后端没有直传，文件直接交给后端处理
+        const body = new FormData();
+        body.append('file', file);
+        const response = await fetch(`${API_BASE_URL}/images/`, {
+          method: 'POST',
+          headers: { 'Authorization': `Bearer ${token}` },
+          body,
+        });
+        return await handleJsonResponse(response, 'Failed to upload image');
+      }
+      const stored = await fetch(target.upload_url, {
+        method: 'PUT',
+        headers: { 'Content-Type': file.type || 'application/octet-stream', 'x-upsert': 'true' },
+        body: file,
+      });
+      if (!stored.ok) {
+        throw new Error('Failed to upload image');
+      }
+      // 2. 后端读取已上传的原图，生成多尺寸版本
+      const response = await fetch(`${API_BASE_URL}/images/derivatives`, {
+        method: 'POST',
+        headers,
+        body: JSON.stringify({ path: target.path }),
+      });
+      return await handleJsonResponse(response, 'Failed to process image');
+    },
     createSolution: async (data: Solution) => {
       const response = await fetch(`${API_BASE_URL}/solutions/`, {
         method: 'POST',
@@ -301,9 +470,9 @@ export const api = {
       });
       return await handleJsonResponse(response, 'Failed to fetch applications');
     },
-    getExhibitionApplications: async (): Promise<ExhibitionApplication[]> => {
+    getExhibitionApplications: async (filters: ApplicationFilters = {}): Promise<ExhibitionApplication[]> => {
       const token = localStorage.getItem('access_token');
-      const response = await fetch(`${API_BASE_URL}/exhibitions/applications`, {
+      const response = await fetch(`${API_BASE_URL}/exhibitions/applications${applicationQuery(filters)}`, {
         method: 'GET',
         headers: { 
           'Authorization': `Bearer ${token}`
@@ -311,6 +480,41 @@ export const api = {
       });
       return await handleJsonResponse(response, 'Failed to fetch exhibition applications');
     },
+    getExhibitionApplicationCounts: async (filters: ApplicationFilters = {}): Promise<ApplicationCounts> => {
+      // Counts per status; the status filter itself is ignored
+      const token = localStorage.getItem('access_token');
+      const response = await fetch(`${API_BASE_URL}/exhibitions/applications/counts${applicationQuery({ ...filters, status: undefined })}`, {
+        headers: { 'Authorization': `Bearer ${token}` }
+      });
+      return await handleJsonResponse(response, 'Failed to count exhibition applications');
+    },
+    updateApplicationStatus: async (id: number | string, status: ApplicationStatus) => {
+      const token = localStorage.getItem('access_token');
+      const response = await fetch(`${API_BASE_URL}/exhibitions/applications/${id}`, {
+        method: 'PATCH',
+        headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${token}` },
+        body: JSON.stringify({ status }),
+      });
+      return await handleJsonResponse(response, 'Failed to update application status');
+    },
+    bulkUpdateApplicationStatus: async (ids: (number | string)[], status: ApplicationStatus): Promise<ApplicationBulkResult> => {
+      // One request for the whole selection; rows that cannot change are returned in `skipped`
+      const token = localStorage.getItem('access_token');
+      const response = await fetch(`${API_BASE_URL}/exhibitions/applications`, {
+        method: 'PATCH',
+        headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${token}` },
+        body: JSON.stringify({ ids, status }),
+      });
+      return await handleJsonResponse(response, 'Failed to update application statuses');
+    },
+    streamApplications: (onApplication: (event: ApplicationEvent) => void): (() => void) => {
+      // New partner/exhibition applications as they arrive; returns a stop function
+      const controller = new AbortController();
+      readEventStream(`${API_BASE_URL}/admin/applications/stream`, (event, data) => {
+        if (event === 'application') onApplication(JSON.parse(data));
+      }, controller.signal);
+      return () => controller.abort();
+    },
   },
   checkHealth: async () => {
     try {
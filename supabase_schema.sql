@@ -28,6 +28,13 @@ CREATE TABLE IF NOT EXISTS public.exhibition_applications (
   created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
 );
 
+-- Admin list filters (status / exhibition / type / date range), newest first;
+-- see update_applications_status.sql for the per-status counts function
+CREATE INDEX IF NOT EXISTS exhibition_applications_created_idx ON public.exhibition_applications (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS exhibition_applications_status_idx ON public.exhibition_applications (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS exhibition_applications_exhibition_idx ON public.exhibition_applications (exhibition_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS exhibition_applications_type_idx ON public.exhibition_applications (type, created_at DESC, id DESC);
+
 -- Enable RLS
 ALTER TABLE public.exhibition_applications ENABLE ROW LEVEL SECURITY;
 
@@ -50,9 +50,17 @@ create table if not exists public.exhibition_applications (
   phone text not null,
   email text,
   message text,
+  status text default 'pending' check (status in ('pending', 'contacted', 'approved', 'rejected')),
   created_at timestamp with time zone default timezone('utc'::text, now()) not null
 );
 
+-- Admin list filters (status / exhibition / type / date range), newest first;
+-- see update_applications_status.sql for the per-status counts function
+create index if not exists exhibition_applications_created_idx on public.exhibition_applications (created_at desc, id desc);
+create index if not exists exhibition_applications_status_idx on public.exhibition_applications (status, created_at desc, id desc);
+create index if not exists exhibition_applications_exhibition_idx on public.exhibition_applications (exhibition_id, created_at desc, id desc);
+create index if not exists exhibition_applications_type_idx on public.exhibition_applications (type, created_at desc, id desc);
+
 -- Enable RLS for applications
 alter table public.exhibition_applications enable row level security;
 
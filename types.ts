@@ -14,6 +14,7 @@ export interface Product {
   description: string;
   image: string;
   video?: string;
+  thumbnail?: string;
 }
 
 export interface PartnerBenefit {
@@ -31,6 +32,7 @@ export interface NewsItem {
   image: string;
   source?: string;
   author?: string;
+  thumbnail?: string;
 }
 
 export type AdminRole = 'super_admin' | 'content_operator' | 'business_operator';
@@ -63,6 +65,14 @@ export interface Exhibition {
   highlights?: string[];
   gallery_images?: string[];
   created_at?: string;
+  thumbnail?: string;
+}
+
+export interface ExhibitionFilters {
+  city?: string;
+  from?: string; // YYYY-MM-DD, inclusive
+  to?: string;
+  featured?: boolean;
 }
 
 export interface Association {
@@ -76,8 +86,28 @@ export interface Association {
   contact_info?: string;
   website?: string;
   created_at?: string;
+  thumbnail?: string;
+}
+
+export interface ImageManifest {
+  original: string;
+  width: number;
+  height: number;
+  type: string;
+  src: string;
+  thumbnail: string;
+  sources: { type: string; srcset: string }[];
+  sizes: string;
 }
 
+export interface ImageUploadTarget {
+  path: string;
+  upload_url: string | null;
+  max_bytes: number;
+}
+
+export type ApplicationStatus = 'pending' | 'contacted' | 'approved' | 'rejected';
+
 export interface ExhibitionApplication {
   id?: number;
   exhibition_id: string;
@@ -88,5 +118,68 @@ export interface ExhibitionApplication {
   phone: string;
   email?: string;
   message?: string;
+  status?: ApplicationStatus;
   created_at?: string;
 }
+
+export interface ApplicationFilters {
+  status?: ApplicationStatus[];
+  exhibition_id?: string;
+  type?: 'ticket' | 'booth';
+  from?: string; // YYYY-MM-DD, inclusive
+  to?: string;
+}
+
+export interface ApplicationCounts {
+  total: number;
+  by_status: Record<ApplicationStatus, number>;
+}
+
+export interface ApplicationBulkResult {
+  status: string;
+  updated: (number | string)[];
+  skipped: (number | string)[];
+}
+
+export interface PartnerApplication {
+  id?: number | string;
+  name: string;
+  phone: string;
+  company: string;
+  target_city: string;
+  message?: string;
+  created_at?: string;
+}
+
+export type ApplicationEvent =
+  | { type: 'partner'; application: PartnerApplication }
+  | { type: 'exhibition'; application: ExhibitionApplication };
+
+export type BootstrapSection = 'solutions' | 'products' | 'benefits' | 'news' | 'exhibitions';
+
+export interface Bootstrap {
+  solutions?: Solution[];
+  products?: Product[];
+  benefits?: PartnerBenefit[];
+  news?: NewsItem[];
+  exhibitions?: Exhibition[]; // featured only
+  errors?: Record<string, string>;
+}
+
+export type SearchHitType = 'product' | 'news' | 'exhibition' | 'association';
+
+export interface SearchHit {
+  type: SearchHitType;
+  id: string;
+  title: string;
+  summary: string;
+  image?: string;
+  thumbnail?: string;
+  score: number;
+}
+
+export interface SearchResults {
+  query: string;
+  total: number;
+  hits: SearchHit[];
+}
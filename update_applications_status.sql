@@ -0,0 +1,43 @@
+-- Status workflow for exhibition applications (pending -> contacted -> approved/rejected).
+-- Safe to re-run on existing projects: supabase_schema_exhibitions.sql
+-- created the table without a status column.
+ALTER TABLE public.exhibition_applications
+  ADD COLUMN IF NOT EXISTS status TEXT DEFAULT 'pending' CHECK (status IN ('pending', 'contacted', 'approved', 'rejected'));
+UPDATE public.exhibition_applications SET status = 'pending' WHERE status IS NULL;
+
+-- Indexes for GET /api/exhibitions/applications, newest first, keyset-paged on (created_at, id):
+--   no filter / from-to range    -> created_idx
+--   ?status=                     -> status_idx (also the GROUP BY in the counts function)
+--   ?exhibition_id=              -> exhibition_idx
+--   ?type= (admin tabs)          -> type_idx
+CREATE INDEX IF NOT EXISTS exhibition_applications_created_idx
+  ON public.exhibition_applications (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS exhibition_applications_status_idx
+  ON public.exhibition_applications (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS exhibition_applications_exhibition_idx
+  ON public.exhibition_applications (exhibition_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS exhibition_applications_type_idx
+  ON public.exhibition_applications (type, created_at DESC, id DESC);
+
+-- Per-status counts used by GET /api/exhibitions/applications/counts, in one
+-- aggregate query. NULL arguments mean "no filter"; p_created_to is exclusive.
+-- exhibition_id is TEXT in one schema and UUID in the other, hence %TYPE.
+-- Usage: select * from public.exhibition_application_counts(p_type => 'booth');
+CREATE OR REPLACE FUNCTION public.exhibition_application_counts(
+  p_exhibition_id public.exhibition_applications.exhibition_id%TYPE DEFAULT NULL,
+  p_type TEXT DEFAULT NULL,
+  p_created_from TIMESTAMPTZ DEFAULT NULL,
+  p_created_to TIMESTAMPTZ DEFAULT NULL
+)
+RETURNS TABLE (status TEXT, count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT a.status, COUNT(*)
+  FROM public.exhibition_applications AS a
+  WHERE (p_exhibition_id IS NULL OR a.exhibition_id = p_exhibition_id)
+    AND (p_type IS NULL OR a.type = p_type)
+    AND (p_created_from IS NULL OR a.created_at >= p_created_from)
+    AND (p_created_to IS NULL OR a.created_at < p_created_to)
+  GROUP BY a.status;
+$$;
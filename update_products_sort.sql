@@ -11,3 +11,27 @@ UPDATE public.products
 SET sort_order = ranked_products.rn * 10
 FROM ranked_products
 WHERE public.products.id = ranked_products.id;
+
+-- Bulk reorder used by PUT /api/products/reorder.
+-- Applies the whole ordering in one statement (atomic, one round trip) and
+-- returns the ids that did not match any product.
+-- Usage: select public.reorder_products('[{"id": "s1", "sort_order": 10}]'::jsonb);
+CREATE OR REPLACE FUNCTION public.reorder_products(items JSONB)
+RETURNS TEXT[]
+LANGUAGE sql
+AS $$
+  WITH input AS (
+    SELECT x.id, x.sort_order
+    FROM jsonb_to_recordset(items) AS x(id TEXT, sort_order INTEGER)
+  ),
+  updated AS (
+    UPDATE public.products AS p
+    SET sort_order = input.sort_order
+    FROM input
+    WHERE p.id::text = input.id
+    RETURNING p.id::text AS id
+  )
+  SELECT COALESCE(array_agg(input.id), '{}')
+  FROM input
+  WHERE NOT EXISTS (SELECT 1 FROM updated WHERE updated.id = input.id);
+$$;
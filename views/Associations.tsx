@@ -73,7 +73,7 @@ const AssociationsView: React.FC<AssociationsViewProps> = ({ onNavigate, onSelec
               <div className="flex items-start justify-between mb-6">
                 <div className="w-16 h-16 rounded-xl bg-slate-50 p-2 flex items-center justify-center border border-slate-100 group-hover:scale-110 transition-transform duration-300">
                   {item.logo ? (
-                    <img src={item.logo} alt={item.name} className="w-full h-full object-contain" />
+                    <img src={item.thumbnail || item.logo} alt={item.name} className="w-full h-full object-contain" />
                   ) : (
                     <Building2 className="text-slate-400" size={32} />
                   )}
@@ -18,6 +18,17 @@ const CITIES = [
   '深圳', '广州', '北京', '上海', '成都', '珠海', '杭州', '西安', '南京'
 ];
 
+// '2026年3月' -> { from: '2026-03-01', to: '2026-03-31' }
+const monthRange = (label: string): { from?: string; to?: string } => {
+  const match = label.match(/^(\d{4})年(\d{1,2})月$/);
+  if (!match) return {};
+  const year = Number(match[1]);
+  const month = Number(match[2]);
+  const lastDay = new Date(year, month, 0).getDate();
+  const pad = (n: number) => String(n).padStart(2, '0');
+  return { from: `${year}-${pad(month)}-01`, to: `${year}-${pad(month)}-${pad(lastDay)}` };
+};
+
 const ExhibitionsView: React.FC<ExhibitionsViewProps> = ({ onNavigate, onSelectExhibition }) => {
   const [exhibitions, setExhibitions] = useState<Exhibition[]>([]);
   const [selectedMonth, setSelectedMonth] = useState<string>('全部');
@@ -26,20 +37,20 @@ const ExhibitionsView: React.FC<ExhibitionsViewProps> = ({ onNavigate, onSelectE
   useEffect(() => {
     const loadExhibitions = async () => {
       try {
-        const data = await api.getExhibitions();
+        // 城市与月份筛选由服务端的展会日历索引完成
+        const data = await api.getExhibitions({
+          city: selectedCity === '全部' ? undefined : selectedCity,
+          ...monthRange(selectedMonth),
+        });
         setExhibitions(data);
       } catch (error) {
         console.error('Failed to load exhibitions:', error);
       }
     };
     loadExhibitions();
-  }, []);
+  }, [selectedCity, selectedMonth]);
 
-  const filteredExhibitions = exhibitions.filter(ex => {
-    const cityMatch = selectedCity === '全部' || ex.city === selectedCity;
-    // For now, date filtering is not implemented strictly as it requires parsing
-    return cityMatch;
-  });
+  const filteredExhibitions = exhibitions;
 
   return (
     <div className="min-h-screen bg-slate-50 pb-20">
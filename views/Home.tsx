@@ -5,7 +5,7 @@ import Solutions from '../components/Solutions';
 import { ViewType } from '../App';
 import { TrendingUp, Award, Zap, Globe } from 'lucide-react';
 import { api } from '../services/api';
-import { Product } from '../types';
+import { Product, Solution } from '../types';
 import { PRODUCTS } from '../constants';
 
 interface HomeViewProps {
@@ -14,9 +14,22 @@ interface HomeViewProps {
 
 const HomeView: React.FC<HomeViewProps> = ({ onNavigate }) => {
   const [products, setProducts] = useState<Product[]>([]);
+  const [solutions, setSolutions] = useState<Solution[]>([]);
 
   useEffect(() => {
-    api.getProducts().then(setProducts).catch(() => {});
+    // One request for everything above the fold
+    api.getBootstrap(['solutions', 'products']).then(data => {
+      if (data.products) {
+        setProducts(data.products);
+      } else {
+        api.getProducts().then(setProducts).catch(() => {});
+      }
+      if (data.solutions) {
+        setSolutions(data.solutions);
+      } else {
+        api.getSolutions().then(setSolutions).catch(() => {});
+      }
+    }).catch(() => {});
   }, []);
 
   const sourceProducts = products.length > 0 ? products : PRODUCTS;
@@ -97,7 +110,7 @@ const HomeView: React.FC<HomeViewProps> = ({ onNavigate }) => {
         </div>
       </section>
 
-      <Solutions />
+      <Solutions items={solutions} />
 
       {/* Featured Systems Section */}
       <section className="py-24 bg-slate-50">
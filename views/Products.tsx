@@ -11,17 +11,43 @@ const ProductsView: React.FC = () => {
   const [search, setSearch] = useState('');
   const categories = ['全部', ...PRODUCT_CATEGORY_OPTIONS];
 
+  // 搜索结果（按相关度排序的产品 ID），为空表示未搜索
+  const [matchIds, setMatchIds] = useState<string[] | null>(null);
+
   useEffect(() => {
     api.getProducts().then(setProducts);
   }, []);
 
   const normalizedSearch = search.trim().toLowerCase();
-  const filteredProducts = products.filter(p => {
-    const matchCategory = activeCategory === '全部' || p.category === activeCategory;
-    const text = `${p.name}${p.description}`.toLowerCase();
-    const matchSearch = !normalizedSearch || text.includes(normalizedSearch);
-    return matchCategory && matchSearch;
-  });
+
+  useEffect(() => {
+    if (!normalizedSearch) {
+      setMatchIds(null);
+      return;
+    }
+    // 输入停顿后再请求服务端搜索
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      api.search(normalizedSearch, ['product'], 100)
+        .then(results => {
+          if (!cancelled) setMatchIds(results.hits.map(hit => hit.id));
+        })
+        .catch(() => {
+          if (!cancelled) setMatchIds(null);
+        });
+    }, 200);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [normalizedSearch]);
+
+  const matchCategory = (p: Product) => activeCategory === '全部' || p.category === activeCategory;
+  const filteredProducts = matchIds === null
+    ? products.filter(p => matchCategory(p) && (!normalizedSearch || `${p.name}${p.description}`.toLowerCase().includes(normalizedSearch)))
+    : matchIds
+        .map(id => products.find(p => p.id === id))
+        .filter((p): p is Product => p !== undefined && matchCategory(p));
 
   return (
     <div className="animate-fade-in bg-white min-h-screen">
@@ -2,7 +2,7 @@
 import React, { useEffect, useState } from 'react';
 import { api } from '../../services/api';
 import { FileText, RefreshCw, Users, Ticket, Store } from 'lucide-react';
-import { ExhibitionApplication } from '../../types';
+import { ApplicationCounts, ApplicationStatus, ExhibitionApplication } from '../../types';
 
 interface Application {
   id: number;
@@ -14,15 +14,55 @@ interface Application {
   created_at: string;
 }
 
+const STATUS_LABELS: Record<ApplicationStatus, string> = {
+  pending: '待处理',
+  contacted: '已联系',
+  approved: '已通过',
+  rejected: '已拒绝',
+};
+
+const STATUS_STYLES: Record<ApplicationStatus, string> = {
+  pending: 'bg-yellow-100 text-yellow-700',
+  contacted: 'bg-blue-100 text-blue-700',
+  approved: 'bg-green-100 text-green-700',
+  rejected: 'bg-gray-100 text-gray-500',
+};
+
+// 与后端 APPLICATION_TRANSITIONS 保持一致
+const STATUS_TRANSITIONS: Record<ApplicationStatus, ApplicationStatus[]> = {
+  pending: ['contacted', 'approved', 'rejected'],
+  contacted: ['approved', 'rejected'],
+  approved: ['rejected'],
+  rejected: ['approved'],
+};
+
 const ApplicationManager: React.FC = () => {
   const [activeTab, setActiveTab] = useState<'partner' | 'ticket' | 'booth'>('partner');
   const [applications, setApplications] = useState<Application[]>([]);
   const [exhibitionApps, setExhibitionApps] = useState<ExhibitionApplication[]>([]);
   const [loading, setLoading] = useState(false);
+  const [statusFilter, setStatusFilter] = useState<ApplicationStatus | ''>('');
+  const [dateFrom, setDateFrom] = useState('');
+  const [dateTo, setDateTo] = useState('');
+  const [counts, setCounts] = useState<ApplicationCounts | null>(null);
+  const [selected, setSelected] = useState<Set<number | string>>(new Set());
 
   useEffect(() => {
     loadData();
-  }, [activeTab]);
+  }, [activeTab, statusFilter, dateFrom, dateTo]);
+
+  // 实时推送新提交的申请，无需手动刷新
+  useEffect(() => {
+    return api.admin.streamApplications((event) => {
+      if (event.type === 'partner') {
+        const app = event.application as Application;
+        setApplications((prev) => (prev.some((a) => a.id === app.id) ? prev : [app, ...prev]));
+      } else {
+        const app = event.application;
+        setExhibitionApps((prev) => (prev.some((a) => a.id === app.id) ? prev : [app, ...prev]));
+      }
+    });
+  }, []);
 
   const loadData = async () => {
     setLoading(true);
@@ -31,9 +71,20 @@ const ApplicationManager: React.FC = () => {
         const data = await api.admin.getApplications();
         setApplications(data);
       } else {
-        // Load all exhibition applications, filtering is done in render
-        const data = await api.admin.getExhibitionApplications();
+        // 筛选与计数均由服务端完成
+        const filters = {
+          type: activeTab,
+          status: statusFilter ? [statusFilter] : undefined,
+          from: dateFrom || undefined,
+          to: dateTo || undefined,
+        };
+        const [data, countData] = await Promise.all([
+          api.admin.getExhibitionApplications(filters),
+          api.admin.getExhibitionApplicationCounts(filters),
+        ]);
         setExhibitionApps(data);
+        setCounts(countData);
+        setSelected(new Set());
       }
     } catch (error) {
       console.error('Failed to load applications:', error);
@@ -42,6 +93,41 @@ const ApplicationManager: React.FC = () => {
     }
   };
 
+  const changeStatus = async (app: ExhibitionApplication, status: ApplicationStatus) => {
+    if (app.id === undefined) return;
+    try {
+      await api.admin.updateApplicationStatus(app.id, status);
+      loadData();
+    } catch (error) {
+      alert(error instanceof Error ? error.message : '状态更新失败');
+    }
+  };
+
+  const bulkChangeStatus = async (status: ApplicationStatus) => {
+    try {
+      const result = await api.admin.bulkUpdateApplicationStatus(Array.from(selected), status);
+      if (result.skipped.length) {
+        alert(`已更新 ${result.updated.length} 条，${result.skipped.length} 条因当前状态无法变更为「${STATUS_LABELS[status]}」而跳过`);
+      }
+      loadData();
+    } catch (error) {
+      alert(error instanceof Error ? error.message : '批量更新失败');
+    }
+  };
+
+  const toggleSelected = (id: number | string) => {
+    setSelected((prev) => {
+      const next = new Set(prev);
+      if (next.has(id)) next.delete(id);
+      else next.add(id);
+      return next;
+    });
+  };
+
+  const visibleApps = exhibitionApps.filter(
+    (app) => app.type === activeTab && (!statusFilter || (app.status || 'pending') === statusFilter)
+  );
+
   return (
     <div>
       <div className="flex justify-between items-center mb-6">
@@ -92,6 +178,49 @@ const ApplicationManager: React.FC = () => {
         </button>
       </div>
 
+      {activeTab !== 'partner' && (
+        <div className="flex flex-wrap items-center gap-3 mb-4">
+          <button
+            onClick={() => setStatusFilter('')}
+            className={`px-3 py-1.5 rounded-lg text-sm font-medium ${statusFilter === '' ? 'bg-gray-800 text-white' : 'bg-white text-gray-600 hover:bg-gray-50'}`}
+          >
+            全部 {counts ? counts.total : ''}
+          </button>
+          {(Object.keys(STATUS_LABELS) as ApplicationStatus[]).map((status) => (
+            <button
+              key={status}
+              onClick={() => setStatusFilter(status)}
+              className={`px-3 py-1.5 rounded-lg text-sm font-medium ${statusFilter === status ? 'bg-gray-800 text-white' : 'bg-white text-gray-600 hover:bg-gray-50'}`}
+            >
+              {STATUS_LABELS[status]} {counts ? counts.by_status[status] : ''}
+            </button>
+          ))}
+          <div className="flex items-center gap-2 ml-auto text-sm text-gray-500">
+            <input type="date" value={dateFrom} onChange={(e) => setDateFrom(e.target.value)} className="border border-gray-200 rounded-lg px-2 py-1" />
+            <span>至</span>
+            <input type="date" value={dateTo} onChange={(e) => setDateTo(e.target.value)} className="border border-gray-200 rounded-lg px-2 py-1" />
+          </div>
+        </div>
+      )}
+
+      {activeTab !== 'partner' && selected.size > 0 && (
+        <div className="flex items-center gap-3 mb-4 bg-blue-50 text-blue-800 px-4 py-3 rounded-xl">
+          <span className="text-sm">已选择 {selected.size} 条</span>
+          {(['contacted', 'approved', 'rejected'] as ApplicationStatus[]).map((status) => (
+            <button
+              key={status}
+              onClick={() => bulkChangeStatus(status)}
+              className="px-3 py-1 rounded-lg text-sm bg-white hover:bg-blue-100"
+            >
+              标记为{STATUS_LABELS[status]}
+            </button>
+          ))}
+          <button onClick={() => setSelected(new Set())} className="ml-auto text-sm text-blue-600 hover:underline">
+            取消选择
+          </button>
+        </div>
+      )}
+
       <div className="bg-white rounded-xl shadow-sm border border-gray-100 overflow-hidden">
         {activeTab === 'partner' ? (
           <table className="w-full text-left">
@@ -137,6 +266,15 @@ const ApplicationManager: React.FC = () => {
           <table className="w-full text-left">
             <thead className="bg-gray-50 border-b border-gray-100">
               <tr>
+                <th className="pl-6 py-4">
+                  <input
+                    type="checkbox"
+                    checked={visibleApps.length > 0 && visibleApps.every((app) => app.id !== undefined && selected.has(app.id))}
+                    onChange={(e) =>
+                      setSelected(e.target.checked ? new Set(visibleApps.flatMap((app) => (app.id !== undefined ? [app.id] : []))) : new Set())
+                    }
+                  />
+                </th>
                 <th className="px-6 py-4 font-medium text-gray-500">提交时间</th>
                 <th className="px-6 py-4 font-medium text-gray-500">类型</th>
                 <th className="px-6 py-4 font-medium text-gray-500">展会名称</th>
@@ -144,12 +282,13 @@ const ApplicationManager: React.FC = () => {
                 <th className="px-6 py-4 font-medium text-gray-500">联系电话</th>
                 <th className="px-6 py-4 font-medium text-gray-500">公司</th>
                 <th className="px-6 py-4 font-medium text-gray-500">留言内容</th>
+                <th className="px-6 py-4 font-medium text-gray-500">状态</th>
               </tr>
             </thead>
             <tbody className="divide-y divide-gray-100">
-              {exhibitionApps.filter(app => app.type === activeTab).length === 0 ? (
+              {visibleApps.length === 0 ? (
                 <tr>
-                  <td colSpan={7} className="px-6 py-12 text-center text-gray-400">
+                  <td colSpan={9} className="px-6 py-12 text-center text-gray-400">
                     <div className="flex flex-col items-center gap-3">
                       <FileText size={48} className="opacity-20" />
                       <p>暂无{activeTab === 'ticket' ? '门票预订' : '展位申请'}记录</p>
@@ -157,10 +296,13 @@ const ApplicationManager: React.FC = () => {
                   </td>
                 </tr>
               ) : (
-                exhibitionApps
-                  .filter(app => app.type === activeTab)
-                  .map((app, idx) => (
+                visibleApps.map((app, idx) => (
                   <tr key={app.id || idx} className="hover:bg-gray-50">
+                    <td className="pl-6 py-4">
+                      {app.id !== undefined && (
+                        <input type="checkbox" checked={selected.has(app.id)} onChange={() => toggleSelected(app.id!)} />
+                      )}
+                    </td>
                     <td className="px-6 py-4 text-gray-600 text-sm">
                       {app.created_at ? new Date(app.created_at).toLocaleString() : '-'}
                     </td>
@@ -180,6 +322,17 @@ const ApplicationManager: React.FC = () => {
                     <td className="px-6 py-4 text-gray-600 max-w-xs truncate" title={app.message}>
                       {app.message || '-'}
                     </td>
+                    <td className="px-6 py-4">
+                      <select
+                        value={app.status || 'pending'}
+                        onChange={(e) => changeStatus(app, e.target.value as ApplicationStatus)}
+                        className={`px-2 py-1 rounded text-xs font-bold border-0 ${STATUS_STYLES[app.status || 'pending']}`}
+                      >
+                        {[app.status || 'pending', ...STATUS_TRANSITIONS[app.status || 'pending']].map((status) => (
+                          <option key={status} value={status}>{STATUS_LABELS[status as ApplicationStatus]}</option>
+                        ))}
+                      </select>
+                    </td>
                   </tr>
                 ))
               )}
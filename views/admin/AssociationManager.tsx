@@ -121,7 +121,7 @@ const AssociationManager: React.FC = () => {
             {associations.map((item) => (
               <tr key={item.id} className="hover:bg-slate-50">
                 <td className="px-6 py-4">
-                  <img src={item.logo} alt={item.name} className="w-12 h-12 object-contain rounded bg-slate-100" />
+                  <img src={item.thumbnail || item.logo} alt={item.name} className="w-12 h-12 object-contain rounded bg-slate-100" />
                 </td>
                 <td className="px-6 py-4 font-medium text-slate-900">{item.name}</td>
                 <td className="px-6 py-4">
@@ -148,7 +148,7 @@ const ExhibitionManager: React.FC = () => {
               <tr key={item.id} className="hover:bg-gray-50">
                 <td className="px-6 py-4 font-medium text-gray-900">
                   <div className="flex items-center gap-3">
-                    <img src={item.image} alt={item.title} className="w-10 h-10 rounded object-cover" />
+                    <img src={item.thumbnail || item.image} alt={item.title} className="w-10 h-10 rounded object-cover" />
                     <div>
                       <div>{item.title}</div>
                       {item.featured && <span className="text-xs bg-yellow-100 text-yellow-800 px-1.5 py-0.5 rounded">推荐</span>}